@@ -1,18 +1,34 @@
-from flask import Flask, render_template, request, redirect, session, flash
+from flask import Flask, render_template, request, redirect, session, flash, g, jsonify
+from flask import Response, stream_with_context
 from datetime import datetime, date
 import pytz
-import psycopg2
 import psycopg2.extras
 from datetime import timedelta
+from io import BytesIO
+
+import assets
+import dashboard_cache
+import db
+import exports
+import live
+import metrics
+import pdf_cache
+import profiler
+import sqlstats
+import summary
+import team_pack
+from cache import TTLCache
+from itsdangerous import BadSignature, URLSafeTimedSerializer
 
 from flask import send_file
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.lib.pagesizes import A4
+import base64
+import click
+import hashlib
+import hmac
+import json
+import sys
 import os
-from io import BytesIO
+import time
 
 app = Flask(__name__)
 app.secret_key = "daily_tracker_secret"
@@ -22,77 +38,772 @@ DB_NAME = os.path.join(BASE_DIR, "daily_tracker.db")
 
 
 # ------------------ DATABASE HELPERS ------------------
+# One pooled connection per request, however many times a route asks for
+# it. release_db() hands it back to the pool on every exit path.
 def get_db():
-    conn = psycopg2.connect(
-        os.environ.get("DATABASE_URL"),
-        cursor_factory=psycopg2.extras.RealDictCursor
+    if "db" not in g:
+        g.db = db.get_pool().getconn()
+        g.db.cursor_factory = sqlstats.TimedCursor
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exc):
+    conn = g.pop("db", None)
+    if conn is not None:
+        db.get_pool().putconn(conn)
+
+# ------------------ SQL INSTRUMENTATION ------------------
+# Every statement run through get_db() counts towards the current
+# request. The totals go out in a Server-Timing header (visible in the
+# browser's network panel) and requests with too much DB time are written
+# to the slow-query log, tagged with the endpoint. Streamed bodies (SSE,
+# exports) are only counted up to the point the headers are sent.
+@app.before_request
+def start_sql_stats():
+    sqlstats.begin()
+
+@app.after_request
+def report_sql_stats(response):
+    stats = sqlstats.current()
+    if stats is not None:
+        response.headers["Server-Timing"] = sqlstats.server_timing(stats)
+        sqlstats.log_if_slow(
+            stats, request.endpoint, request.method, request.path,
+            response.status_code
+        )
+    return response
+
+@app.teardown_request
+def end_sql_stats(exc):
+    sqlstats.end()
+
+# ------------------ METRICS ------------------
+# Per-route latency, in-flight requests and DB time for /metrics; see
+# metrics.py for how the gunicorn workers' numbers are combined. Routes
+# are labelled by endpoint name, so unmatched URLs share one series.
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    metrics.inc("daily_tracker_http_requests_in_flight")
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get("metrics_started")
+    if started is None:
+        return response
+
+    endpoint = request.endpoint or "unmatched"
+    metrics.inc(
+        "daily_tracker_http_requests_total",
+        endpoint=endpoint, method=request.method, status=str(response.status_code)
+    )
+    metrics.observe(
+        "daily_tracker_http_request_duration_seconds",
+        time.perf_counter() - started,
+        endpoint=endpoint, method=request.method
     )
-    return conn
 
-def init_db():
-    conn = get_db()
-    cur = conn.cursor()
+    stats = sqlstats.current()
+    if stats is not None:
+        metrics.inc("daily_tracker_db_seconds_total", stats.db_time, endpoint=endpoint)
+        metrics.inc("daily_tracker_db_queries_total", stats.queries, endpoint=endpoint)
+    return response
+
+@app.teardown_request
+def end_request_metrics(exc):
+    if g.pop("metrics_started", None) is not None:
+        metrics.inc("daily_tracker_http_requests_in_flight", -1)
+
+# ------------------ REQUEST PROFILING ------------------
+# profiler.py samples one request in PROFILE_ONE_IN, plus any request
+# sending a token from /manager/profiles in the X-Profile-Token header,
+# so a manager can profile a request of their own choosing from curl or
+# the browser. Tokens are signed with the app secret and expire.
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_TOKEN_TTL = int(os.environ.get("PROFILE_TOKEN_TTL", "3600"))
+PROFILE_SIGNER = URLSafeTimedSerializer(app.secret_key, salt="daily-tracker-profile")
+
+def profile_token_valid(token):
+    try:
+        PROFILE_SIGNER.loads(token, max_age=PROFILE_TOKEN_TTL)
+    except BadSignature:
+        return False
+    return True
+
+@app.before_request
+def start_profile():
+    token = request.headers.get(PROFILE_HEADER)
+    if token and profile_token_valid(token):
+        trigger = "header"
+    elif profiler.sampled(request.endpoint):
+        trigger = "sample"
+    else:
+        return
+
+    g.profile = (profiler.start(), trigger)
+
+@app.after_request
+def note_profile_status(response):
+    if "profile" in g:
+        g.profile_status = response.status_code
+    return response
+
+@app.teardown_request
+def save_profile(exc):
+    entry = g.pop("profile", None)
+    if entry is None:
+        return
+
+    profile, trigger = entry
+    profiler.stop(profile)
+    try:
+        profiler.save(
+            profile, request.method, request.path, request.endpoint,
+            g.pop("profile_status", 500), trigger
+        )
+    except OSError:
+        pass
+
+@metrics.collector
+def pool_metrics():
+    stats = db.pool_stats()
+    if stats is None:
+        return []
+    return [
+        ("daily_tracker_db_pool_connections", {"state": "idle"}, stats["idle"]),
+        ("daily_tracker_db_pool_connections", {"state": "in_use"}, stats["in_use"]),
+        ("daily_tracker_db_pool_max_connections", {}, stats["max"]),
+        ("daily_tracker_db_pool_checkouts_total", {}, stats["checkouts"]),
+        ("daily_tracker_db_pool_waits_total", {}, stats["waits"]),
+        ("daily_tracker_db_pool_timeouts_total", {}, stats["timeouts"])
+    ]
+
+@metrics.collector
+def sse_metrics():
+    return [("daily_tracker_sse_connections", {}, live.subscriber_count())]
+
+# Schema changes live in migrations.py and run once per deploy via
+# `python app.py migrate`, never when a worker imports this module.
+
+# ------------------ STATIC ASSETS ------------------
+# Stylesheets, scripts, images and vendored libraries under static/, at
+# content-hashed URLs (see assets.py). A hashed URL never changes meaning,
+# so browsers and proxies may keep it for a year without revalidating.
+app.jinja_env.globals["asset"] = assets.url
+
+@app.route("/assets/<path:name>")
+def static_asset(name):
+    asset = assets.lookup(name)
+    if asset is None:
+        return "Not found", 404
+
+    path, encoding = assets.variant(asset, request.accept_encodings)
+
+    response = send_file(
+        path,
+        mimetype=asset.mimetype,
+        etag=f"{asset.hashed}.{encoding}" if encoding else asset.hashed,
+        conditional=True,
+        max_age=assets.MAX_AGE
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if asset.compressible:
+        response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# ------------------ USER LOOKUPS ------------------
+# Login only ever needs the one user being authenticated. The first login
+# step (which form to show) reads rows cached per worker for a short TTL;
+# every write to `users` calls invalidate_user(), and the TTL bounds
+# staleness in the other workers. Unknown usernames are never cached, so
+# a user created in another worker is seen immediately.
+#
+# The cache never holds the password. The password step checks it, and
+# whether a reset has been approved, with get_login_user(), which always
+# reads the row: a stale copy in another worker would otherwise accept an
+# old password, or a second reset, until the TTL ran out.
+USER_CACHE = TTLCache(
+    maxsize=int(os.environ.get("USER_CACHE_SIZE", "2048")),
+    ttl=float(os.environ.get("USER_CACHE_TTL", "30"))
+)
+
+def get_user(username):
+    user = USER_CACHE.get(username)
+    if user is not None:
+        return user
+
+    cur = get_db().cursor()
+    cur.execute("""
+        SELECT username, reset_requested
+        FROM users
+        WHERE username = %s
+    """, (username,))
+    user = cur.fetchone()
+
+    if user is not None:
+        USER_CACHE.set(username, user)
+    return user
 
-    # ---------------- USERS ----------------
+def get_login_user(username):
+    cur = get_db().cursor()
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id SERIAL PRIMARY KEY,
-        username TEXT UNIQUE,
-        password TEXT,
-        reset_requested INTEGER DEFAULT 0
-    )
-    """)
-    # ---------------- LEAVE REQUESTS ----------------
+        SELECT username, password, reset_requested
+        FROM users
+        WHERE username = %s
+    """, (username,))
+    return cur.fetchone()
+
+def invalidate_user(username):
+    USER_CACHE.pop(username)
+
+# ------------------ LEAVE HELPERS ------------------
+def month_bounds(month, year):
+    first = date(int(year), int(month), 1)
+    next_first = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return first, next_first
+
+# Walks back from `day` across approved leave ranges that cover it, one
+# range per step, and returns the first day not on leave.
+def last_working_day(cur, username, day):
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS leave_requests (
-        id SERIAL PRIMARY KEY,
-        username TEXT,
-        leave_type TEXT,
-        leave_dates TEXT,
-        reason TEXT,
-        status INTEGER DEFAULT 0,
-        requested_on TEXT
+        WITH RECURSIVE walk(d) AS (
+            SELECT %s::date
+            UNION
+            SELECT (lower(l.leave_range) - 1)::date
+            FROM walk
+            JOIN leave_requests l
+              ON l.username = %s
+             AND l.status = 2
+             AND l.leave_range @> walk.d
+        )
+        SELECT MIN(d) AS d FROM walk
+    """, (day, username))
+    return cur.fetchone()["d"]
+
+# ------------------ PAGINATION HELPERS ------------------
+# Keyset pagination: a page ends with an opaque cursor holding the sort
+# key of its last row, and the next page starts strictly after it. Cost
+# per page is the same however deep the list goes.
+HISTORY_PAGE_SIZE = int(os.environ.get("HISTORY_PAGE_SIZE", "20"))
+QUEUE_PAGE_SIZE = int(os.environ.get("QUEUE_PAGE_SIZE", "50"))
+
+def encode_cursor(*values):
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+# Raises ValueError for anything encode_cursor() did not produce.
+def decode_cursor(token, size):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError("invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("invalid cursor")
+    return values
+
+# One page of an employee's leave history, newest first.
+def leave_history_page(cur, username, cursor=None):
+    before_id = None
+    if cursor:
+        before_id, = decode_cursor(cursor, 1)
+        if not isinstance(before_id, int):
+            raise ValueError("invalid cursor")
+
+    cur.execute("""
+        SELECT
+            id,
+            leave_type,
+            leave_dates,
+            reason,
+            requested_on,
+            status
+        FROM leave_requests
+        WHERE username = %s
+          AND (%s::int IS NULL OR id < %s)
+        ORDER BY id DESC
+        LIMIT %s
+    """, (username, before_id, before_id, HISTORY_PAGE_SIZE + 1))
+
+    rows = cur.fetchall()
+    next_cursor = None
+
+    if len(rows) > HISTORY_PAGE_SIZE:
+        rows = rows[:HISTORY_PAGE_SIZE]
+        next_cursor = encode_cursor(rows[-1]["id"])
+
+    return rows, next_cursor
+
+# One page of pending leave requests, oldest request first. Rows with no
+# requested_on sort last, as they did before paging.
+def pending_leave_page(cur, cursor=None):
+    after = None
+    if cursor:
+        requested_on, after_id = decode_cursor(cursor, 2)
+        if not isinstance(after_id, int) or not isinstance(requested_on, (str, type(None))):
+            raise ValueError("invalid cursor")
+        after = (requested_on, after_id)
+
+    params = {
+        "requested_on": after and after[0],
+        "id": after and after[1],
+        "limit": QUEUE_PAGE_SIZE + 1
+    }
+
+    if after is None:
+        cur.execute("""
+            SELECT *
+            FROM leave_requests
+            WHERE status = 0
+            ORDER BY requested_on ASC, id ASC
+            LIMIT %(limit)s
+        """, params)
+
+    elif after[0] is None:
+        cur.execute("""
+            SELECT *
+            FROM leave_requests
+            WHERE status = 0
+              AND requested_on IS NULL
+              AND id > %(id)s
+            ORDER BY id ASC
+            LIMIT %(limit)s
+        """, params)
+
+    else:
+        # The NULL tail is its own branch so that both halves are index
+        # range scans on idx_leave_pending rather than one filtered scan.
+        cur.execute("""
+            SELECT * FROM (
+                (
+                    SELECT *
+                    FROM leave_requests
+                    WHERE status = 0
+                      AND (requested_on, id) > (%(requested_on)s, %(id)s)
+                    ORDER BY requested_on ASC, id ASC
+                    LIMIT %(limit)s
+                )
+                UNION ALL
+                (
+                    SELECT *
+                    FROM leave_requests
+                    WHERE status = 0
+                      AND requested_on IS NULL
+                    ORDER BY id ASC
+                    LIMIT %(limit)s
+                )
+            ) page
+            ORDER BY requested_on ASC, id ASC
+            LIMIT %(limit)s
+        """, params)
+
+    rows = cur.fetchall()
+    next_cursor = None
+
+    if len(rows) > QUEUE_PAGE_SIZE:
+        rows = rows[:QUEUE_PAGE_SIZE]
+        next_cursor = encode_cursor(rows[-1]["requested_on"], rows[-1]["id"])
+
+    return rows, next_cursor
+
+# "Load more" fetches just the rows; the next cursor rides in a header.
+def rows_fragment(template, next_cursor, **context):
+    response = Response(render_template(template, **context))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+# ------------------ ACTIVITY HELPERS ------------------
+# Sort-and-sweep over half-open [start, end) slots. Only clashes that
+# involve at least one new slot count; rows already stored are not
+# re-judged against each other.
+def find_overlap(existing, new):
+    slots = sorted(
+        [(start, end, False) for start, end in existing]
+        + [(start, end, True) for start, end in new]
     )
-    """)
 
-    # ---------------- SAFE MIGRATION ----------------
+    max_end_all = None
+    max_end_new = None
+
+    for start, end, is_new in slots:
+        reach = max_end_all if is_new else max_end_new
+
+        if reach is not None and start < reach:
+            return True
+
+        max_end_all = end if max_end_all is None else max(max_end_all, end)
+        if is_new:
+            max_end_new = end if max_end_new is None else max(max_end_new, end)
+
+    return False
+
+# ------------------ EXPORT HELPERS ------------------
+# Inclusive (first, last) dates from ?from=&to=, ?year=&quarter= or
+# ?year=&month=. Raises ValueError for anything else.
+def export_period(args):
+    if args.get("from") and args.get("to"):
+        first = datetime.strptime(args["from"], "%Y-%m-%d").date()
+        last = datetime.strptime(args["to"], "%Y-%m-%d").date()
+
+    elif args.get("year") and args.get("quarter"):
+        quarter = int(args["quarter"])
+        if quarter not in (1, 2, 3, 4):
+            raise ValueError("quarter must be 1-4")
+        first, _ = month_bounds(quarter * 3 - 2, args["year"])
+        _, next_first = month_bounds(quarter * 3, args["year"])
+        last = next_first - timedelta(days=1)
+
+    elif args.get("year") and args.get("month"):
+        first, next_first = month_bounds(args["month"], args["year"])
+        last = next_first - timedelta(days=1)
+
+    else:
+        raise ValueError("give from/to, year/quarter or year/month")
+
+    if last < first:
+        raise ValueError("period ends before it starts")
+    return first, last
+
+# ------------------ DASHBOARD HELPERS ------------------
+# Per-employee productivity rows and the overall figures for one month.
+# Results are shared by all workers through dashboard_cache and dropped
+# whenever a write touches the month.
+def dashboard_results(cur, month_start, next_month):
+    cached, generation = dashboard_cache.get(month_start)
+    if cached is not None:
+        return cached
+
+    # ---------------- PRODUCTIVITY ----------------
     cur.execute("""
-    ALTER TABLE leave_requests
-    ADD COLUMN IF NOT EXISTS from_date DATE
-    """)
+        SELECT
+            username,
+            SUM(total_minutes) AS productive_minutes,
+            COUNT(*) AS days
+        FROM daily_activity_summary
+        WHERE activity_date >= %s
+          AND activity_date < %s
+        GROUP BY username
+    """, (month_start, next_month))
+
+    activity_rows = cur.fetchall()
 
+    # ---------------- APPROVED LEAVE DAYS ----------------
+    # Per-user day counts for the part of each approved range that falls
+    # inside the month; the intersection's length is the day count.
     cur.execute("""
-    ALTER TABLE leave_requests
-    ADD COLUMN IF NOT EXISTS to_date DATE
-    """)
+        SELECT
+            username,
+            SUM(CASE WHEN kind = 'halfday' THEN days * 0.5 ELSE days END)
+                FILTER (WHERE kind IN ('leave', 'halfday')) AS leave_days,
+            COUNT(*) FILTER (WHERE kind = 'halfday') AS halfday_requests,
+            SUM(days) FILTER (WHERE kind = 'compoff') AS compoff_days,
+            SUM(days) FILTER (WHERE kind = 'weeklyoff') AS weeklyoff_days
+        FROM (
+            SELECT
+                username,
+                CASE LOWER(TRIM(COALESCE(leave_type, '')))
+                    WHEN 'halfday' THEN 'halfday'
+                    WHEN 'compoff' THEN 'compoff'
+                    WHEN 'weeklyoff' THEN 'weeklyoff'
+                    WHEN 'weekly off' THEN 'weeklyoff'
+                    WHEN 'holiday' THEN 'weeklyoff'
+                    ELSE 'leave'
+                END AS kind,
+                UPPER(leave_range * daterange(%(start)s, %(end)s))
+                    - LOWER(leave_range * daterange(%(start)s, %(end)s)) AS days
+            FROM leave_requests
+            WHERE status = 2
+              AND leave_range && daterange(%(start)s, %(end)s)
+        ) l
+        GROUP BY username
+    """, {"start": month_start, "end": next_month})
+
+    leave_counts = {r["username"]: r for r in cur.fetchall()}
+
+    # ---------------- FINAL DATA ----------------
+    data = []
+
+    total_productive_all = 0
+    total_available_all = 0
+    total_available_with_leave_all = 0
+
+    for r in activity_rows:
+
+        username = r["username"]
+
+        productive_hours = round((r["productive_minutes"] or 0) / 60.0, 2)
 
-    # ---------------- ACTIVITIES ----------------
+        working_days = r["days"] or 0
+
+        counts = leave_counts.get(username, {})
+
+        # Half days make the leave total fractional; keep whole totals as
+        # ints so the page renders "2", not "2.0".
+        leave_days = counts.get("leave_days") or 0
+        leave_days = float(leave_days) if counts.get("halfday_requests") else int(leave_days)
+
+        compoff_days = int(counts.get("compoff_days") or 0)
+
+        weeklyoff_days = int(counts.get("weeklyoff_days") or 0)
+
+        half_days = 0
+
+        if leave_days % 1 != 0:
+            half_days = 1
+
+        # ---------------- HOURS ----------------
+        available_hours = working_days * 7
+
+        # Only actual Leave affects productivity.
+        # Weekly Off & Comp-Off are treated as Non Working Days.
+        available_hours_with_leave = (working_days + leave_days) * 7
+
+        ideal_hours = max(available_hours - productive_hours, 0)
+        ideal_hours = round(ideal_hours, 2)
+
+        productivity = (
+            (productive_hours / available_hours) * 100
+            if available_hours > 0 else 0
+        )
+        productivity = round(productivity, 1)
+
+        productivity_with_leave = (
+            (productive_hours / available_hours_with_leave) * 100
+            if available_hours_with_leave > 0 else 0
+        )
+        productivity_with_leave = round(productivity_with_leave, 1)
+
+        total_productive_all += productive_hours
+        total_available_all += available_hours
+        total_available_with_leave_all += available_hours_with_leave
+
+        data.append({
+            "name": username,
+            "productive": productive_hours,
+            "days": working_days,
+            "available": available_hours,
+            "available_with_leave": available_hours_with_leave,
+            "ideal": ideal_hours,
+            "productivity": productivity,
+            "productivity_with_leave": productivity_with_leave,
+            "leave_days": leave_days,
+            "compoff_days": compoff_days,
+            "weeklyoff_days": weeklyoff_days,
+            "half_days": half_days
+        })
+
+    overall_productivity = (
+        (total_productive_all / total_available_all) * 100
+        if total_available_all > 0 else 0
+    )
+    overall_productivity = round(overall_productivity, 1)
+
+    overall_productivity_with_leave = (
+        (total_productive_all / total_available_with_leave_all) * 100
+        if total_available_with_leave_all > 0 else 0
+    )
+    overall_productivity_with_leave = round(
+        overall_productivity_with_leave,
+        1
+    )
+
+    results = {
+        "data": data,
+        "overall_productivity": overall_productivity,
+        "overall_productivity_with_leave": overall_productivity_with_leave
+    }
+    dashboard_cache.put(month_start, generation, results)
+    return results
+
+# ------------------ REPORT HELPERS ------------------
+# The employee report's per-day table and KPI cards for one month.
+def report_month(cur, username, month_start, next_month):
+    # -------- DAILY TOTALS FOR THE MONTH --------
+    cur.execute("""
+        SELECT activity_date, total_minutes, clock_in, clock_out
+        FROM daily_activity_summary
+        WHERE username = %s
+          AND activity_date >= %s
+          AND activity_date < %s
+    """, (username, month_start, next_month))
+
+    daily_minutes = {}
+    daily_clock = {}
+
+    for row in cur.fetchall():
+        d = row["activity_date"]
+
+        daily_minutes[d] = row["total_minutes"]
+        daily_clock[d] = {
+            "clock_in": row["clock_in"],
+            "clock_out": row["clock_out"]
+        }
+
+    # -------- FETCH APPROVED LEAVES --------
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS activities (
-        id SERIAL PRIMARY KEY,
-        username TEXT,
-        activity_date DATE,
-        clock_in TIME,
-        activity_name TEXT,
-        start_time TIME,
-        end_time TIME,
-        duration INTEGER,
-        clock_out TIME,
-        submitted_at TIMESTAMP
+        SELECT leave_type,
+               GREATEST(from_date, %s) AS first_day,
+               LEAST(to_date, %s) AS last_day
+        FROM leave_requests
+        WHERE username = %s
+          AND status = 2
+          AND leave_range && daterange(%s, %s)
+    """, (month_start, next_month - timedelta(days=1), username, month_start, next_month))
+    leave_rows = cur.fetchall()
+
+    leave_dates_dict = {}
+
+    leave_count = 0
+    non_working_days = 0
+
+    for r in leave_rows:
+
+        leave_type = (r["leave_type"] or "").strip().lower()
+
+        if leave_type == "weeklyoff":
+            display_text = "Weekly Off"
+        elif leave_type == "weekly off":
+            display_text = "Weekly Off"
+        elif leave_type == "holiday":
+            display_text = "Holiday"
+        elif leave_type == "compoff":
+            display_text = "Comp-Off"
+        elif leave_type == "halfday":
+            display_text = "Half Day"
+        else:
+            display_text = "Leave"
+
+        d = r["first_day"]
+
+        while d <= r["last_day"]:
+
+            leave_dates_dict[d] = display_text
+
+            if leave_type in ["weeklyoff", "weekly off", "holiday", "compoff"]:
+                non_working_days += 1
+            else:
+                leave_count += 1
+
+            d += timedelta(days=1)
+
+    # -------- BUILD REPORT TABLE --------
+    report_data = []
+
+    total_minutes = 0
+
+    all_dates = set(daily_minutes.keys()) | set(leave_dates_dict.keys())
+
+    for d in sorted(all_dates):
+
+        if d in leave_dates_dict:
+
+            report_data.append({
+                "date": d,
+                "time": leave_dates_dict[d],
+                "productivity": "-",
+                "clock_in": "-",
+                "clock_out": "-"
+            })
+
+        else:
+
+            mins = daily_minutes.get(d, 0)
+
+            hrs = mins // 60
+            rem = mins % 60
+
+            productivity_day = (mins / (7 * 60)) * 100 if mins > 0 else 0
+
+            report_data.append({
+                "date": d,
+                "time": f"{hrs} hours {rem} min",
+                "productivity": f"{productivity_day:.2f}%",
+                "clock_in": daily_clock.get(d, {}).get("clock_in"),
+                "clock_out": daily_clock.get(d, {}).get("clock_out")
+            })
+
+            total_minutes += mins
+
+    # -------- CARDS --------
+    productive_hours = total_minutes / 60
+
+    working_days = len(daily_minutes)
+
+    available_hours = working_days * 7
+
+    available_hours_with_leave = (working_days + leave_count) * 7
+
+    idle_hours = max(available_hours - productive_hours, 0)
+
+    productivity = (
+        (productive_hours / available_hours) * 100
+        if available_hours > 0 else 0
     )
-    """)
+    # Productivity for Pie Chart (Working Days Only)
+    chart_productivity = (
+        (productive_hours / (productive_hours + idle_hours)) * 100
+        if (productive_hours + idle_hours) > 0 else 0
+    )
+
+    non_working_count = non_working_days
+
+    cards = {
+        "productive": f"{int(productive_hours)} hrs {int((productive_hours % 1) * 60)} min",
+        "working_days": working_days,
+        "available": f"{available_hours} hrs",
+        "idle": f"{int(idle_hours)} hrs {int((idle_hours % 1) * 60)} min",
+        "productivity": f"{productivity:.2f}%",
+        "chart_productivity": round(chart_productivity, 2),
+        "leaves": leave_count,
+        "non_working": non_working_count
+    }
 
+    return report_data, cards
 
-    # 🔑 IMPORTANT: Index for fast replacement check
+def report_day_activities(cur, username, day):
     cur.execute("""
-    CREATE INDEX IF NOT EXISTS idx_activity_unique
-    ON activities(username, activity_date, start_time, end_time)
-    """)
+        SELECT activity_name, start_time, end_time, duration
+        FROM activities
+        WHERE username = %s
+          AND activity_date = %s
+        ORDER BY start_time
+    """, (username, day))
+    return cur.fetchall()
+
+# Years an employee has logged activity in, for the report's dropdown.
+# One index probe per year on the summary's primary key, cached in
+# dashboard_cache so a submit in any worker drops it everywhere.
+def activity_years(cur, username):
+    years, generation = dashboard_cache.get_years(username)
+    if years is not None:
+        return years
 
-    conn.commit()
-    conn.close()
+    cur.execute("""
+        WITH RECURSIVE y(year) AS (
+            SELECT EXTRACT(YEAR FROM MIN(activity_date))::int
+            FROM daily_activity_summary
+            WHERE username = %(user)s
+            UNION ALL
+            SELECT (
+                SELECT EXTRACT(YEAR FROM MIN(activity_date))::int
+                FROM daily_activity_summary
+                WHERE username = %(user)s
+                  AND activity_date >= make_date(y.year + 1, 1, 1)
+            )
+            FROM y
+            WHERE y.year IS NOT NULL
+        )
+        SELECT year FROM y WHERE year IS NOT NULL
+    """, {"user": username})
 
-init_db()
+    years = [row["year"] for row in cur.fetchall()]
+    dashboard_cache.put_years(username, generation, years)
+    return years
 
 # ------------------ WELCOME PAGE ------------------
 @app.route("/")
@@ -102,28 +813,19 @@ def welcome():
 # ------------------ EMPLOYEE LOGIN ------------------
 @app.route("/employee", methods=["GET", "POST"])
 def employee_login():
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT username, password, reset_requested FROM users")
-    users = {
-        row["username"]: {
-            "password": row["password"],
-            "reset_requested": row["reset_requested"]
-        }
-        for row in cur.fetchall()
-    }
-    conn.close()
 
     # Step 1: Username selection
     if request.method == "POST" and "username" in request.form and "password" not in request.form:
         username = request.form.get("username")
         session["temp_user"] = username
 
-        if username in users:
-            if users[username]["reset_requested"] == 1:
+        user = get_user(username)
+
+        if user:
+            if user["reset_requested"] == 1:
                 return render_template("index.html", step="pending")
 
-            if users[username]["reset_requested"] == 2:
+            if user["reset_requested"] == 2:
                 return render_template("index.html", step="create")
 
             return render_template("index.html", step="password")
@@ -136,8 +838,10 @@ def employee_login():
         username = session.get("temp_user")
         password = request.form.get("password")
 
+        user = get_login_user(username)
+
         # New user
-        if username not in users:
+        if not user:
             conn = get_db()
             cur = conn.cursor()
             cur.execute(
@@ -145,14 +849,14 @@ def employee_login():
                 (username, password)
             )
             conn.commit()
-            conn.close()
+            invalidate_user(username)
 
             session["username"] = username
             session.pop("temp_user")
             return redirect("/dashboard")
 
         # Reset approved
-        if users[username]["reset_requested"] == 2:
+        if user["reset_requested"] == 2:
             conn = get_db()
             cur = conn.cursor()
             cur.execute("""
@@ -161,14 +865,14 @@ def employee_login():
                 WHERE username = %s
             """, (password, username))
             conn.commit()
-            conn.close()
+            invalidate_user(username)
 
             session["username"] = username
             session.pop("temp_user")
             return redirect("/dashboard")
 
         # Normal login
-        if users[username]["password"] == password:
+        if user["password"] == password:
             session["username"] = username
             session.pop("temp_user")
             return redirect("/dashboard")
@@ -193,8 +897,9 @@ def request_reset():
         SET reset_requested = 1
         WHERE username = %s
     """, (username,))
+    live.notify(cur, "reset")
     conn.commit()
-    conn.close()
+    invalidate_user(username)
 
     flash("Reset request sent to manager")
     return "", 204
@@ -213,7 +918,6 @@ def manager_reset_requests():
         WHERE reset_requested = 1
     """)
     requests = cur.fetchall()
-    conn.close()
 
     return render_template("manager_reset_requests.html", requests=requests)
 
@@ -233,26 +937,205 @@ def manager_approve_reset():
             password = NULL
         WHERE username = %s
     """, (username,))
+    live.notify(cur, "reset")
     conn.commit()
-    conn.close()
+    invalidate_user(username)
 
     return redirect("/manager/reset-requests")
 
+# ------------------ MANAGER BULK APPROVE RESETS ------------------
+# Same shape as the leave bulk action: usernames, or all=1 for every
+# pending request, approved in one UPDATE with an outcome per username.
+@app.route("/manager/approve-reset/bulk", methods=["POST"])
+def bulk_approve_reset():
+    if not session.get("manager"):
+        if wants_json():
+            return api_error("Manager login required", 401)
+        return redirect("/manager")
+
+    params, usernames = bulk_params("usernames", "username")
+
+    if usernames is None or not all(isinstance(u, str) for u in usernames):
+        return bulk_error("Usernames must be a list of names.", "/manager/reset-requests")
+
+    approve_all = str(params.get("all", "")).lower() in ("1", "true")
+
+    if not usernames and not approve_all:
+        return bulk_error("Select at least one employee.", "/manager/reset-requests")
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    if approve_all:
+        cur.execute("""
+            UPDATE users
+            SET reset_requested = 2,
+                password = NULL
+            WHERE reset_requested = 1
+            RETURNING username, TRUE AS updated, 1 AS reset_requested
+        """)
+
+    else:
+        cur.execute("""
+            WITH requested AS (
+                SELECT DISTINCT UNNEST(%s::text[]) AS username
+            ),
+            updated AS (
+                UPDATE users u
+                SET reset_requested = 2,
+                    password = NULL
+                FROM requested r
+                WHERE u.username = r.username
+                  AND u.reset_requested = 1
+                RETURNING u.username
+            )
+            SELECT
+                r.username,
+                d.username IS NOT NULL AS updated,
+                x.reset_requested
+            FROM requested r
+            LEFT JOIN updated d ON d.username = r.username
+            LEFT JOIN users x ON x.username = r.username
+            ORDER BY r.username
+        """, ([str(u) for u in usernames],))
+
+    rows = cur.fetchall()
+    if any(r["updated"] for r in rows):
+        live.notify(cur, "reset")
+    conn.commit()
+
+    results = []
+    for r in rows:
+        if r["updated"]:
+            invalidate_user(r["username"])
+            result = "approved"
+        elif r["reset_requested"] is None:
+            result = "not_found"
+        else:
+            result = "not_pending"
+        results.append({"username": r["username"], "outcome": result})
+
+    changed = sum(1 for r in results if r["outcome"] == "approved")
+
+    if wants_json():
+        return jsonify({"updated": changed, "results": results})
+
+    flash(f"{changed} reset request(s) approved.")
+    return redirect("/manager/reset-requests")
+
+# ------------------ MANAGER LIVE COUNTS (SSE) ------------------
+# Pending reset/leave counts pushed to the dashboard as they change,
+# instead of the page being refreshed to find out.
+@app.route("/manager/events")
+def manager_events():
+    if "manager" not in session:
+        return redirect("/manager")
+
+    listener = live.get_listener()
+    q = listener.subscribe()
+
+    if q is None:
+        # Too many streams on this worker. EventSource gives up on a 503,
+        # so the page reopens the stream itself after Retry-After.
+        response = Response(
+            f"retry: {live.RETRY_MS}\n\n",
+            status=503,
+            mimetype="text/event-stream"
+        )
+        response.headers["Retry-After"] = str(live.RETRY_MS // 1000)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    initial = live.current_counts(get_db().cursor())
+
+    # No stream_with_context: the request's pooled connection goes back
+    # as soon as this returns, not when the stream ends.
+    response = Response(
+        live.stream(listener, q, initial),
+        mimetype="text/event-stream"
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+# ------------------ MANAGER DB POOL STATS ------------------
+@app.route("/manager/db-pool")
+def manager_db_pool():
+    if not session.get("manager"):
+        return redirect("/manager")
+
+    # Figures are for the worker process that served this request.
+    return jsonify(db.get_pool().stats())
+
+# ------------------ MANAGER PROFILES ------------------
+@app.route("/manager/profiles")
+def manager_profiles():
+    if not session.get("manager"):
+        return redirect("/manager")
+
+    return render_template(
+        "manager_profiles.html",
+        profiles=profiler.recent(),
+        token=PROFILE_SIGNER.dumps(session["manager"]),
+        token_ttl=PROFILE_TOKEN_TTL,
+        header=PROFILE_HEADER,
+        one_in=profiler.SAMPLE_ONE_IN,
+        endpoints=sorted(profiler.ENDPOINTS)
+    )
+
+@app.route("/manager/profiles/<name>")
+def manager_profile_file(name):
+    if not session.get("manager"):
+        return redirect("/manager")
+
+    document = profiler.load(name)
+    if document is None:
+        return "Profile not found", 404
+
+    if request.args.get("format") == "collapsed":
+        return Response(
+            profiler.collapsed(document),
+            mimetype="text/plain",
+            headers={"Content-Disposition": f"attachment; filename={name[:-len(profiler.SUFFIX)]}.collapsed.txt"}
+        )
+
+    return Response(
+        json.dumps(document),
+        mimetype="application/json",
+        headers={"Content-Disposition": f"attachment; filename={name}"}
+    )
+
+# ------------------ PROMETHEUS METRICS ------------------
+# Open to a logged-in manager, or to a scraper presenting METRICS_TOKEN
+# as a bearer token. Without METRICS_TOKEN only managers can read it.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+@app.route("/metrics")
+def prometheus_metrics():
+    auth = request.headers.get("Authorization", "")
+    token_ok = (
+        METRICS_TOKEN
+        and auth.startswith("Bearer ")
+        and hmac.compare_digest(auth[len("Bearer "):].encode(), METRICS_TOKEN.encode())
+    )
+
+    if not (token_ok or session.get("manager")):
+        return Response("Forbidden\n", status=403, mimetype="text/plain")
+
+    response = Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
 # ------------------ MANAGER LOGIN ------------------
 @app.route("/manager", methods=["GET", "POST"])
 def manager_login():
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT username, password FROM users")
-    users = {row["username"]: row["password"] for row in cur.fetchall()}
-    conn.close()
 
     if request.method == "POST" and "manager_name" in request.form and "password" not in request.form:
         manager_name = request.form.get("manager_name")
         username = f"manager_{manager_name}"
         session["temp_manager"] = username
 
-        if username in users:
+        if get_user(username):
             return render_template("manager_login.html", step="password")
         return render_template("manager_login.html", step="create")
 
@@ -260,7 +1143,9 @@ def manager_login():
         username = session.get("temp_manager")
         password = request.form.get("password")
 
-        if username not in users:
+        user = get_login_user(username)
+
+        if not user:
             conn = get_db()
             cur = conn.cursor()
             cur.execute(
@@ -268,13 +1153,13 @@ def manager_login():
                 (username, password)
             )
             conn.commit()
-            conn.close()
+            invalidate_user(username)
 
             session["manager"] = username
             session.pop("temp_manager")
             return redirect("/manager/dashboard")
 
-        if users[username] == password:
+        if user["password"] == password:
             session["manager"] = username
             session.pop("temp_manager")
             return redirect("/manager/dashboard")
@@ -323,8 +1208,6 @@ def leave():
         if leave_type in ["weeklyoff", "holiday"]:
             reason = ""
 
-        selected_dates = []
-
         # ---------------- Single Date Types ----------------
         if leave_type in [
             "single",
@@ -338,10 +1221,9 @@ def leave():
 
             if not d:
                 flash("❌ Please select a date.")
-                conn.close()
                 return redirect("/leave")
 
-            selected_dates = [d]
+            d1 = d2 = datetime.strptime(d, "%Y-%m-%d").date()
             dates_text = d
 
         # ---------------- Multiple Leave ----------------
@@ -352,61 +1234,42 @@ def leave():
 
             if not from_date or not to_date:
                 flash("❌ Please select From and To dates.")
-                conn.close()
                 return redirect("/leave")
 
-            d1 = datetime.strptime(from_date, "%Y-%m-%d")
-            d2 = datetime.strptime(to_date, "%Y-%m-%d")
+            d1 = datetime.strptime(from_date, "%Y-%m-%d").date()
+            d2 = datetime.strptime(to_date, "%Y-%m-%d").date()
 
             if d2 < d1:
                 flash("❌ To Date cannot be before From Date.")
-                conn.close()
                 return redirect("/leave")
 
-            while d1 <= d2:
-                selected_dates.append(d1.strftime("%Y-%m-%d"))
-                d1 += timedelta(days=1)
-
             dates_text = f"{from_date} to {to_date}"
 
         else:
             flash("❌ Invalid Leave Type.")
-            conn.close()
             return redirect("/leave")
 
         # ---------------- Duplicate Validation ----------------
+        # Serialise leave submissions per employee, as activity() does, so
+        # two requests cannot both pass the overlap check before either
+        # has inserted. Held until the commit (or the rollback on return).
+        cur.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s))",
+            (f"leave:{username}",)
+        )
+
         cur.execute("""
-            SELECT leave_dates
+            SELECT 1
             FROM leave_requests
-            WHERE username=%s
+            WHERE username = %s
               AND status IN (0,2)
-        """, (username,))
-
-        existing = cur.fetchall()
-
-        for row in existing:
-
-            booked = []
-            txt = row["leave_dates"]
-
-            if "to" in txt:
-
-                s, e = txt.split(" to ")
-
-                d1 = datetime.strptime(s, "%Y-%m-%d")
-                d2 = datetime.strptime(e, "%Y-%m-%d")
-
-                while d1 <= d2:
-                    booked.append(d1.strftime("%Y-%m-%d"))
-                    d1 += timedelta(days=1)
-
-            else:
-                booked.append(txt)
+              AND leave_range && daterange(%s, %s, '[]')
+            LIMIT 1
+        """, (username, d1, d2))
 
-            if set(booked) & set(selected_dates):
-                flash("🚫 Leave already exists for selected date(s).")
-                conn.close()
-                return redirect("/leave")
+        if cur.fetchone():
+            flash("🚫 Leave already exists for selected date(s).")
+            return redirect("/leave")
 
         # ---------------- Auto Approval ----------------
         if leave_type in ["weeklyoff", "holiday"]:
@@ -420,51 +1283,69 @@ def leave():
                 username,
                 leave_type,
                 leave_dates,
+                from_date,
+                to_date,
                 status,
                 requested_on,
                 reason
             )
             VALUES
             (
-                %s,%s,%s,%s,%s,%s
+                %s,%s,%s,%s,%s,%s,%s,%s
             )
         """, (
             username,
             leave_type,
             dates_text,
+            d1,
+            d2,
             status,
             datetime.now().strftime("%Y-%m-%d %H:%M"),
             reason
         ))
 
+        if status == 0:
+            live.notify(cur, "leave")
+
         conn.commit()
 
+        # Only approved leave shows on the manager dashboard.
+        if status == 2:
+            dashboard_cache.invalidate(d1, d2)
+        metrics.inc(
+            "daily_tracker_leave_requests_handled_total",
+            action="submitted" if status == 0 else "auto_approved"
+        )
+
         flash("✅ Leave submitted successfully.")
 
     # ---------------- History ----------------
-    cur.execute("""
-        SELECT
-            id,
-            leave_type,
-            leave_dates,
-            reason,
-            requested_on,
-            status
-        FROM leave_requests
-        WHERE username=%s
-        ORDER BY id DESC
-    """, (username,))
-
-    history = cur.fetchall()
-
-    conn.close()
+    try:
+        history, next_cursor = leave_history_page(cur, username, request.args.get("cursor"))
+    except ValueError:
+        history, next_cursor = leave_history_page(cur, username)
 
     return render_template(
         "leave.html",
         history=history,
+        next_cursor=next_cursor,
         is_comp_off_eligible=is_comp_off_eligible
     )
 
+@app.route("/leave/history")
+def leave_history_rows():
+    if "username" not in session:
+        return redirect("/employee")
+
+    try:
+        history, next_cursor = leave_history_page(
+            get_db().cursor(), session["username"], request.args.get("cursor")
+        )
+    except ValueError:
+        return "Invalid cursor", 400
+
+    return rows_fragment("leave_history_rows.html", next_cursor, history=history)
+
 # ------------------ CANCEL LEAVE ------------------
 @app.route("/cancel-leave", methods=["POST"])
 def cancel_leave():
@@ -478,7 +1359,7 @@ def cancel_leave():
     cur = conn.cursor()
 
     cur.execute("""
-        SELECT leave_type, status
+        SELECT leave_type, status, from_date, to_date
         FROM leave_requests
         WHERE id=%s
           AND username=%s
@@ -487,12 +1368,10 @@ def cancel_leave():
     leave = cur.fetchone()
 
     if not leave:
-        conn.close()
         flash("❌ Leave request not found.")
         return redirect("/leave")
 
     if leave["status"] not in (0, 2):
-        conn.close()
         flash("❌ Only Pending or Approved leave can be cancelled.")
         return redirect("/leave")
 
@@ -503,8 +1382,14 @@ def cancel_leave():
           AND username=%s
     """, (leave_id, username))
 
+    if leave["status"] == 0:
+        live.notify(cur, "leave")
+
     conn.commit()
-    conn.close()
+
+    if leave["status"] == 2 and leave["from_date"]:
+        dashboard_cache.invalidate(leave["from_date"], leave["to_date"])
+    metrics.inc("daily_tracker_leave_requests_handled_total", action="cancelled")
 
     flash("🗑 Leave cancelled successfully.")
     return redirect("/leave")
@@ -516,25 +1401,31 @@ def manager_leave_requests():
     if "manager" not in session:
         return redirect("/manager")
 
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT *
-        FROM leave_requests
-        WHERE status = 0
-        ORDER BY requested_on ASC
-    """)
-
-    requests = cur.fetchall()
+    cur = get_db().cursor()
 
-    conn.close()
+    try:
+        requests, next_cursor = pending_leave_page(cur, request.args.get("cursor"))
+    except ValueError:
+        requests, next_cursor = pending_leave_page(cur)
 
     return render_template(
         "manager_leave_requests.html",
-        requests=requests
+        requests=requests,
+        next_cursor=next_cursor
     )
 
+@app.route("/manager/leave-requests/rows")
+def manager_leave_request_rows():
+    if "manager" not in session:
+        return redirect("/manager")
+
+    try:
+        requests, next_cursor = pending_leave_page(get_db().cursor(), request.args.get("cursor"))
+    except ValueError:
+        return "Invalid cursor", 400
+
+    return rows_fragment("manager_leave_request_rows.html", next_cursor, requests=requests)
+
 # ------------------ MANAGER APPROVE / REJECT ------------------
 @app.route("/manager/handle-leave", methods=["POST"])
 def handle_leave():
@@ -548,7 +1439,7 @@ def handle_leave():
     cur = conn.cursor()
 
     cur.execute("""
-        SELECT leave_type
+        SELECT leave_type, status, from_date, to_date
         FROM leave_requests
         WHERE id = %s
     """, (leave_id,))
@@ -556,7 +1447,6 @@ def handle_leave():
     leave = cur.fetchone()
 
     if not leave:
-        conn.close()
         return redirect("/manager/leave-requests")
 
     leave_type = (leave["leave_type"] or "").lower()
@@ -579,9 +1469,173 @@ def handle_leave():
         WHERE id = %s
     """, (status, leave_id))
 
+    if leave["status"] == 0:
+        live.notify(cur, "leave")
+
+    conn.commit()
+
+    if 2 in (status, leave["status"]) and leave["from_date"]:
+        dashboard_cache.invalidate(leave["from_date"], leave["to_date"])
+    metrics.inc(
+        "daily_tracker_leave_requests_handled_total",
+        action="approved" if status == 2 else "rejected"
+    )
+
+    return redirect("/manager/leave-requests")
+
+# ------------------ MANAGER BULK APPROVE / REJECT ------------------
+# Applies one action to many pending requests in a single UPDATE, picked
+# either by id or by a filter (employee, leave type, dates overlapping a
+# period). Only pending requests change; every requested id gets an
+# outcome. Accepts a form post or a JSON body and answers in kind.
+LEAVE_ACTIONS = {"approve": (2, "approved"), "reject": (3, "rejected")}
+
+def wants_json():
+    return request.is_json or request.accept_mimetypes.best == "application/json"
+
+def bulk_error(message, back):
+    if wants_json():
+        return api_error(message, 400)
+    flash(f"❌ {message}")
+    return redirect(back)
+
+# The request's parameters and the list picked by `key` (JSON) or the
+# repeated `form_key` field. The list is None when a JSON body sends
+# anything but a list there: a string would otherwise be walked one
+# character at a time.
+def bulk_params(key, form_key):
+    if request.is_json:
+        params = request.get_json(silent=True)
+        if not isinstance(params, dict):
+            params = {}
+        values = params.get(key)
+        if values is None:
+            return params, []
+        return params, values if isinstance(values, list) else None
+    return request.form, request.form.getlist(form_key)
+
+# leave_requests.id is an integer column; anything outside it would fail
+# the ::int[] cast in Postgres instead of getting a 400 here.
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+@app.route("/manager/leave-requests/bulk", methods=["POST"])
+def bulk_handle_leave():
+    if "manager" not in session:
+        if wants_json():
+            return api_error("Manager login required", 401)
+        return redirect("/manager")
+
+    params, ids = bulk_params("ids", "id")
+
+    if ids is None:
+        return bulk_error("Request ids must be a list.", "/manager/leave-requests")
+
+    action = params.get("action")
+    if action not in LEAVE_ACTIONS:
+        return bulk_error("Choose approve or reject.", "/manager/leave-requests")
+
+    status, outcome = LEAVE_ACTIONS[action]
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    if ids:
+        try:
+            ids = sorted({int(i) for i in ids})
+        except (TypeError, ValueError):
+            return bulk_error("Request ids must be numbers.", "/manager/leave-requests")
+
+        if ids[0] < INT32_MIN or ids[-1] > INT32_MAX:
+            return bulk_error("Request ids are out of range.", "/manager/leave-requests")
+
+        # The outer join reads the rows as they were before the UPDATE,
+        # which is what explains an id that was not changed.
+        cur.execute("""
+            WITH requested AS (
+                SELECT UNNEST(%s::int[]) AS id
+            ),
+            updated AS (
+                UPDATE leave_requests l
+                SET status = %s
+                FROM requested r
+                WHERE l.id = r.id
+                  AND l.status = 0
+                RETURNING l.id, l.from_date, l.to_date
+            )
+            SELECT
+                r.id,
+                u.id IS NOT NULL AS updated,
+                l.status,
+                u.from_date,
+                u.to_date
+            FROM requested r
+            LEFT JOIN updated u ON u.id = r.id
+            LEFT JOIN leave_requests l ON l.id = r.id
+            ORDER BY r.id
+        """, (ids, status))
+
+    else:
+        try:
+            date_from = params.get("from") or None
+            date_to = params.get("to") or date_from
+            if date_from:
+                date_from = datetime.strptime(date_from, "%Y-%m-%d").date()
+                date_to = datetime.strptime(date_to, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return bulk_error("Dates must be YYYY-MM-DD.", "/manager/leave-requests")
+
+        username = params.get("username") or None
+        leave_type = (params.get("leave_type") or "").strip().lower() or None
+
+        # An empty filter would match the whole queue; ask for it by id.
+        if not (date_from or username or leave_type):
+            return bulk_error("Select requests, or filter by employee, type or dates.", "/manager/leave-requests")
+
+        cur.execute("""
+            UPDATE leave_requests
+            SET status = %(status)s
+            WHERE status = 0
+              AND (%(username)s::text IS NULL OR username = %(username)s)
+              AND (%(leave_type)s::text IS NULL OR LOWER(TRIM(leave_type)) = %(leave_type)s)
+              AND (%(from)s::date IS NULL OR leave_range && daterange(%(from)s, %(to)s, '[]'))
+            RETURNING id, TRUE AS updated, 0 AS status, from_date, to_date
+        """, {
+            "status": status,
+            "username": username,
+            "leave_type": leave_type,
+            "from": date_from,
+            "to": date_to
+        })
+
+    rows = cur.fetchall()
+    if any(r["updated"] for r in rows):
+        live.notify(cur, "leave")
     conn.commit()
-    conn.close()
 
+    if status == 2:
+        dashboard_cache.invalidate_ranges(
+            (r["from_date"], r["to_date"]) for r in rows if r["updated"] and r["from_date"]
+        )
+
+    results = []
+    for r in rows:
+        if r["updated"]:
+            result = outcome
+        elif r["status"] is None:
+            result = "not_found"
+        else:
+            result = "not_pending"
+        results.append({"id": r["id"], "outcome": result})
+
+    changed = sum(1 for r in results if r["outcome"] == outcome)
+    if changed:
+        metrics.inc("daily_tracker_leave_requests_handled_total", changed, action=outcome)
+
+    if wants_json():
+        return jsonify({"action": action, "updated": changed, "results": results})
+
+    skipped = len(results) - changed
+    flash(f"{changed} request(s) {outcome}" + (f", {skipped} skipped" if skipped else "") + ".")
     return redirect("/manager/leave-requests")
 
 # ------------------ ACTIVITY ------------------
@@ -603,35 +1657,7 @@ def activity():
 
     # ---------------- FIND LAST ALLOWED WORKING DATE ----------------
 
-    leave_dates = set()
-
-    cur.execute("""
-        SELECT leave_dates
-        FROM leave_requests
-        WHERE username = %s
-          AND status = 2
-    """, (username,))
-
-    approved = cur.fetchall()
-
-    for row in approved:
-        txt = row["leave_dates"]
-
-        if "to" in txt:
-            s, e = txt.split(" to ")
-            d1 = datetime.strptime(s, "%Y-%m-%d").date()
-            d2 = datetime.strptime(e, "%Y-%m-%d").date()
-
-            while d1 <= d2:
-                leave_dates.add(d1)
-                d1 += timedelta(days=1)
-        else:
-            leave_dates.add(datetime.strptime(txt, "%Y-%m-%d").date())
-
-    allowed_date = today - timedelta(days=1)
-
-    while allowed_date in leave_dates:
-        allowed_date -= timedelta(days=1)
+    allowed_date = last_working_day(cur, username, today - timedelta(days=1))
 
     if request.method == "POST":
 
@@ -644,7 +1670,6 @@ def activity():
         end_times = request.form.getlist("end_time[]")
 
         selected_date = datetime.strptime(activity_date, "%Y-%m-%d").date()
-        selected_str = selected_date.strftime("%Y-%m-%d")
 
         form_data = {
             "activity_date": activity_date,
@@ -662,42 +1687,27 @@ def activity():
 
         # ---------------- BLOCK APPROVED LEAVE ----------------
         cur.execute("""
-            SELECT leave_dates
+            SELECT 1
             FROM leave_requests
             WHERE username = %s
               AND status = 2
-        """, (username,))
-        approved_leaves = cur.fetchall()
-
-        for r in approved_leaves:
-            txt = r["leave_dates"]
-            leave_days = []
-
-            if "to" in txt:
-                s, e = txt.split(" to ")
-                d1 = datetime.strptime(s, "%Y-%m-%d")
-                d2 = datetime.strptime(e, "%Y-%m-%d")
-                while d1 <= d2:
-                    leave_days.append(d1.strftime("%Y-%m-%d"))
-                    d1 += timedelta(days=1)
-            else:
-                leave_days.append(txt)
+              AND leave_range @> %s::date
+            LIMIT 1
+        """, (username, selected_date))
 
-            if selected_str in leave_days:
-                flash("⛔ You are on approved leave for this date. Activity not allowed.")
-                conn.close()
-                return render_template(
-                    "activity.html",
-                    selected=username,
-                    max_date=today.isoformat(),
-                    min_date=allowed_date.isoformat(),
-                    form_data=form_data
-                )
+        if cur.fetchone():
+            flash("⛔ You are on approved leave for this date. Activity not allowed.")
+            return render_template(
+                "activity.html",
+                selected=username,
+                max_date=today.isoformat(),
+                min_date=allowed_date.isoformat(),
+                form_data=form_data
+            )
 
         # ---------------- BLOCK FUTURE / OLD DATE ----------------
         if selected_date > today:
             flash("⛔ Future date is not allowed.")
-            conn.close()
             return render_template(
                 "activity.html",
                 selected=username,
@@ -708,7 +1718,6 @@ def activity():
 
         if selected_date < allowed_date:
             flash(f"⛔ You can submit only for {allowed_date.strftime('%d-%m-%Y')} or today.")
-            conn.close()
             return render_template(
                 "activity.html",
                 selected=username,
@@ -717,30 +1726,9 @@ def activity():
                 form_data=form_data
             )
 
-        # ---------------- FIX CLOCK-IN (FIRST TIME ONLY) ----------------
-        cur.execute("""
-            SELECT clock_in
-            FROM activities
-            WHERE username = %s
-              AND activity_date = %s
-            ORDER BY submitted_at ASC
-            LIMIT 1
-        """, (username, activity_date))
-
-        first_entry = cur.fetchone()
-
-        if first_entry and first_entry["clock_in"]:
-            clock_in = first_entry["clock_in"]
-
-        # ---------------- FORCE CLOCK-OUT (LAST SUBMISSION WINS) ----------------
-        cur.execute("""
-            UPDATE activities
-            SET clock_out = %s
-            WHERE username = %s
-              AND activity_date = %s
-        """, (clock_out, username, activity_date))
+        # ---------------- VALIDATE SUBMITTED ROWS ----------------
+        submitted = []
 
-        # ---------------- PROCESS ACTIVITIES ----------------
         for i in range(len(activity_names)):
 
             if not activity_names[i].strip():
@@ -751,7 +1739,6 @@ def activity():
 
             if end_t <= start_t:
                 flash("⛔ End time must be after start time")
-                conn.close()
                 return render_template(
                     "activity.html",
                     selected=username,
@@ -763,7 +1750,6 @@ def activity():
             if selected_date == today:
                 if start_t > now_time or end_t > now_time:
                     flash("⛔ Activity start or end time cannot be in the future")
-                    conn.close()
                     return render_template(
                         "activity.html",
                         selected=username,
@@ -772,74 +1758,100 @@ def activity():
                         form_data=form_data
                     )
 
-            # ---------------- PREVENT OVERLAPPING ACTIVITIES ----------------
-            cur.execute("""
-                SELECT start_time, end_time
-                FROM activities
-                WHERE username = %s
-                  AND activity_date = %s
-            """, (username, activity_date))
+            submitted.append((activity_names[i], start_t, end_t))
 
-            existing_rows = cur.fetchall()
+        # ---------------- EXISTING ROWS FOR THE DAY ----------------
+        # Serialise submissions for the same employee and day, so two tabs
+        # cannot both pass the overlap check before either has written.
+        cur.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s))",
+            (f"activity:{username}:{selected_date}",)
+        )
 
-            for existing in existing_rows:
-                ex_start = datetime.combine(selected_date, existing["start_time"])
-                ex_end = datetime.combine(selected_date, existing["end_time"])
-                new_start = datetime.combine(selected_date, start_t)
-                new_end = datetime.combine(selected_date, end_t)
+        cur.execute("""
+            SELECT start_time, end_time, clock_in
+            FROM activities
+            WHERE username = %s
+              AND activity_date = %s
+            ORDER BY submitted_at ASC
+        """, (username, selected_date))
 
-                if new_start < ex_end and new_end > ex_start:
-                    flash("⛔ Activity time overlaps with existing activity")
-                    conn.close()
-                    return render_template(
-                        "activity.html",
-                        selected=username,
-                        max_date=today.isoformat(),
-                        min_date=allowed_date.isoformat(),
-                        form_data=form_data
-                    )
+        existing_rows = cur.fetchall()
 
-            duration = int(
-                (
-                    datetime.combine(selected_date, end_t)
-                    - datetime.combine(selected_date, start_t)
-                ).total_seconds() / 60
-            )
+        # Clock-in is fixed by the first submission of the day.
+        if existing_rows and existing_rows[0]["clock_in"]:
+            clock_in = existing_rows[0]["clock_in"]
 
-            cur.execute("""
-                DELETE FROM activities
-                WHERE username = %s
-                  AND activity_date = %s
-                  AND start_time = %s
-                  AND end_time = %s
-            """, (
-                username,
-                activity_date,
-                start_times[i],
-                end_times[i]
-            ))
+        # ---------------- PREVENT OVERLAPPING ACTIVITIES ----------------
+        # Resubmitting an identical slot replaces it, so it is not checked
+        # against itself.
+        new_slots = {(start_t, end_t) for _, start_t, end_t in submitted}
+        stored_slots = {(r["start_time"], r["end_time"]) for r in existing_rows}
+        replaced = new_slots & stored_slots
 
-            cur.execute("""
-                INSERT INTO activities (
-                    username, activity_date, clock_in,
-                    activity_name, start_time, end_time,
-                    duration, clock_out, submitted_at
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
+        if find_overlap(stored_slots - replaced, [(st, et) for _, st, et in submitted]):
+            flash("⛔ Activity time overlaps with existing activity")
+            return render_template(
+                "activity.html",
+                selected=username,
+                max_date=today.isoformat(),
+                min_date=allowed_date.isoformat(),
+                form_data=form_data
+            )
+
+        # ---------------- FORCE CLOCK-OUT (LAST SUBMISSION WINS) ----------------
+        cur.execute("""
+            UPDATE activities
+            SET clock_out = %s
+            WHERE username = %s
+              AND activity_date = %s
+        """, (clock_out, username, selected_date))
+
+        # ---------------- WRITE THE BATCH ----------------
+        # A resubmitted slot (same user, day, start and end) is updated in
+        # place; activities_slot_key makes that atomic across tabs.
+        submitted_at = datetime.now(pytz.timezone("Asia/Kolkata"))
+
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO activities (
+                username, activity_date, clock_in,
+                activity_name, start_time, end_time,
+                duration, clock_out, submitted_at
+            )
+            VALUES %s
+            ON CONFLICT ON CONSTRAINT activities_slot_key DO UPDATE
+            SET clock_in = EXCLUDED.clock_in,
+                activity_name = EXCLUDED.activity_name,
+                duration = EXCLUDED.duration,
+                clock_out = EXCLUDED.clock_out,
+                submitted_at = EXCLUDED.submitted_at
+        """, [
+            (
                 username,
-                activity_date,
+                selected_date,
                 clock_in,
-                activity_names[i],
-                start_times[i],
-                end_times[i],
-                duration,
+                name,
+                start_t,
+                end_t,
+                int(
+                    (
+                        datetime.combine(selected_date, end_t)
+                        - datetime.combine(selected_date, start_t)
+                    ).total_seconds() / 60
+                ),
                 clock_out,
-                datetime.now(pytz.timezone("Asia/Kolkata"))
-            ))
+                submitted_at
+            )
+            for name, start_t, end_t in submitted
+        ], page_size=1000)
+
+        # ---------------- DAILY SUMMARY (SAME TRANSACTION) ----------------
+        summary.refresh_day(cur, username, selected_date)
 
         conn.commit()
-        conn.close()
+        dashboard_cache.invalidate(selected_date)
+        dashboard_cache.invalidate_years(username)
+        metrics.inc("daily_tracker_activity_rows_written_total", len(submitted))
 
         return redirect("/success")
 
@@ -859,216 +1871,45 @@ def success():
     return render_template("success.html")
 
 # ------------------ LOGOUT ------------------
-@app.route("/logout")
-def logout():
-    session.clear()
-    return redirect("/")
-
-# ------------------ MANAGER DASHBOARD ------------------
-@app.route("/manager/dashboard")
-def manager_dashboard():
-    if "manager" not in session:
-        return redirect("/manager")
-
-    from datetime import datetime, timedelta
-
-    conn = get_db()
-    cur = conn.cursor()
-
-    # ---------------- FILTERS ----------------
-    selected_month = request.args.get("month", datetime.now().strftime("%m"))
-    selected_year = request.args.get("year", datetime.now().strftime("%Y"))
-    years = ["2024", "2025", "2026"]
-
-    # ---------------- RESET REQUEST COUNT ----------------
-    cur.execute("SELECT COUNT(*) AS count FROM users WHERE reset_requested = 1")
-    pending_count = cur.fetchone()["count"]
-
-    # ---------------- LEAVE REQUEST COUNT ----------------
-    cur.execute("SELECT COUNT(*) AS count FROM leave_requests WHERE status = 0")
-    leave_pending_count = cur.fetchone()["count"]
-
-    # ---------------- PRODUCTIVITY ----------------
-    cur.execute("""
-        SELECT
-            username,
-            SUM(duration) AS productive_minutes,
-            COUNT(DISTINCT activity_date) AS days
-        FROM activities
-        WHERE TO_CHAR(activity_date, 'MM') = %s
-          AND TO_CHAR(activity_date, 'YYYY') = %s
-        GROUP BY username
-    """, (selected_month, selected_year))
-
-    activity_rows = cur.fetchall()
-
-    # ---------------- APPROVED LEAVES ----------------
-    cur.execute("""
-        SELECT
-            username,
-            leave_type,
-            leave_dates
-        FROM leave_requests
-        WHERE status = 2
-    """)
-
-    leave_rows = cur.fetchall()
-
-    conn.close()
-
-    # ---------------- LEAVE MAPS ----------------
-    leave_map = {}
-    compoff_map = {}
-    weeklyoff_map = {}
-
-    selected_month_int = int(selected_month)
-    selected_year_int = int(selected_year)
-
-    for r in leave_rows:
-
-        user = r["username"]
-        leave_type = (r["leave_type"] or "").strip().lower()
-        dates = (r["leave_dates"] or "").strip()
-
-        def process_day(current_date):
-
-            value = 0.5 if leave_type == "halfday" else 1
-
-            if leave_type == "compoff":
-                compoff_map[user] = compoff_map.get(user, 0) + value
-
-            elif leave_type in ["weekly off", "weeklyoff", "holiday"]:
-                weeklyoff_map[user] = weeklyoff_map.get(user, 0) + value
-
-            else:
-                leave_map[user] = leave_map.get(user, 0) + value
-
-        # -------- SINGLE DATE --------
-        if "to" not in dates:
-
-            try:
-                d = datetime.strptime(dates, "%Y-%m-%d")
-
-                if d.month == selected_month_int and d.year == selected_year_int:
-                    process_day(d)
-
-            except:
-                pass
-
-        # -------- DATE RANGE --------
-        else:
-
-            try:
-                start, end = dates.split(" to ")
-
-                current = datetime.strptime(start.strip(), "%Y-%m-%d")
-                last = datetime.strptime(end.strip(), "%Y-%m-%d")
-
-                while current <= last:
-
-                    if (
-                        current.month == selected_month_int
-                        and current.year == selected_year_int
-                    ):
-                        process_day(current)
-
-                    current += timedelta(days=1)
-
-            except:
-                pass
-
-    # ---------------- FINAL DATA ----------------
-    data = []
-
-    total_productive_all = 0
-    total_available_all = 0
-    total_available_with_leave_all = 0
-
-    for r in activity_rows:
-
-        username = r["username"]
-
-        productive_hours = round((r["productive_minutes"] or 0) / 60.0, 2)
-
-        working_days = r["days"] or 0
-
-        leave_days = leave_map.get(username, 0)
-
-        compoff_days = compoff_map.get(username, 0)
-
-        weeklyoff_days = weeklyoff_map.get(username, 0)
-
-        half_days = 0
-
-        if leave_days % 1 != 0:
-            half_days = 1
-
-        # ---------------- HOURS ----------------
-        available_hours = working_days * 7
-
-        # Only actual Leave affects productivity.
-        # Weekly Off & Comp-Off are treated as Non Working Days.
-        available_hours_with_leave = (working_days + leave_days) * 7
+@app.route("/logout")
+def logout():
+    session.clear()
+    return redirect("/")
 
-        ideal_hours = max(available_hours - productive_hours, 0)
-        ideal_hours = round(ideal_hours, 2)
+# ------------------ MANAGER DASHBOARD ------------------
+@app.route("/manager/dashboard")
+def manager_dashboard():
+    if "manager" not in session:
+        return redirect("/manager")
 
-        productivity = (
-            (productive_hours / available_hours) * 100
-            if available_hours > 0 else 0
-        )
-        productivity = round(productivity, 1)
+    from datetime import datetime
 
-        productivity_with_leave = (
-            (productive_hours / available_hours_with_leave) * 100
-            if available_hours_with_leave > 0 else 0
-        )
-        productivity_with_leave = round(productivity_with_leave, 1)
+    conn = get_db()
+    cur = conn.cursor()
 
-        total_productive_all += productive_hours
-        total_available_all += available_hours
-        total_available_with_leave_all += available_hours_with_leave
+    # ---------------- FILTERS ----------------
+    selected_month = request.args.get("month", datetime.now().strftime("%m"))
+    selected_year = request.args.get("year", datetime.now().strftime("%Y"))
+    years = ["2024", "2025", "2026"]
 
-        data.append({
-            "name": username,
-            "productive": productive_hours,
-            "days": working_days,
-            "available": available_hours,
-            "available_with_leave": available_hours_with_leave,
-            "ideal": ideal_hours,
-            "productivity": productivity,
-            "productivity_with_leave": productivity_with_leave,
-            "leave_days": leave_days,
-            "compoff_days": compoff_days,
-            "weeklyoff_days": weeklyoff_days,
-            "half_days": half_days
-        })
+    month_start, next_month = month_bounds(selected_month, selected_year)
 
-    overall_productivity = (
-        (total_productive_all / total_available_all) * 100
-        if total_available_all > 0 else 0
-    )
-    overall_productivity = round(overall_productivity, 1)
+    # ---------------- PENDING REQUEST COUNTS ----------------
+    # Same source as the live stream: free while this worker is listening.
+    counts = live.current_counts(cur)
 
-    overall_productivity_with_leave = (
-        (total_productive_all / total_available_with_leave_all) * 100
-        if total_available_with_leave_all > 0 else 0
-    )
-    overall_productivity_with_leave = round(
-        overall_productivity_with_leave,
-        1
-    )
+    results = dashboard_results(cur, month_start, next_month)
 
     return render_template(
         "manager_dashboard.html",
-        data=data,
-        pending_count=pending_count,
-        leave_pending_count=leave_pending_count,
+        data=results["data"],
+        pending_count=counts["reset_requests"],
+        leave_pending_count=counts["leave_requests"],
         selected_month=selected_month,
         selected_year=selected_year,
         years=years,
-        overall_productivity=overall_productivity,
-        overall_productivity_with_leave=overall_productivity_with_leave
+        overall_productivity=results["overall_productivity"],
+        overall_productivity_with_leave=results["overall_productivity_with_leave"]
     )
 
 # ------------------ MANAGER EMPLOYEE DETAIL ------------------
@@ -1093,13 +1934,12 @@ def manager_employee_detail(username):
         SELECT activity_date, activity_name, start_time, end_time, submitted_at
         FROM activities
         WHERE username = %s
-          AND TO_CHAR(activity_date, 'MM') = %s
-          AND TO_CHAR(activity_date, 'YYYY') = %s
+          AND activity_date >= %s
+          AND activity_date < %s
         ORDER BY activity_date, start_time
-    """, (username, selected_month, selected_year))
+    """, (username, *month_bounds(selected_month, selected_year)))
 
     rows = cur.fetchall()
-    conn.close()
 
     grouped = {}
     for r in rows:
@@ -1137,103 +1977,187 @@ def export_employee_pdf(username):
     month = request.args.get("month")
     year = request.args.get("year")
 
+    try:
+        month_start, next_month = month_bounds(month, year)
+    except (TypeError, ValueError):
+        return "Invalid month", 400
+
     conn = get_db()
     cur = conn.cursor()
 
+    # Data version of exactly the rows the PDF shows. Cheap next to a
+    # render, and it changes whenever any of those rows do.
     cur.execute("""
-        SELECT activity_date, activity_name,
-               start_time, end_time, submitted_at
+        SELECT COUNT(*) AS row_count,
+               md5(COALESCE(string_agg(
+                   concat_ws('|', activity_date, activity_name,
+                             start_time, end_time, submitted_at),
+                   E'\\n' ORDER BY activity_date, start_time, end_time
+               ), '')) AS digest
         FROM activities
         WHERE username = %s
-          AND TO_CHAR(activity_date, 'MM') = %s
-          AND TO_CHAR(activity_date, 'YYYY') = %s
-        ORDER BY activity_date, start_time
-    """, (username, month, year))
+          AND activity_date >= %s
+          AND activity_date < %s
+    """, (username, month_start, next_month))
 
-    rows = cur.fetchall()
-    conn.close()
+    version = cur.fetchone()
+    cache_key = pdf_cache.key(
+        username, month, year, f"{version['row_count']}:{version['digest']}"
+    )
 
     month_name = datetime.strptime(month, "%m").strftime("%B")
     filename = f"{username}_{month_name}_{year}_Activities.pdf"
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=30,
-        leftMargin=30,
-        topMargin=30,
-        bottomMargin=30
-    )
+    if request.if_none_match.contains(cache_key):
+        response = Response(status=304)
+        response.set_etag(cache_key)
+    else:
+        body = pdf_cache.get(cache_key)
+        metrics.inc("daily_tracker_pdf_requests_total", result="miss" if body is None else "hit")
 
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Header
-    elements.append(Paragraph(f"<b>Employee Activity Report</b>", styles["Heading1"]))
-    elements.append(Spacer(1, 0.3 * inch))
-    elements.append(Paragraph(f"<b>Employee:</b> {username}", styles["Normal"]))
-    elements.append(Paragraph(f"<b>Month:</b> {month_name} {year}", styles["Normal"]))
-    elements.append(Spacer(1, 0.4 * inch))
-
-    # Table header
-    data = [[
-        "Date",
-        "Activity",
-        "Start",
-        "End",
-        "Submitted"
-    ]]
+        if body is None:
+            cur.execute("""
+                SELECT activity_date, activity_name,
+                       start_time, end_time, submitted_at
+                FROM activities
+                WHERE username = %s
+                  AND activity_date >= %s
+                  AND activity_date < %s
+                ORDER BY activity_date, start_time
+            """, (username, month_start, next_month))
+
+            rows = cur.fetchall()
+
+            # ReportLab is imported on the first render, not when a worker
+            # starts: most workers never draw a PDF.
+            import pdf_reports
+
+            started = time.perf_counter()
+            pdf, _ = pdf_reports.render_employee_pdf(username, month_name, year, rows)
+            metrics.observe("daily_tracker_pdf_render_seconds", time.perf_counter() - started)
+            metrics.observe("daily_tracker_pdf_bytes", len(pdf))
+
+            pdf_cache.put(cache_key, pdf)
+            body = BytesIO(pdf)
+
+        response = send_file(
+            body,
+            as_attachment=True,
+            download_name=filename,
+            mimetype="application/pdf",
+            etag=cache_key,
+            conditional=True,
+            last_modified=None
+        )
 
-    for r in rows:
+    # Always revalidate: the ETag makes that a single cheap query. Sent on
+    # the 304 as well, or a shared cache could keep the body it revalidated.
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
-        activity_date = r["activity_date"].strftime("%d-%b-%Y") if r["activity_date"] else "-"
-        start = r["start_time"].strftime("%H:%M") if r["start_time"] else "-"
-        end = r["end_time"].strftime("%H:%M") if r["end_time"] else "-"
+# ------------------ TEAM MONTH PACK ------------------
+@app.route("/manager/team-pack", methods=["POST"])
+def start_team_pack():
 
-        if r["submitted_at"]:
-            try:
-                submitted = r["submitted_at"].strftime("%d-%b-%Y %I:%M %p")
-            except:
-                submitted = str(r["submitted_at"])
-        else:
-            submitted = "-"
-
-        data.append([
-            activity_date,
-            Paragraph(r["activity_name"], styles["Normal"]),
-            start,
-            end,
-            submitted
-        ])
-
-    table = Table(
-        data,
-        repeatRows=1,
-        colWidths=[80, 200, 60, 60, 100]  # FIXED WIDTHS
-    )
+    if "manager" not in session:
+        return redirect("/manager")
+
+    month = request.form.get("month")
+    year = request.form.get("year")
+    fmt = request.form.get("format", "zip")
+
+    if fmt not in team_pack.FORMATS:
+        return jsonify({"error": "Unsupported format"}), 400
+
+    try:
+        month_start, next_month = month_bounds(month, year)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid month"}), 400
+
+    cur = get_db().cursor()
+    cur.execute("""
+        SELECT username, activity_date, activity_name,
+               start_time, end_time, submitted_at
+        FROM activities
+        WHERE activity_date >= %s
+          AND activity_date < %s
+        ORDER BY username, activity_date, start_time
+    """, (month_start, next_month))
+
+    grouped = {}
+    for r in cur.fetchall():
+        grouped.setdefault(r.pop("username"), []).append(dict(r))
+
+    month_name = month_start.strftime("%B")
+    job_id = team_pack.start(fmt, month_name, year, sorted(grouped.items()))
+
+    return jsonify({
+        "job_id": job_id,
+        "total": len(grouped),
+        "status_url": f"/manager/team-pack/{job_id}",
+        "download_url": f"/manager/team-pack/{job_id}/download"
+    }), 202
+
+@app.route("/manager/team-pack/<job_id>")
+def team_pack_status(job_id):
 
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ALIGN', (2, 1), (3, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    if "manager" not in session:
+        return redirect("/manager")
+
+    state = team_pack.status(job_id)
+    if state is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    return jsonify(state)
+
+@app.route("/manager/team-pack/<job_id>/download")
+def team_pack_download(job_id):
+
+    if "manager" not in session:
+        return redirect("/manager")
 
-    elements.append(table)
-    doc.build(elements)
+    path = team_pack.result_path(job_id)
+    if path is None:
+        return "Pack is not ready", 404
 
-    buffer.seek(0)
+    state = team_pack.status(job_id)
+    ext = "zip" if path.endswith(".zip") else "pdf"
 
     return send_file(
-        buffer,
+        path,
         as_attachment=True,
-        download_name=filename,
-        mimetype="application/pdf"
+        download_name=f"Team_{state['month']}_{state['year']}_Activities.{ext}",
+        mimetype=team_pack.FORMATS[ext]
+    )
+
+# ------------------ EXPORT ALL ACTIVITIES ------------------
+@app.route("/manager/export/activities")
+def export_activities():
+
+    if "manager" not in session:
+        return redirect("/manager")
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in exports.FORMATS:
+        return "Unsupported format", 400
+
+    try:
+        date_from, date_to = export_period(request.args)
+    except ValueError as e:
+        return f"Invalid period: {e}", 400
+
+    username = request.args.get("username") or None
+
+    stream = exports.stream_activities(get_db(), date_from, date_to, fmt, username)
+
+    return Response(
+        stream_with_context(stream),
+        mimetype=exports.FORMATS[fmt],
+        headers={
+            "Content-Disposition": f"attachment; filename=activities_{date_from}_{date_to}.{fmt}",
+            "X-Accel-Buffering": "no"
+        }
     )
 
 # ------------------ REPORT ------------------
@@ -1259,207 +2183,251 @@ def report():
     conn = get_db()
     cur = conn.cursor()
 
-    # -------- FETCH ALL ACTIVITIES --------
-    cur.execute("""
-        SELECT activity_date, activity_name, start_time, end_time,
-               duration, clock_in, clock_out
-        FROM activities
-        WHERE username = %s
-    """, (username,))
-    rows = cur.fetchall()
-
-    daily_minutes = {}
-    daily_clock = {}
-    available_years = set()
-
-    for row in rows:
-
-        try:
-            d = row["activity_date"]
-        except:
-            continue
-
-        available_years.add(d.year)
-
-        if d.month == int(selected_month) and d.year == int(selected_year):
-
-            daily_minutes.setdefault(d, 0)
-            daily_minutes[d] += row["duration"]
-
-            if d not in daily_clock:
-                daily_clock[d] = {
-                    "clock_in": row["clock_in"],
-                    "clock_out": row["clock_out"]
-                }
-            else:
-                if not daily_clock[d]["clock_in"] and row["clock_in"]:
-                    daily_clock[d]["clock_in"] = row["clock_in"]
-
-                if row["clock_out"]:
-                    daily_clock[d]["clock_out"] = row["clock_out"]
-
-    # -------- FETCH APPROVED LEAVES --------
-    cur.execute("""
-        SELECT leave_dates, leave_type
-        FROM leave_requests
-        WHERE username = %s
-          AND status = 2
-    """, (username,))
-    leave_rows = cur.fetchall()
-
-    leave_dates_dict = {}
-
-    leave_count = 0
-    non_working_days = 0
-
-    for r in leave_rows:
-
-        txt = (r["leave_dates"] or "").strip()
-        leave_type = (r["leave_type"] or "").strip().lower()
+    month_start, next_month = month_bounds(selected_month, selected_year)
 
-        if leave_type == "weeklyoff":
-            display_text = "Weekly Off"
-        elif leave_type == "weekly off":
-            display_text = "Weekly Off"
-        elif leave_type == "holiday":
-            display_text = "Holiday"
-        elif leave_type == "compoff":
-            display_text = "Comp-Off"
-        elif leave_type == "halfday":
-            display_text = "Half Day"
-        else:
-            display_text = "Leave"
+    report_data, cards = report_month(cur, username, month_start, next_month)
 
-        def process_day(d):
+    available_years = activity_years(cur, username)
 
-            nonlocal leave_count, non_working_days
+    # -------- SELECTED DAY ACTIVITIES --------
+    day_activities = []
 
-            if d.month != int(selected_month) or d.year != int(selected_year):
-                return
+    if selected_day:
+        day_activities = report_day_activities(cur, username, selected_day)
 
-            leave_dates_dict[d] = display_text
+    return render_template(
+        "report.html",
+        data=report_data,
+        cards=cards,
+        name=username,
+        selected_month=selected_month,
+        selected_year=selected_year,
+        selected_day=selected_day,
+        day_activities=day_activities,
+        years=sorted(available_years)
+    )
 
-            if leave_type in ["weeklyoff", "weekly off", "holiday", "compoff"]:
-                non_working_days += 1
-            else:
-                leave_count += 1
 
-        if "to" in txt:
+# ------------------ JSON API (v1) ------------------
+# Read-only slices of the dashboard and report pages, so the pages can
+# refresh one part without a full render. Responses carry an ETag of the
+# body and answer If-None-Match with 304. Breaking changes to a payload
+# go under a new /api/v2 prefix.
+def api_response(payload):
+    body = json.dumps(
+        payload,
+        default=lambda v: v.isoformat() if hasattr(v, "isoformat") else str(v),
+        ensure_ascii=False
+    )
 
-            s, e = txt.split(" to ")
+    response = Response(body, mimetype="application/json")
+    response.set_etag(hashlib.sha1(body.encode("utf-8")).hexdigest())
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
-            d1 = datetime.strptime(s.strip(), "%Y-%m-%d").date()
-            d2 = datetime.strptime(e.strip(), "%Y-%m-%d").date()
+def api_error(message, status):
+    return jsonify({"error": message}), status
 
-            while d1 <= d2:
-                process_day(d1)
-                d1 += timedelta(days=1)
+def api_month(args):
+    today = date.today()
+    month = args.get("month") or f"{today.month:02d}"
+    year = args.get("year") or str(today.year)
+    return f"{int(month):02d}", str(int(year)), *month_bounds(month, year)
 
-        else:
+@app.route("/api/v1/dashboard")
+def api_dashboard():
+    if "manager" not in session:
+        return api_error("Manager login required", 401)
 
-            d = datetime.strptime(txt, "%Y-%m-%d").date()
-            process_day(d)
+    try:
+        month, year, month_start, next_month = api_month(request.args)
+    except ValueError:
+        return api_error("Invalid month or year", 400)
 
-    # -------- BUILD REPORT TABLE --------
-    report_data = []
+    results = dashboard_results(get_db().cursor(), month_start, next_month)
 
-    total_minutes = 0
+    return api_response({"month": month, "year": year, **results})
 
-    all_dates = set(daily_minutes.keys()) | set(leave_dates_dict.keys())
+@app.route("/api/v1/report/cards")
+def api_report_cards():
+    if "username" not in session:
+        return api_error("Employee login required", 401)
 
-    for d in sorted(all_dates):
+    try:
+        month, year, month_start, next_month = api_month(request.args)
+    except ValueError:
+        return api_error("Invalid month or year", 400)
 
-        if d in leave_dates_dict:
+    _, cards = report_month(get_db().cursor(), session["username"], month_start, next_month)
 
-            report_data.append({
-                "date": d,
-                "time": leave_dates_dict[d],
-                "productivity": "-",
-                "clock_in": "-",
-                "clock_out": "-"
-            })
+    return api_response({"month": month, "year": year, "cards": cards})
 
-        else:
+@app.route("/api/v1/report/days")
+def api_report_days():
+    if "username" not in session:
+        return api_error("Employee login required", 401)
 
-            mins = daily_minutes.get(d, 0)
+    try:
+        month, year, month_start, next_month = api_month(request.args)
+    except ValueError:
+        return api_error("Invalid month or year", 400)
 
-            hrs = mins // 60
-            rem = mins % 60
+    days, _ = report_month(get_db().cursor(), session["username"], month_start, next_month)
 
-            productivity_day = (mins / (7 * 60)) * 100 if mins > 0 else 0
+    return api_response({"month": month, "year": year, "days": days})
 
-            report_data.append({
-                "date": d,
-                "time": f"{hrs} hours {rem} min",
-                "productivity": f"{productivity_day:.2f}%",
-                "clock_in": daily_clock.get(d, {}).get("clock_in"),
-                "clock_out": daily_clock.get(d, {}).get("clock_out")
-            })
+# Both halves of the month view from one report_month() call; the page
+# uses this rather than fetching cards and days side by side.
+@app.route("/api/v1/report/month")
+def api_report_month():
+    if "username" not in session:
+        return api_error("Employee login required", 401)
 
-            total_minutes += mins
+    try:
+        month, year, month_start, next_month = api_month(request.args)
+    except ValueError:
+        return api_error("Invalid month or year", 400)
 
-    # -------- CARDS --------
-    productive_hours = total_minutes / 60
+    days, cards = report_month(get_db().cursor(), session["username"], month_start, next_month)
 
-    working_days = len(daily_minutes)
+    return api_response({"month": month, "year": year, "cards": cards, "days": days})
 
-    available_hours = working_days * 7
+@app.route("/api/v1/report/days/<day>/activities")
+def api_report_day_activities(day):
+    if "username" not in session:
+        return api_error("Employee login required", 401)
 
-    available_hours_with_leave = (working_days + leave_count) * 7
+    try:
+        day = datetime.strptime(day, "%Y-%m-%d").date()
+    except ValueError:
+        return api_error("Invalid date", 400)
 
-    idle_hours = max(available_hours - productive_hours, 0)
+    activities = report_day_activities(get_db().cursor(), session["username"], day)
 
-    productivity = (
-        (productive_hours / available_hours) * 100
-        if available_hours > 0 else 0
-    )
-    # Productivity for Pie Chart (Working Days Only)
-    chart_productivity = (
-        (productive_hours / (productive_hours + idle_hours)) * 100
-        if (productive_hours + idle_hours) > 0 else 0
-    )
+    return api_response({"day": day, "activities": activities})
 
-    non_working_count = non_working_days
 
-    cards = {
-        "productive": f"{int(productive_hours)} hrs {int((productive_hours % 1) * 60)} min",
-        "working_days": working_days,
-        "available": f"{available_hours} hrs",
-        "idle": f"{int(idle_hours)} hrs {int((idle_hours % 1) * 60)} min",
-        "productivity": f"{productivity:.2f}%",
-        "chart_productivity": round(chart_productivity, 2),
-        "leaves": leave_count,
-        "non_working": non_working_count
-    }
+# ------------------ CLI ------------------
+@app.cli.command("migrate")
+@click.option("--status", "show_status", is_flag=True, help="List migrations without applying them.")
+def migrate_command(show_status):
+    """Apply pending schema migrations."""
+    import migrations
 
-    # -------- SELECTED DAY ACTIVITIES --------
-    day_activities = []
+    if show_status:
+        for version, name, applied in migrations.status():
+            click.echo(f"{version:04d}  {'applied' if applied else 'pending'}  {name}")
+        return
 
-    if selected_day:
-        cur.execute("""
-            SELECT activity_name, start_time, end_time, duration
-            FROM activities
-            WHERE username = %s
-              AND activity_date = %s
-            ORDER BY start_time
-        """, (username, selected_day))
-        day_activities = cur.fetchall()
+    migrations.migrate(log=click.echo)
 
-    conn.close()
+@app.cli.command("rebuild-summary")
+@click.option("--username", help="Only this employee.")
+@click.option("--from", "date_from", help="First activity date (YYYY-MM-DD).")
+@click.option("--to", "date_to", help="Last activity date (YYYY-MM-DD).")
+def rebuild_summary_command(username, date_from, date_to):
+    """Recompute daily_activity_summary from activities."""
+    with db.connection() as conn:
+        cur = conn.cursor()
+        deleted, inserted = summary.rebuild(cur, username, date_from, date_to)
+        conn.commit()
 
-    return render_template(
-        "report.html",
-        data=report_data,
-        cards=cards,
-        name=username,
-        selected_month=selected_month,
-        selected_year=selected_year,
-        selected_day=selected_day,
-        day_activities=day_activities,
-        years=sorted(available_years)
-    )
+    dashboard_cache.clear()
+    click.echo(f"Removed {deleted} summary rows, wrote {inserted}.")
+
+@app.cli.command("export-activities")
+@click.option("--from", "date_from", help="First activity date (YYYY-MM-DD).")
+@click.option("--to", "date_to", help="Last activity date (YYYY-MM-DD).")
+@click.option("--year")
+@click.option("--month")
+@click.option("--quarter")
+@click.option("--username", help="Only this employee.")
+@click.option("--format", "fmt", type=click.Choice(sorted(exports.FORMATS)), default="csv")
+@click.option("--output", type=click.File("wb"), default="-", help="File to write (default stdout).")
+def export_activities_command(date_from, date_to, year, month, quarter, username, fmt, output):
+    """Stream raw activities for a period as CSV or NDJSON."""
+    try:
+        first, last = export_period({
+            "from": date_from,
+            "to": date_to,
+            "year": year,
+            "month": month,
+            "quarter": quarter
+        })
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    with db.connection() as conn:
+        for chunk in exports.stream_activities(conn, first, last, fmt, username):
+            output.write(chunk)
+
+@app.cli.command("import")
+@click.option("--activities", type=click.Path(exists=True, dir_okay=False), help="Activities CSV.")
+@click.option("--leave", type=click.Path(exists=True, dir_okay=False), help="Leave records CSV.")
+@click.option("--rejects", type=click.File("w"), help="Write rejected rows to this CSV.")
+@click.option("--dry-run", is_flag=True, help="Validate and report, then roll back.")
+def import_command(activities, leave, rejects, dry_run):
+    """Bulk-load historical activities and leave via COPY."""
+    import importer
+
+    if not activities and not leave:
+        raise click.UsageError("give --activities and/or --leave")
+
+    rejected = []
+
+    with db.connection() as conn:
+        cur = conn.cursor()
+
+        # Leave goes first so imported activities are checked against it.
+        if leave:
+            with importer.open_csv(leave) as f:
+                inserted, bad = importer.import_leave(cur, f)
+            click.echo(f"Leave: {inserted} imported, {len(bad)} rejected.")
+            rejected.append((importer.LEAVE_COLUMNS, bad))
+
+        if activities:
+            with importer.open_csv(activities) as f:
+                inserted, bad = importer.import_activities(cur, f)
+            click.echo(f"Activities: {inserted} imported, {len(bad)} rejected.")
+            rejected.append((importer.ACTIVITY_COLUMNS, bad))
+
+        if rejects:
+            for columns, rows in rejected:
+                importer.write_rejects(rows, columns, rejects)
+        else:
+            for _, rows in rejected:
+                for row in rows[:20]:
+                    click.echo(f"  line {row['line']}: {row['reject']}")
 
+        if dry_run:
+            conn.rollback()
+            click.echo("Dry run: nothing was written.")
+        else:
+            conn.commit()
+            dashboard_cache.clear()
+
+@app.cli.command("vendor-assets")
+def vendor_assets_command():
+    """Download the pinned front-end libraries and fonts into static/vendor/."""
+    try:
+        assets.vendor(log=click.echo)
+    except (OSError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Write every static asset and its compressed copies ahead of time."""
+    try:
+        assets.build_all(log=click.echo)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
 
 # ------------------ RUN APP ------------------
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
+    if len(sys.argv) > 1:
+        # e.g. `python app.py migrate`; same commands as `flask --app app ...`
+        with app.app_context():
+            app.cli.main(args=sys.argv[1:], prog_name="app.py")
+    else:
+        app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,419 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import re
+import tarfile
+import tempfile
+import threading
+import urllib.request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+# ------------------ STATIC ASSETS ------------------
+# Stylesheets, scripts, images and vendored libraries live under static/
+# (css/, js/, img/, vendor/). Each is served from /assets/ under a name
+# carrying a hash of its content, e.g. /assets/css/report.3f9a0c1d2e4b.css,
+# so it can be cached for a year: a changed file gets a new URL. Templates
+# ask for them with {{ asset("css/report.css") }}.
+#
+# The first request for an asset writes it, plus gzip and (with the
+# brotli package) brotli copies of text files, into DIST_DIR; after that
+# the precompressed file matching Accept-Encoding is sent as is.
+# `python app.py build-assets` does the same for every asset ahead of
+# time. Stylesheet url()s are rewritten to the hashed names they point at.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+DIST_DIR = os.environ.get("ASSET_DIST_DIR", os.path.join(STATIC_DIR, "dist"))
+
+SOURCE_DIRS = ("css", "js", "img", "vendor")
+URL_PREFIX = "/assets/"
+MAX_AGE = 365 * 24 * 3600
+
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt"}
+
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+# ------------------ VENDORED LIBRARIES ------------------
+# Third-party scripts and fonts are fetched, at the pinned versions below,
+# by `python app.py vendor-assets`, which also records their SHA-256 in
+# static/vendor/SHA256SUMS; the result is committed and served from
+# static/vendor/ like any other asset. Until static/vendor/ is committed
+# the templates keep loading these from their CDNs and Google Fonts. Once
+# it is, a missing or altered vendored file fails build-assets (run in
+# the release phase) and any page that asks for it.
+NPM_REGISTRY = "https://registry.npmjs.org"
+CHECKSUMS = "vendor/SHA256SUMS"
+
+# logical name: (package, version, file in package)
+VENDOR = {
+    "vendor/chart.umd.js": ("chart.js", "4.4.1", "dist/chart.umd.js"),
+    "vendor/chartjs-plugin-datalabels.min.js": (
+        "chartjs-plugin-datalabels", "2.2.0", "dist/chartjs-plugin-datalabels.min.js"
+    ),
+    "vendor/html2canvas.min.js": ("html2canvas", "1.4.1", "dist/html2canvas.min.js"),
+    "vendor/jspdf.umd.min.js": ("jspdf", "2.5.1", "dist/jspdf.umd.min.js"),
+}
+
+# Poppins as self-hosted woff2 (Fontsource packages of the Google font),
+# the weights and subsets the pages used to request from Google Fonts.
+FONT_PACKAGE = ("@fontsource/poppins", "5.0.8")
+FONT_WEIGHTS = (300, 400, 500, 600, 700)
+FONT_SUBSETS = {
+    "latin": (
+        "U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, "
+        "U+0304, U+0308, U+0329, U+2000-206F, U+20AC, U+2122, U+2191, U+2193, "
+        "U+2212, U+2215, U+FEFF, U+FFFD"
+    ),
+    "latin-ext": (
+        "U+0100-02BA, U+02BD-02C5, U+02C7-02CC, U+02CE-02D7, U+02DD-02FF, U+0304, "
+        "U+0308, U+0329, U+1D00-1DBF, U+1E00-1E9F, U+1EF2-1EFF, U+2020, "
+        "U+20A0-20AB, U+20AD-20C0, U+2113, U+2C60-2C7F, U+A720-A7FF"
+    ),
+}
+FONT_CSS = "vendor/poppins/poppins.css"
+FONT_FILES = [
+    f"vendor/poppins/poppins-{subset}-{weight}-normal.woff2"
+    for weight in FONT_WEIGHTS for subset in FONT_SUBSETS
+]
+
+
+def vendored():
+    return list(VENDOR) + [FONT_CSS] + FONT_FILES
+
+
+# ------------------ MANIFEST ------------------
+class Asset:
+
+    def __init__(self, name, source, hashed, data=None):
+        self.name = name
+        self.source = source
+        self.hashed = hashed
+        # Rewritten content (stylesheets); None means the source file as is.
+        self.data = data
+
+        ext = os.path.splitext(name)[1]
+        self.compressible = ext in COMPRESSIBLE
+        self.mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    def content(self):
+        if self.data is not None:
+            return self.data
+        with open(self.source, "rb") as f:
+            return f.read()
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _hashed_name(name, digest):
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+def _sources():
+    found = []
+    for top in SOURCE_DIRS:
+        root = os.path.join(STATIC_DIR, top)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for filename in sorted(filenames):
+                if filename.startswith("."):
+                    continue
+                path = os.path.join(dirpath, filename)
+                found.append((os.path.relpath(path, STATIC_DIR).replace(os.sep, "/"), path))
+    return found
+
+
+def _rewrite_css(name, css, manifest):
+    base = os.path.dirname(name)
+
+    def replace(match):
+        quote, target = match.groups()
+        if re.match(r"^(?:[a-z]+:|/|#)", target, re.I):
+            return match.group(0)
+
+        path, _, suffix = target.partition("?")
+        resolved = os.path.normpath(os.path.join(base, path)).replace(os.sep, "/")
+        asset = manifest.get(resolved)
+        if asset is None:
+            return match.group(0)
+
+        relative = os.path.relpath(asset.hashed, base or ".").replace(os.sep, "/")
+        return f"url({quote}{relative}{quote})"
+
+    return _CSS_URL.sub(replace, css)
+
+
+def _build():
+    manifest = {}
+
+    # Stylesheets last, so their url()s can point at hashed fonts and images.
+    for name, path in sorted(_sources(), key=lambda s: (s[0].endswith(".css"), s[0])):
+        with open(path, "rb") as f:
+            data = f.read()
+
+        rewritten = None
+        if name.endswith(".css"):
+            rewritten = _rewrite_css(name, data.decode("utf-8"), manifest).encode("utf-8")
+            data = rewritten
+
+        manifest[name] = Asset(name, path, _hashed_name(name, _digest(data)), rewritten)
+
+    return manifest, {a.hashed: a for a in manifest.values()}
+
+
+_manifest = None
+_by_hashed = None
+_manifest_lock = threading.Lock()
+
+
+def manifest():
+    global _manifest, _by_hashed
+
+    # Built once per worker, on first use; restart the app to pick up
+    # edited files.
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest, _by_hashed = _build()
+    return _manifest
+
+
+def reload():
+    global _manifest, _by_hashed
+    with _manifest_lock:
+        _manifest, _by_hashed = _build()
+
+
+def url(name):
+    asset = manifest().get(name)
+    if asset is not None:
+        return URL_PREFIX + asset.hashed
+    if name in vendored():
+        raise LookupError(f"{name} is not vendored; run `python app.py vendor-assets` and commit static/vendor/")
+    raise LookupError(f"no static asset {name!r}")
+
+
+def lookup(hashed):
+    manifest()
+    return _by_hashed.get(hashed)
+
+
+# ------------------ DIST FILES ------------------
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _dist_path(asset, encoding=None):
+    path = os.path.join(DIST_DIR, *asset.hashed.split("/"))
+    return path + {"br": ".br", "gzip": ".gz", None: ""}[encoding]
+
+
+# Writes the asset and its compressed copies into DIST_DIR unless they are
+# already there. Names carry the content hash, so an existing file is
+# always current; a compressed copy is only kept if it is smaller.
+def build(asset):
+    path = _dist_path(asset)
+    if os.path.exists(path):
+        return path
+
+    data = asset.content()
+
+    if asset.compressible:
+        variants = [("gzip", gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(("br", brotli.compress(data, quality=11)))
+
+        for encoding, compressed in variants:
+            if len(compressed) < len(data):
+                _write(_dist_path(asset, encoding), compressed)
+
+    # The plain file last: its presence means the set is complete.
+    _write(path, data)
+    return path
+
+
+# (path, Content-Encoding or None) of the best copy for the request.
+def variant(asset, accept_encodings):
+    path = build(asset)
+    if not asset.compressible:
+        return path, None
+
+    for encoding in ("br", "gzip"):
+        if accept_encodings[encoding]:
+            compressed = _dist_path(asset, encoding)
+            if os.path.exists(compressed):
+                return compressed, encoding
+    return path, None
+
+
+def build_all(log=print):
+    reload()
+
+    problems = check_vendored()
+    if problems:
+        raise RuntimeError(
+            "vendored assets are not as pinned:\n  " + "\n  ".join(problems)
+            + "\nrun `python app.py vendor-assets` and commit static/vendor/"
+        )
+
+    current = set()
+
+    for asset in manifest().values():
+        build(asset)
+        for encoding in (None, "gzip", "br"):
+            current.add(_dist_path(asset, encoding))
+
+    removed = 0
+    for dirpath, _, filenames in os.walk(DIST_DIR):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if path not in current:
+                os.unlink(path)
+                removed += 1
+
+    log(f"{len(manifest())} assets in {DIST_DIR}"
+        f" (gzip{', brotli' if brotli is not None else '; install Brotli for .br'}),"
+        f" {removed} stale files removed.")
+
+
+# ------------------ VENDORING ------------------
+def _read_checksums():
+    try:
+        with open(os.path.join(STATIC_DIR, *CHECKSUMS.split("/"))) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+
+    sums = {}
+    for line in lines:
+        digest, _, name = line.partition("  ")
+        if name:
+            sums[name] = digest
+    return sums
+
+
+# Problems with static/vendor/, one line each; empty when every pinned
+# file is present and matches its recorded checksum, or when nothing has
+# been vendored yet.
+def check_vendored():
+    sums = _read_checksums()
+    if sums is None:
+        present = [
+            name for name in vendored()
+            if os.path.exists(os.path.join(STATIC_DIR, *name.split("/")))
+        ]
+        return [f"{CHECKSUMS} is missing"] if present else []
+
+    problems = []
+    for name in vendored():
+        path = os.path.join(STATIC_DIR, *name.split("/"))
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            problems.append(f"{name} is missing")
+            continue
+
+        if name not in sums:
+            problems.append(f"{name} has no checksum in {CHECKSUMS}")
+        elif sums[name] != digest:
+            problems.append(f"{name} does not match its checksum")
+    return problems
+
+
+def _npm_files(package, version, wanted):
+    with urllib.request.urlopen(f"{NPM_REGISTRY}/{package}/{version}", timeout=30) as r:
+        meta = json.load(r)
+
+    with urllib.request.urlopen(meta["dist"]["tarball"], timeout=60) as r:
+        tarball = r.read()
+
+    # The registry publishes an SRI hash for every tarball.
+    algorithm, _, expected = meta["dist"]["integrity"].partition("-")
+    actual = base64.b64encode(hashlib.new(algorithm, tarball).digest()).decode("ascii")
+    if actual != expected:
+        raise RuntimeError(f"{package}@{version}: tarball does not match its integrity hash")
+
+    files = {}
+    with tarfile.open(fileobj=io.BytesIO(tarball), mode="r:gz") as tar:
+        for member in tar.getmembers():
+            # npm tarballs put everything under package/.
+            inner = member.name.split("/", 1)[1] if "/" in member.name else member.name
+            if inner in wanted and member.isfile():
+                files[inner] = tar.extractfile(member).read()
+
+    missing = set(wanted) - set(files)
+    if missing:
+        raise RuntimeError(f"{package}@{version}: missing {', '.join(sorted(missing))}")
+    return files
+
+
+def _font_css(package, version):
+    family = "Poppins"
+    faces = []
+    for weight in FONT_WEIGHTS:
+        for subset, unicode_range in FONT_SUBSETS.items():
+            faces.append(
+                f"/* {subset} */\n"
+                "@font-face {\n"
+                f"  font-family: '{family}';\n"
+                "  font-style: normal;\n"
+                f"  font-weight: {weight};\n"
+                "  font-display: swap;\n"
+                f"  src: url(poppins-{subset}-{weight}-normal.woff2) format('woff2');\n"
+                f"  unicode-range: {unicode_range};\n"
+                "}\n"
+            )
+    return f"/* {package}@{version}, SIL Open Font License 1.1 */\n\n" + "\n".join(faces)
+
+
+def vendor(log=print):
+    vendor_dir = os.path.join(STATIC_DIR, "vendor")
+
+    for name, (package, version, inner) in VENDOR.items():
+        files = _npm_files(package, version, [inner, "LICENSE"])
+        _write(os.path.join(STATIC_DIR, *name.split("/")), files[inner])
+        _write(os.path.join(vendor_dir, "licenses", f"{package}.LICENSE"), files["LICENSE"])
+        log(f"{name}  <-  {package}@{version}/{inner}")
+
+    package, version = FONT_PACKAGE
+    wanted = {f"files/{os.path.basename(name)}": name for name in FONT_FILES}
+    files = _npm_files(package, version, list(wanted) + ["LICENSE"])
+
+    for inner, name in wanted.items():
+        _write(os.path.join(STATIC_DIR, *name.split("/")), files[inner])
+    _write(os.path.join(vendor_dir, "licenses", "poppins.LICENSE"), files["LICENSE"])
+    _write(os.path.join(STATIC_DIR, *FONT_CSS.split("/")), _font_css(package, version).encode("utf-8"))
+    log(f"{FONT_CSS}  <-  {package}@{version} ({len(wanted)} woff2 files)")
+
+    lines = []
+    for name in vendored():
+        with open(os.path.join(STATIC_DIR, *name.split("/")), "rb") as f:
+            lines.append(f"{hashlib.sha256(f.read()).hexdigest()}  {name}\n")
+    _write(os.path.join(STATIC_DIR, *CHECKSUMS.split("/")), "".join(lines).encode("utf-8"))
+    log(f"{CHECKSUMS} written")
+
+    reload()
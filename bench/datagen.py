@@ -0,0 +1,262 @@
+"""Fill a database with a deterministic synthetic team for benchmarking.
+
+N employees x M months of weekday activities and leave, generated from a
+seed so the same arguments always produce the same rows:
+
+- 4-8 back-to-back or gapped activity slots a day, clock in 09:00-10:00
+- shared holidays, occasional weekly-off Saturdays, single-day, multi-day
+  and half-day leave, and comp-offs earned on a worked Saturday
+- approved and pending leave never share a day (as the app enforces);
+  rejected and cancelled requests overlap them freely
+
+Rows are loaded with COPY and the daily summary is rebuilt. Point it at a
+dedicated database: --reset empties the app's tables first.
+
+    DATABASE_URL=postgresql://localhost/daily_tracker_bench \\
+        python bench/datagen.py --employees 50 --months 12 --reset
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2.extras
+
+import db
+import migrations
+import summary
+
+
+PASSWORD = "bench"
+MANAGER = "manager_bench"
+
+ACTIVITY_NAMES = [
+    "Client call",
+    "Code review",
+    "Documentation",
+    "Email follow-up",
+    "Feature development",
+    "Planning",
+    "Reporting",
+    "Stand-up meeting",
+    "Testing",
+    "Training"
+]
+
+ACTIVITY_COLUMNS = [
+    "username", "activity_date", "clock_in", "activity_name",
+    "start_time", "end_time", "duration", "clock_out", "submitted_at"
+]
+
+LEAVE_COLUMNS = [
+    "username", "leave_type", "leave_dates", "from_date", "to_date",
+    "reason", "status", "requested_on"
+]
+
+
+def employee_name(i):
+    return f"emp{i:04d}"
+
+
+def month_starts(end_month, months):
+    year, month = (int(p) for p in end_month.split("-"))
+    starts = []
+    for _ in range(months):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return sorted(starts)
+
+
+def _days(first):
+    d = first
+    while d.month == first.month:
+        yield d
+        d += timedelta(days=1)
+
+
+def _at(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+class Team:
+
+    def __init__(self, employees, months, end_month, seed):
+        self.rng = random.Random(seed)
+        self.employees = [employee_name(i) for i in range(1, employees + 1)]
+        self.months = month_starts(end_month, months)
+        self.activities = []
+        self.leave = []
+
+    def _leave(self, username, leave_type, first, last, status, blocked, reason=""):
+        if status in (0, 2):
+            days = {first + timedelta(days=n) for n in range((last - first).days + 1)}
+            if days & blocked:
+                return False
+            blocked |= days
+
+        dates = first.isoformat() if first == last else f"{first} to {last}"
+        requested = datetime.combine(first - timedelta(days=self.rng.randint(1, 20)), time(10, 0))
+
+        self.leave.append((
+            username, leave_type, dates, first, last, reason, status,
+            requested.strftime("%Y-%m-%d %H:%M")
+        ))
+        return True
+
+    def _day(self, username, day, half=False):
+        rng = self.rng
+
+        clock_in = rng.randrange(9 * 60, 10 * 60 + 1, 5)
+        minute = clock_in
+        end_of_day = clock_in + (4 * 60 if half else 9 * 60)
+
+        for _ in range(rng.randint(2, 4) if half else rng.randint(4, 8)):
+            minute += rng.choice([0, 0, 0, 5, 10, 15, 30])
+            length = rng.choice([20, 30, 45, 60, 60, 90, 120])
+            if minute + length > end_of_day:
+                break
+
+            self.activities.append((
+                username, day, _at(clock_in), rng.choice(ACTIVITY_NAMES),
+                _at(minute), _at(minute + length), length,
+                _at(end_of_day),
+                datetime.combine(day, _at(min(end_of_day + 10, 23 * 60)))
+            ))
+            minute += length
+
+    def build(self):
+        rng = self.rng
+
+        # Shared holidays: one weekday a month.
+        holidays = {}
+        for first in self.months:
+            weekdays = [d for d in _days(first) if d.weekday() < 5]
+            holidays[first] = rng.choice(weekdays)
+
+        for username in self.employees:
+            blocked = set()
+            halfdays = set()
+            comp_off_earned = 0
+
+            for first in self.months:
+                days = list(_days(first))
+                weekdays = [d for d in days if d.weekday() < 5]
+                saturdays = [d for d in days if d.weekday() == 5]
+
+                self._leave(username, "holiday", holidays[first], holidays[first], 2, blocked)
+
+                if saturdays and rng.random() < 0.3:
+                    sat = rng.choice(saturdays)
+                    self._leave(username, "weeklyoff", sat, sat, 2, blocked)
+
+                for _ in range(rng.choice([0, 1, 1, 2])):
+                    kind = rng.choice(["single", "single", "multiple", "halfday"])
+                    start = rng.choice(weekdays)
+                    last = start + timedelta(days=rng.randint(1, 4)) if kind == "multiple" else start
+                    status = rng.choice([2, 2, 2, 2, 3, 4])
+
+                    if self._leave(username, kind, start, last, status, blocked, "Personal") and kind == "halfday" and status == 2:
+                        halfdays.add(start)
+
+                    # A rejected or cancelled duplicate of the same dates.
+                    if rng.random() < 0.15:
+                        self._leave(username, kind, start, last, rng.choice([3, 4]), blocked, "Personal")
+
+                if comp_off_earned and rng.random() < 0.5:
+                    day = rng.choice(weekdays)
+                    if self._leave(username, "compoff", day, day, 2, blocked):
+                        comp_off_earned -= 1
+
+                for day in weekdays:
+                    if day in blocked and day not in halfdays:
+                        continue
+                    if rng.random() < 0.9:
+                        self._day(username, day, half=day in halfdays)
+
+                # The odd worked Saturday earns a comp-off.
+                if saturdays and rng.random() < 0.1:
+                    sat = rng.choice(saturdays)
+                    if sat not in blocked:
+                        self.activities.append((
+                            username, sat, time(10, 0), "Comp-Off Earned",
+                            time(10, 0), time(14, 0), 240, time(14, 0),
+                            datetime.combine(sat, time(14, 10))
+                        ))
+                        comp_off_earned += 1
+
+            # A few requests still waiting for the manager.
+            last_month = self.months[-1]
+            for _ in range(rng.choice([0, 0, 1])):
+                day = rng.choice(list(_days(last_month))) + timedelta(days=31)
+                self._leave(username, "single", day, day, 0, blocked, "Upcoming")
+
+        return self
+
+
+def _copy(cur, table, columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+    buffer.seek(0)
+
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+
+
+def load(conn, team, reset=False):
+    cur = conn.cursor()
+
+    if reset:
+        cur.execute("""
+            TRUNCATE activities, leave_requests, daily_activity_summary, users
+            RESTART IDENTITY
+        """)
+
+    psycopg2.extras.execute_values(
+        cur,
+        """
+        INSERT INTO users (username, password) VALUES %s
+        ON CONFLICT (username) DO NOTHING
+        """,
+        [(u, PASSWORD) for u in team.employees + [MANAGER]]
+    )
+
+    _copy(cur, "leave_requests", LEAVE_COLUMNS, team.leave)
+    _copy(cur, "activities", ACTIVITY_COLUMNS, team.activities)
+
+    summary.rebuild(cur)
+    cur.execute("ANALYZE")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--end-month", default="2025-12", help="Last generated month (YYYY-MM).")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="Empty the app's tables first.")
+    args = parser.parse_args()
+
+    migrations.migrate(log=lambda *a: None)
+
+    team = Team(args.employees, args.months, args.end_month, args.seed).build()
+
+    with db.connection() as conn:
+        load(conn, team, reset=args.reset)
+
+    print(f"{len(team.employees)} employees, {len(team.months)} months "
+          f"({team.months[0]:%Y-%m} to {team.months[-1]:%Y-%m}): "
+          f"{len(team.activities):,} activities, {len(team.leave):,} leave requests")
+
+
+if __name__ == "__main__":
+    main()
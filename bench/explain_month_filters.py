@@ -0,0 +1,138 @@
+"""EXPLAIN the month-filtered activity queries against a large seeded copy.
+
+Clones the migrated `activities` table (with all of its indexes) into a
+throw-away schema, fills it with synthetic rows, and prints the plan of
+each month query as it used to be written (TO_CHAR) and as it is now
+(half-open date range). Nothing in the public schema is touched.
+
+    DATABASE_URL=postgresql://localhost/daily_tracker \\
+        python bench/explain_month_filters.py --users 500 --days 730
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+
+from app import month_bounds
+
+
+SCHEMA = "bench_explain"
+
+QUERIES = {
+    "manager_dashboard": (
+        """
+        SELECT username, SUM(duration), COUNT(DISTINCT activity_date)
+        FROM activities
+        WHERE TO_CHAR(activity_date, 'MM') = %(month)s
+          AND TO_CHAR(activity_date, 'YYYY') = %(year)s
+        GROUP BY username
+        """,
+        """
+        SELECT username, SUM(duration), COUNT(DISTINCT activity_date)
+        FROM activities
+        WHERE activity_date >= %(start)s
+          AND activity_date < %(end)s
+        GROUP BY username
+        """
+    ),
+    "manager_employee_detail / export_employee_pdf": (
+        """
+        SELECT activity_date, activity_name, start_time, end_time, submitted_at
+        FROM activities
+        WHERE username = %(user)s
+          AND TO_CHAR(activity_date, 'MM') = %(month)s
+          AND TO_CHAR(activity_date, 'YYYY') = %(year)s
+        ORDER BY activity_date, start_time
+        """,
+        """
+        SELECT activity_date, activity_name, start_time, end_time, submitted_at
+        FROM activities
+        WHERE username = %(user)s
+          AND activity_date >= %(start)s
+          AND activity_date < %(end)s
+        ORDER BY activity_date, start_time
+        """
+    ),
+}
+
+
+def seed(cur, users, days, per_day):
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"CREATE TABLE {SCHEMA}.activities (LIKE public.activities INCLUDING ALL)")
+    cur.execute(f"SET search_path TO {SCHEMA}")
+
+    cur.execute("""
+        INSERT INTO activities (
+            username, activity_date, clock_in, activity_name,
+            start_time, end_time, duration, clock_out, submitted_at
+        )
+        SELECT
+            'user' || u,
+            CURRENT_DATE - d,
+            TIME '09:00',
+            'Task ' || s,
+            TIME '09:00' + s * INTERVAL '40 minutes',
+            TIME '09:30' + s * INTERVAL '40 minutes',
+            30,
+            TIME '18:00',
+            NOW()
+        FROM generate_series(1, %s) AS u,
+             generate_series(1, %s) AS d,
+             generate_series(0, %s - 1) AS s
+    """, (users, days, per_day))
+
+    cur.execute("ANALYZE activities")
+    cur.execute("SELECT COUNT(*) FROM activities")
+    return cur.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--per-day", type=int, default=6)
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE instead of EXPLAIN")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
+    cur = conn.cursor()
+
+    try:
+        total = seed(cur, args.users, args.days, args.per_day)
+        print(f"Seeded {total:,} activity rows ({args.users} users x {args.days} days)\n")
+
+        today = date.today()
+        month = 1 if today.month == 12 else today.month + 1
+        year = today.year - 1 if today.month != 12 else today.year
+        start, end = month_bounds(month, year)
+        params = {
+            "month": f"{month:02d}",
+            "year": str(year),
+            "start": start,
+            "end": end,
+            "user": "user1"
+        }
+
+        explain = "EXPLAIN (ANALYZE, BUFFERS)" if args.analyze else "EXPLAIN"
+
+        for name, (before, after) in QUERIES.items():
+            for label, sql in (("before", before), ("after", after)):
+                cur.execute(f"{explain} {sql}", params)
+                print(f"=== {name} [{label}] ===")
+                for (line,) in cur.fetchall():
+                    print(line)
+                print()
+    finally:
+        conn.rollback()
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
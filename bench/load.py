@@ -0,0 +1,289 @@
+"""Drive the hot routes through the WSGI app and record latency percentiles.
+
+Each scenario sends --requests requests from --concurrency threads, each
+with its own logged-in test client, against the data from datagen.py.
+For every scenario it reports p50/p95/p99/max latency, throughput, errors
+and SQL statements and DB time per request (from the app's
+Server-Timing header), prints a table, and writes everything to
+a JSON file (tagged with the git commit) so runs can be compared:
+
+    DATABASE_URL=postgresql://localhost/daily_tracker_bench \\
+        python bench/datagen.py --employees 50 --months 12 --reset
+    DATABASE_URL=postgresql://localhost/daily_tracker_bench \\
+        python bench/load.py --concurrency 8 --requests 400 \\
+            --compare bench/results/previous.json
+
+The dashboard and PDF caches point at fresh temporary locations for each
+run, so every run starts cold and fills them the same way.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+_scratch = tempfile.mkdtemp(prefix="daily_tracker_bench_")
+os.environ["DASHBOARD_CACHE_PATH"] = os.path.join(_scratch, "dashboard.sqlite3")
+os.environ["PDF_CACHE_DIR"] = os.path.join(_scratch, "pdfs")
+os.environ["TEAM_PACK_DIR"] = os.path.join(_scratch, "packs")
+
+import pytz
+
+import datagen
+
+
+SCENARIOS = ["activity_post", "report", "manager_dashboard", "export_pdf", "leave"]
+
+
+# ------------------ SQL STATS ------------------
+# The app reports its own per-request SQL totals in Server-Timing.
+_DB_TIMING = re.compile(r'(?:^|,)\s*db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def sql_stats(response):
+    match = _DB_TIMING.search(response.headers.get("Server-Timing", ""))
+    if match is None:
+        return 0.0, 0
+    return float(match.group(1)), int(match.group(2))
+
+
+# ------------------ CLIENTS ------------------
+def login(app, username, manager=False):
+    client = app.test_client()
+
+    if manager:
+        client.post("/manager", data={"manager_name": username[len("manager_"):]})
+        client.post("/manager", data={"password": datagen.PASSWORD})
+    else:
+        client.post("/employee", data={"username": username})
+        client.post("/employee", data={"password": datagen.PASSWORD})
+
+    return client
+
+
+class Worker:
+
+    def __init__(self, app, index, employees, months, seed):
+        self.rng = random.Random(seed * 1000 + index)
+        self.employees = employees
+        self.months = months
+
+        self.employee = employees[index % len(employees)]
+        self.writer_name = f"benchw{index:03d}"
+
+        self.employee_client = login(app, self.employee)
+        self.writer_client = login(app, self.writer_name)
+        self.manager_client = login(app, datagen.MANAGER, manager=True)
+
+        self.slot = 0
+
+    def _month(self):
+        first = self.rng.choice(self.months)
+        return f"month={first.month:02d}&year={first.year}", first
+
+    def activity_post(self):
+        # Yesterday (IST) is always open for an employee with no leave.
+        # Slots cycle through a fixed grid, so repeats replace rather than
+        # overlap and every request takes the full write path.
+        ist = pytz.timezone("Asia/Kolkata")
+        day = datetime.now(ist).date() - timedelta(days=1)
+
+        start = 8 * 60 + (self.slot % 12) * 60
+        self.slot += 1
+
+        return self.writer_client.post("/activity", data={
+            "activity_date": day.isoformat(),
+            "clock_in": "08:00",
+            "clock_out": "20:00",
+            "activity_name[]": ["Bench task A", "Bench task B"],
+            "start_time[]": [f"{start // 60:02d}:00", f"{start // 60:02d}:30"],
+            "end_time[]": [f"{start // 60:02d}:30", f"{start // 60:02d}:55"]
+        }), (302,)
+
+    def report(self):
+        query, first = self._month()
+        if self.rng.random() < 0.3:
+            query += f"&day={first + timedelta(days=self.rng.randint(0, 27))}"
+        return self.employee_client.get(f"/report?{query}"), (200,)
+
+    def manager_dashboard(self):
+        query, _ = self._month()
+        return self.manager_client.get(f"/manager/dashboard?{query}"), (200,)
+
+    def export_pdf(self):
+        query, _ = self._month()
+        username = self.rng.choice(self.employees)
+        return self.manager_client.get(f"/manager/export_pdf/{username}?{query}"), (200,)
+
+    def leave(self):
+        return self.employee_client.get("/leave"), (200,)
+
+
+# ------------------ RUN ------------------
+def run_scenario(workers, name, requests):
+    per_worker = [requests // len(workers) + (i < requests % len(workers)) for i in range(len(workers))]
+
+    def drive(worker, count):
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response, expected = getattr(worker, name)()
+            elapsed = time.perf_counter() - started
+
+            response.close()
+            db_ms, queries = sql_stats(response)
+            samples.append((elapsed, queries, db_ms, response.status_code in expected))
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+        results = list(pool.map(drive, workers, per_worker))
+    wall = time.perf_counter() - started
+
+    samples = [s for batch in results for s in batch]
+    latencies = sorted(s[0] * 1000 for s in samples)
+    queries = [s[1] for s in samples]
+    db_ms = [s[2] for s in samples]
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s[3]),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(samples) / wall, 2) if wall else None,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": round(cuts[49], 2),
+            "p95": round(cuts[94], 2),
+            "p99": round(cuts[98], 2),
+            "max": round(latencies[-1], 2)
+        },
+        "queries_per_request": {
+            "mean": round(statistics.fmean(queries), 2),
+            "max": max(queries)
+        },
+        "db_ms_per_request": {
+            "mean": round(statistics.fmean(db_ms), 2),
+            "max": round(max(db_ms), 2)
+        }
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, previous=None):
+    header = f"{'scenario':<18} {'req':>5} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'q/req':>6} {'db ms':>7}"
+    print(header)
+    print("-" * len(header))
+
+    for name, r in results.items():
+        lat = r["latency_ms"]
+        print(f"{name:<18} {r['requests']:>5} {r['errors']:>4} {r['throughput_rps']:>8} "
+              f"{lat['p50']:>8} {lat['p95']:>8} {lat['p99']:>8} {r['queries_per_request']['mean']:>6} {r['db_ms_per_request']['mean']:>7}")
+
+        before = (previous or {}).get(name)
+        if before:
+            deltas = []
+            for key in ("p50", "p95", "p99"):
+                old = before["latency_ms"][key]
+                if old:
+                    deltas.append(f"{key} {(lat[key] - old) / old * 100:+.1f}%")
+            q_old = before["queries_per_request"]["mean"]
+            deltas.append(f"q/req {r['queries_per_request']['mean'] - q_old:+.2f}")
+            print(f"{'':<18}   vs previous: " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--employees", type=int, default=50, help="As given to datagen.py.")
+    parser.add_argument("--months", type=int, default=12, help="As given to datagen.py.")
+    parser.add_argument("--end-month", default="2025-12", help="As given to datagen.py.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON file (default bench/results/<time>-<commit>.json).")
+    parser.add_argument("--compare", help="Earlier JSON result to show deltas against.")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    # One pooled connection per client thread, so the pool is not what
+    # is being measured.
+    os.environ.setdefault("DB_POOL_MAX", str(args.concurrency + 1))
+
+    from app import app
+
+    employees = [datagen.employee_name(i) for i in range(1, args.employees + 1)]
+    months = datagen.month_starts(args.end_month, args.months)
+
+    workers = [Worker(app, i, employees, months, args.seed) for i in range(args.concurrency)]
+
+    results = {}
+    for name in scenarios:
+        if args.warmup:
+            run_scenario(workers, name, args.warmup)
+        results[name] = run_scenario(workers, name, args.requests)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["scenarios"]
+
+    print_table(results, previous)
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        ROOT, "bench", "results",
+        f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "warmup": args.warmup,
+                "dataset": {
+                    "employees": args.employees,
+                    "months": args.months,
+                    "end_month": args.end_month,
+                    "seed": args.seed
+                }
+            },
+            "scenarios": results
+        }, f, indent=2)
+
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
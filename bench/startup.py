@@ -0,0 +1,234 @@
+"""Measure app import time and per-worker memory under gunicorn.
+
+Import time is measured in fresh interpreters (median of --runs), along
+with the slowest top-level imports and whether ReportLab was loaded.
+Memory is read from /proc (Linux only) for the gunicorn master and each
+worker, after --warm requests to each given path, once with the app
+preloaded in the master and once loaded by every worker:
+
+- RSS: resident pages, counting shared ones in full
+- PSS: shared pages split between the processes sharing them
+- USS: pages private to the process, which is what another worker costs
+
+    python bench/startup.py --workers 4 --warm /employee --warm /manager
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+print(elapsed, any(m == "reportlab" or m.startswith("reportlab.") for m in sys.modules))
+"""
+
+
+# ------------------ IMPORT TIME ------------------
+def import_times(runs):
+    times = []
+    reportlab = False
+
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        times.append(float(out[0]))
+        reportlab = out[1] == "True"
+
+    return times, reportlab
+
+
+# Cumulative microseconds of each module imported directly by app.py's
+# import tree (one level under `app`), slowest first.
+def slowest_imports(limit):
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+
+    modules = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            cumulative = int(cumulative)
+        except ValueError:
+            continue
+        # Two spaces of indent: imported by app itself.
+        if name.startswith("   ") and not name.startswith("    "):
+            modules.append((name.strip(), cumulative))
+
+    return sorted(modules, key=lambda m: m[1], reverse=True)[:limit]
+
+
+# ------------------ MEMORY ------------------
+def _children(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields resume after ')'.
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def memory(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].endswith(":"):
+                values[parts[0][:-1]] = int(parts[1])
+
+    return {
+        "rss_mb": round(values.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(values.get("Pss", 0) / 1024, 1),
+        "uss_mb": round((values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)) / 1024, 1)
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).close()
+            return True
+        except urllib.error.HTTPError:
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def gunicorn_memory(workers, preload, warm, warm_requests):
+    port = _free_port()
+    env = dict(os.environ, GUNICORN_PRELOAD="1" if preload else "0")
+
+    master = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "app:app",
+            "--config", "gunicorn.conf.py",
+            "--workers", str(workers),
+            "--bind", f"127.0.0.1:{port}"
+        ],
+        cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    try:
+        base = f"http://127.0.0.1:{port}"
+        started = time.perf_counter()
+        if not _wait_for(base + "/", 30):
+            raise RuntimeError("gunicorn did not start")
+
+        while len(_children(master.pid)) < workers:
+            time.sleep(0.1)
+        ready = time.perf_counter() - started
+
+        # Spread over the workers by sheer volume; each path is GET only.
+        for path in warm:
+            for _ in range(warm_requests):
+                try:
+                    urllib.request.urlopen(base + path, timeout=10).close()
+                except urllib.error.HTTPError:
+                    pass
+        time.sleep(0.5)
+
+        worker_pids = _children(master.pid)
+        per_worker = [memory(pid) for pid in worker_pids]
+
+        return {
+            "preload": preload,
+            "ready_s": round(ready, 2),
+            "master": memory(master.pid),
+            "workers": per_worker,
+            "worker_mean": {
+                key: round(statistics.fmean(w[key] for w in per_worker), 1)
+                for key in ("rss_mb", "pss_mb", "uss_mb")
+            },
+            "total_pss_mb": round(
+                memory(master.pid)["pss_mb"] + sum(w["pss_mb"] for w in per_worker), 1
+            )
+        }
+    finally:
+        master.send_signal(signal.SIGTERM)
+        try:
+            master.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            master.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-interpreter imports to time.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--warm", action="append", default=[], help="GET path to request before measuring (repeatable).")
+    parser.add_argument("--warm-requests", type=int, default=20, help="Requests per --warm path.")
+    parser.add_argument("--output", help="Also write the results as JSON here.")
+    args = parser.parse_args()
+
+    times, reportlab = import_times(args.runs)
+    results = {
+        "import": {
+            "median_ms": round(statistics.median(times) * 1000, 1),
+            "min_ms": round(min(times) * 1000, 1),
+            "reportlab_loaded": reportlab,
+            "slowest": [{"module": m, "ms": round(us / 1000, 1)} for m, us in slowest_imports(8)]
+        }
+    }
+
+    print(f"import app: median {results['import']['median_ms']} ms, "
+          f"min {results['import']['min_ms']} ms over {args.runs} runs; "
+          f"ReportLab loaded: {'yes' if reportlab else 'no'}")
+    for m in results["import"]["slowest"]:
+        print(f"    {m['module']:<24} {m['ms']:>8} ms")
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("\n/proc/<pid>/smaps_rollup not available; skipping memory.")
+    else:
+        results["gunicorn"] = []
+        for preload in (True, False):
+            r = gunicorn_memory(args.workers, preload, args.warm, args.warm_requests)
+            results["gunicorn"].append(r)
+
+            mean = r["worker_mean"]
+            print(f"\ngunicorn, {args.workers} workers, preload {'on' if preload else 'off'} "
+                  f"(ready in {r['ready_s']} s)")
+            print(f"    master      RSS {r['master']['rss_mb']:>6} MB  PSS {r['master']['pss_mb']:>6} MB  USS {r['master']['uss_mb']:>6} MB")
+            print(f"    per worker  RSS {mean['rss_mb']:>6} MB  PSS {mean['pss_mb']:>6} MB  USS {mean['uss_mb']:>6} MB")
+            print(f"    total PSS {r['total_pss_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
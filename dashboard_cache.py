@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date
+
+
+# ------------------ SHARED DASHBOARD CACHE ------------------
+# Computed manager-dashboard results, one row per month, in a SQLite file
+# that every worker process on the host opens. Each month carries a
+# generation number: writers bump it after they commit, and a result is
+# only stored if the generation it was computed under is still current,
+# so a slow dashboard render can never put back data a write has just
+# replaced. The TTL is a backstop for changes made outside the app.
+#
+# The employee report's year list lives in the same table under a
+# "years:<username>" key, so a submit in one worker drops it in all of
+# them and clear() (rebuilds, imports) drops it too.
+
+CACHE_PATH = os.environ.get(
+    "DASHBOARD_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "daily_tracker_dashboard.sqlite3")
+)
+TTL = float(os.environ.get("DASHBOARD_CACHE_TTL", "600"))
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS dashboard_cache (
+        month TEXT PRIMARY KEY,
+        generation INTEGER NOT NULL DEFAULT 0,
+        payload TEXT,
+        stored_at REAL
+    )
+"""
+
+_ready_pid = None
+
+
+def _connect():
+    global _ready_pid
+
+    conn = sqlite3.connect(CACHE_PATH, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+
+    if _ready_pid != os.getpid():
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(_SCHEMA)
+        _ready_pid = os.getpid()
+
+    return conn
+
+
+def _key(month_start):
+    return month_start.strftime("%Y-%m")
+
+
+def _years_key(username):
+    return "years:" + username
+
+
+# Returns (payload or None, generation). A cache that can't be read is a
+# miss; a generation of None means the result must not be stored.
+def get(month_start):
+    return _get(_key(month_start))
+
+
+def get_years(username):
+    return _get(_years_key(username))
+
+
+def _get(key):
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute(
+                "SELECT generation, payload, stored_at FROM dashboard_cache WHERE month = ?",
+                (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None, None
+
+    if row is None:
+        return None, 0
+
+    generation, payload, stored_at = row
+    if payload is None or stored_at < time.time() - TTL:
+        return None, generation
+    return json.loads(payload), generation
+
+
+def put(month_start, generation, payload):
+    _put(_key(month_start), generation, payload)
+
+
+def put_years(username, generation, years):
+    _put(_years_key(username), generation, years)
+
+
+def _put(key, generation, payload):
+    if generation is None:
+        return
+
+    try:
+        conn = _connect()
+        try:
+            conn.execute("""
+                INSERT INTO dashboard_cache (month, generation, payload, stored_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (month) DO UPDATE
+                SET payload = excluded.payload,
+                    stored_at = excluded.stored_at
+                WHERE dashboard_cache.generation = excluded.generation
+            """, (key, generation, json.dumps(payload), time.time()))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+
+# Call after the write has committed.
+def invalidate(first, last=None):
+    invalidate_ranges([(first, last or first)])
+
+
+def invalidate_years(username):
+    _bump({(_years_key(username),)})
+
+
+# Every month touched by any of the (first, last) date ranges.
+def invalidate_ranges(ranges):
+    months = set()
+    for first, last in ranges:
+        last = last or first
+        d = date(first.year, first.month, 1)
+        while d <= last:
+            months.add((_key(d),))
+            d = date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+    _bump(months)
+
+
+def _bump(keys):
+    if not keys:
+        return
+
+    try:
+        conn = _connect()
+        try:
+            conn.executemany("""
+                INSERT INTO dashboard_cache (month, generation) VALUES (?, 1)
+                ON CONFLICT (month) DO UPDATE
+                SET generation = generation + 1,
+                    payload = NULL
+            """, sorted(keys))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def clear():
+    try:
+        conn = _connect()
+        try:
+            conn.execute("""
+                UPDATE dashboard_cache
+                SET generation = generation + 1,
+                    payload = NULL
+            """)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,213 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extras
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+
+# ------------------ POOL SETTINGS ------------------
+# All sizes are per gunicorn worker process, so the database sees at most
+# workers * DB_POOL_MAX connections from the web tier.
+POOL_MIN = int(os.environ.get("DB_POOL_MIN", "1"))
+POOL_MAX = int(os.environ.get("DB_POOL_MAX", "5"))
+POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+POOL_CHECK_INTERVAL = float(os.environ.get("DB_POOL_CHECK_INTERVAL", "30"))
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    pass
+
+
+class ConnectionPool:
+
+    def __init__(self, dsn, minconn=POOL_MIN, maxconn=POOL_MAX,
+                 timeout=POOL_TIMEOUT, check_interval=POOL_CHECK_INTERVAL):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = max(maxconn, 1)
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.pid = os.getpid()
+
+        self._idle = []
+        self._last_used = {}
+        self._size = 0
+        self._cond = threading.Condition()
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._discarded = 0
+
+        for _ in range(self.minconn):
+            self._idle.append(self._open())
+            self._size += 1
+
+    def _open(self):
+        conn = psycopg2.connect(
+            self.dsn,
+            cursor_factory=psycopg2.extras.RealDictCursor
+        )
+        self._last_used[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._size -= 1
+        self._discarded += 1
+        self._last_used.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+
+        idle_for = time.monotonic() - self._last_used.get(id(conn), 0)
+        if idle_for < self.check_interval:
+            return True
+
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        started = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+
+                if self._size < self.maxconn:
+                    conn = None
+                    self._size += 1   # reserve the slot before connecting
+                    break
+
+                if started is None:
+                    started = time.monotonic()
+                    self._waits += 1
+
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._wait_time += time.monotonic() - started
+                    raise PoolTimeout(
+                        f"no database connection free after {self.timeout}s"
+                    )
+                self._cond.wait(remaining)
+
+            if started is not None:
+                self._wait_time += time.monotonic() - started
+            self._checkouts += 1
+
+        if conn is not None and not self._healthy(conn):
+            with self._cond:
+                self._discard(conn)
+                self._size += 1
+            conn = None
+
+        if conn is None:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        return conn
+
+    def putconn(self, conn):
+        with self._cond:
+            if conn.closed:
+                self._discard(conn)
+            else:
+                try:
+                    # Routes that return early never commit; whatever they
+                    # left open is rolled back before the next checkout.
+                    if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    self._last_used[id(conn)] = time.monotonic()
+                    self._idle.append(conn)
+                except psycopg2.Error:
+                    self._discard(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pid": self.pid,
+                "min": self.minconn,
+                "max": self.maxconn,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_ms": round(self._wait_time * 1000, 2),
+                "timeouts": self._timeouts,
+                "discarded": self._discarded
+            }
+
+
+# ------------------ PER-WORKER POOL ------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+
+    # A pool inherited through fork() shares sockets with the parent, so
+    # every gunicorn worker builds its own on first use.
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = ConnectionPool(os.environ.get("DATABASE_URL"))
+    return _pool
+
+
+# Stats for this worker's pool without creating one; None before first use.
+def pool_stats():
+    pool = _pool
+    if pool is None or pool.pid != os.getpid():
+        return None
+    return pool.stats()
+
+
+# Called from gunicorn's post_fork hook: drop the parent's pool without
+# closing its sockets, which still belong to the parent process.
+def reset_pool():
+    global _pool
+    _pool = None
+
+
+@contextmanager
+def connection():
+    with get_pool().connection() as conn:
+        yield conn
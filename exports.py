@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+
+import psycopg2.extensions
+
+
+# ------------------ STREAMING ACTIVITY EXPORT ------------------
+# Rows come off a named (server-side) cursor `itersize` at a time and are
+# encoded into chunks as they arrive, so memory stays flat and the first
+# chunk is sent long before the last row is read.
+
+EXPORT_COLUMNS = [
+    "username",
+    "activity_date",
+    "activity_name",
+    "start_time",
+    "end_time",
+    "duration",
+    "clock_in",
+    "clock_out",
+    "submitted_at"
+]
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+CHUNK_ROWS = 2000
+
+
+def _rows(conn, date_from, date_to, username=None):
+    # Plain tuple cursor: no per-row dicts for what is a straight dump.
+    cur = conn.cursor(
+        name="activity_export",
+        cursor_factory=psycopg2.extensions.cursor
+    )
+    cur.itersize = CHUNK_ROWS
+
+    # Ordered to match idx_activity_date_user so Postgres can stream the
+    # rows instead of sorting the whole range before the first fetch.
+    cur.execute(f"""
+        SELECT {", ".join(EXPORT_COLUMNS)}
+        FROM activities
+        WHERE activity_date >= %s
+          AND activity_date <= %s
+          AND (%s::text IS NULL OR username = %s)
+        ORDER BY activity_date, username, start_time
+    """, (date_from, date_to, username, username))
+
+    try:
+        yield from cur
+    finally:
+        cur.close()
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_text(v) for v in row])
+
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_ndjson(rows):
+    lines = []
+
+    for row in rows:
+        lines.append(json.dumps(
+            {k: _text(v) for k, v in zip(EXPORT_COLUMNS, row)},
+            ensure_ascii=False
+        ))
+
+        if len(lines) == CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def stream_activities(conn, date_from, date_to, fmt="csv", username=None):
+    rows = _rows(conn, date_from, date_to, username)
+
+    if fmt == "ndjson":
+        return stream_ndjson(rows)
+    return stream_csv(rows)
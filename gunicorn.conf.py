@@ -0,0 +1,35 @@
+import gc
+import os
+
+import db
+
+
+# ------------------ GUNICORN ------------------
+# Workers come from WEB_CONCURRENCY (gunicorn's own default) and bind from
+# PORT, as on Heroku.
+#
+# The master imports the app once and forks the workers from it, so the
+# code and everything built at import is shared copy-on-write instead of
+# being loaded again by every worker. Nothing opens a database connection
+# or starts a thread at import; the pool, the pending-count listener, the
+# metrics flusher and the profiler's sampler all start on first use in
+# each worker. Set GUNICORN_PRELOAD=0 to compare against per-worker
+# loading (bench/startup.py does both).
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach: a GC pass
+    # in a worker would otherwise write to (and so un-share) every page
+    # holding an object header it touches.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Defensive: the pool is already pid-aware, but a preloaded master
+    # should never hand its own connections to a worker.
+    db.reset_pool()
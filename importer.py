@@ -0,0 +1,329 @@
+import csv
+import io
+
+import summary
+
+
+# ------------------ BULK HISTORICAL IMPORT ------------------
+# CSV files are streamed into temp staging tables with COPY, validated
+# set-wise in SQL with the same rules the web forms apply, and merged
+# into the live tables. The caller owns the transaction: commit to keep
+# the import, roll back for a dry run.
+
+ACTIVITY_COLUMNS = [
+    "username",
+    "activity_date",
+    "activity_name",
+    "start_time",
+    "end_time",
+    "duration",
+    "clock_in",
+    "clock_out",
+    "submitted_at"
+]
+
+LEAVE_COLUMNS = [
+    "username",
+    "leave_type",
+    "from_date",
+    "to_date",
+    "reason",
+    "status",
+    "requested_on"
+]
+
+LEAVE_TYPES = ["single", "multiple", "halfday", "compoff", "weeklyoff", "holiday"]
+
+# Casts that return NULL instead of aborting the whole COPY'd batch.
+_HELPERS = """
+    CREATE OR REPLACE FUNCTION pg_temp.try_date(t TEXT) RETURNS DATE AS $$
+    BEGIN
+        RETURN NULLIF(TRIM(t), '')::date;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql IMMUTABLE;
+
+    CREATE OR REPLACE FUNCTION pg_temp.try_time(t TEXT) RETURNS TIME AS $$
+    BEGIN
+        RETURN NULLIF(TRIM(t), '')::time;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql IMMUTABLE;
+
+    CREATE OR REPLACE FUNCTION pg_temp.try_timestamp(t TEXT) RETURNS TIMESTAMP AS $$
+    BEGIN
+        RETURN NULLIF(TRIM(t), '')::timestamp;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql IMMUTABLE;
+"""
+
+
+def _copy(cur, table, allowed, fileobj):
+    header = next(csv.reader([fileobj.readline()]), [])
+    columns = [h.strip().lower() for h in header]
+
+    unknown = [c for c in columns if c not in allowed]
+    if not columns or unknown:
+        raise ValueError(f"unexpected CSV columns: {', '.join(unknown) or '(none)'}")
+
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        fileobj
+    )
+    return cur.rowcount
+
+
+def _reject(cur, table, reason, condition):
+    cur.execute(f"""
+        UPDATE {table} s
+        SET reject = %s
+        WHERE s.reject IS NULL
+          AND ({condition})
+    """, (reason,))
+
+
+def _rejects(cur, table, columns):
+    cur.execute(f"""
+        SELECT line, reject, {", ".join(f"raw_{c}" for c in columns)}
+        FROM {table}
+        WHERE reject IS NOT NULL
+        ORDER BY line
+    """)
+    return cur.fetchall()
+
+
+# ------------------ LEAVE ------------------
+def import_leave(cur, fileobj):
+    cur.execute(_HELPERS)
+    cur.execute(f"""
+        CREATE TEMP TABLE raw_leave (
+            line BIGSERIAL,
+            {", ".join(f"{c} TEXT" for c in LEAVE_COLUMNS)}
+        ) ON COMMIT DROP
+    """)
+    _copy(cur, "raw_leave", LEAVE_COLUMNS, fileobj)
+
+    cur.execute(f"""
+        CREATE TEMP TABLE stage_leave ON COMMIT DROP AS
+        SELECT
+            line + 1 AS line,
+            NULLIF(TRIM(username), '') AS username,
+            NULLIF(LOWER(TRIM(leave_type)), '') AS leave_type,
+            pg_temp.try_date(from_date) AS from_date,
+            COALESCE(pg_temp.try_date(to_date), pg_temp.try_date(from_date)) AS to_date,
+            COALESCE(reason, '') AS reason,
+            CASE WHEN TRIM(status) ~ '^[0-4]$' THEN TRIM(status)::int
+                 WHEN COALESCE(TRIM(status), '') = '' THEN 2
+            END AS status,
+            COALESCE(NULLIF(TRIM(requested_on), ''), TO_CHAR(NOW(), 'YYYY-MM-DD HH24:MI')) AS requested_on,
+            NULL::TEXT AS reject,
+            {", ".join(f"{c} AS raw_{c}" for c in LEAVE_COLUMNS)}
+        FROM raw_leave
+    """)
+
+    _reject(cur, "stage_leave", "missing username, leave_type or from_date",
+            "s.username IS NULL OR s.leave_type IS NULL OR s.raw_from_date IS NULL")
+    _reject(cur, "stage_leave", "invalid date",
+            "s.from_date IS NULL OR (COALESCE(TRIM(s.raw_to_date), '') <> '' "
+            "AND pg_temp.try_date(s.raw_to_date) IS NULL)")
+    _reject(cur, "stage_leave", "to_date before from_date",
+            "s.to_date < s.from_date")
+    _reject(cur, "stage_leave", "unknown leave_type",
+            "s.leave_type <> ALL(ARRAY[%s])" % ", ".join(f"'{t}'" for t in LEAVE_TYPES))
+    _reject(cur, "stage_leave", "invalid status",
+            "s.status IS NULL")
+
+    cur.execute("""
+        ALTER TABLE stage_leave ADD COLUMN leave_range DATERANGE;
+        UPDATE stage_leave
+        SET leave_range = daterange(from_date, to_date, '[]')
+        WHERE reject IS NULL;
+        CREATE INDEX ON stage_leave(username);
+        ANALYZE stage_leave;
+    """)
+
+    # Same rule as the /leave form: pending or approved leave may not
+    # share a day, whether it is already stored or elsewhere in the file.
+    _reject(cur, "stage_leave", "leave already exists for these dates", """
+        s.status IN (0, 2) AND EXISTS (
+            SELECT 1
+            FROM leave_requests l
+            WHERE l.username = s.username
+              AND l.status IN (0, 2)
+              AND l.leave_range && s.leave_range
+        )
+    """)
+    _reject(cur, "stage_leave", "overlaps another leave row in the file", """
+        s.status IN (0, 2) AND EXISTS (
+            SELECT 1
+            FROM stage_leave o
+            WHERE o.username = s.username
+              AND o.line <> s.line
+              AND o.reject IS NULL
+              AND o.status IN (0, 2)
+              AND o.leave_range && s.leave_range
+        )
+    """)
+
+    cur.execute("""
+        INSERT INTO leave_requests (
+            username, leave_type, leave_dates, from_date, to_date,
+            reason, status, requested_on
+        )
+        SELECT
+            username,
+            leave_type,
+            CASE WHEN from_date = to_date THEN from_date::text
+                 ELSE from_date::text || ' to ' || to_date::text
+            END,
+            from_date,
+            to_date,
+            reason,
+            status,
+            requested_on
+        FROM stage_leave
+        WHERE reject IS NULL
+        ORDER BY line
+    """)
+    inserted = cur.rowcount
+
+    return inserted, _rejects(cur, "stage_leave", LEAVE_COLUMNS)
+
+
+# ------------------ ACTIVITIES ------------------
+def import_activities(cur, fileobj):
+    cur.execute(_HELPERS)
+    cur.execute(f"""
+        CREATE TEMP TABLE raw_activities (
+            line BIGSERIAL,
+            {", ".join(f"{c} TEXT" for c in ACTIVITY_COLUMNS)}
+        ) ON COMMIT DROP
+    """)
+    _copy(cur, "raw_activities", ACTIVITY_COLUMNS, fileobj)
+
+    cur.execute(f"""
+        CREATE TEMP TABLE stage_activities ON COMMIT DROP AS
+        SELECT
+            line + 1 AS line,
+            NULLIF(TRIM(username), '') AS username,
+            pg_temp.try_date(activity_date) AS activity_date,
+            NULLIF(TRIM(activity_name), '') AS activity_name,
+            pg_temp.try_time(start_time) AS start_time,
+            pg_temp.try_time(end_time) AS end_time,
+            pg_temp.try_time(clock_in) AS clock_in,
+            pg_temp.try_time(clock_out) AS clock_out,
+            COALESCE(pg_temp.try_timestamp(submitted_at), NOW()::timestamp) AS submitted_at,
+            NULL::TEXT AS reject,
+            {", ".join(f"{c} AS raw_{c}" for c in ACTIVITY_COLUMNS)}
+        FROM raw_activities
+    """)
+
+    _reject(cur, "stage_activities", "missing required field",
+            "s.username IS NULL OR s.activity_name IS NULL "
+            "OR COALESCE(TRIM(s.raw_activity_date), '') = '' "
+            "OR COALESCE(TRIM(s.raw_start_time), '') = '' "
+            "OR COALESCE(TRIM(s.raw_end_time), '') = ''")
+    _reject(cur, "stage_activities", "invalid date or time",
+            "s.activity_date IS NULL OR s.start_time IS NULL OR s.end_time IS NULL")
+    _reject(cur, "stage_activities", "end time must be after start time",
+            "s.end_time <= s.start_time")
+
+    cur.execute("""
+        CREATE INDEX ON stage_activities(username, activity_date, start_time);
+        ANALYZE stage_activities;
+    """)
+
+    _reject(cur, "stage_activities", "duplicate slot in the file", """
+        EXISTS (
+            SELECT 1
+            FROM stage_activities o
+            WHERE o.username = s.username
+              AND o.activity_date = s.activity_date
+              AND o.start_time = s.start_time
+              AND o.end_time = s.end_time
+              AND o.line < s.line
+              AND o.reject IS NULL
+        )
+    """)
+
+    # Same rules as the /activity form. An identical stored slot is
+    # replaced, so only a different slot counts as an overlap.
+    _reject(cur, "stage_activities", "on approved leave", """
+        EXISTS (
+            SELECT 1
+            FROM leave_requests l
+            WHERE l.username = s.username
+              AND l.status = 2
+              AND l.leave_range @> s.activity_date
+        )
+    """)
+    _reject(cur, "stage_activities", "overlaps an existing activity", """
+        EXISTS (
+            SELECT 1
+            FROM activities a
+            WHERE a.username = s.username
+              AND a.activity_date = s.activity_date
+              AND a.start_time < s.end_time
+              AND a.end_time > s.start_time
+              AND (a.start_time, a.end_time) <> (s.start_time, s.end_time)
+        )
+    """)
+    _reject(cur, "stage_activities", "overlaps another row in the file", """
+        EXISTS (
+            SELECT 1
+            FROM stage_activities o
+            WHERE o.username = s.username
+              AND o.activity_date = s.activity_date
+              AND o.line <> s.line
+              AND o.reject IS NULL
+              AND o.start_time < s.end_time
+              AND o.end_time > s.start_time
+        )
+    """)
+
+    cur.execute("""
+        INSERT INTO activities (
+            username, activity_date, clock_in,
+            activity_name, start_time, end_time,
+            duration, clock_out, submitted_at
+        )
+        SELECT
+            username,
+            activity_date,
+            clock_in,
+            activity_name,
+            start_time,
+            end_time,
+            (EXTRACT(EPOCH FROM end_time - start_time) / 60)::int,
+            clock_out,
+            submitted_at
+        FROM stage_activities
+        WHERE reject IS NULL
+        ON CONFLICT ON CONSTRAINT activities_slot_key DO UPDATE
+        SET clock_in = EXCLUDED.clock_in,
+            activity_name = EXCLUDED.activity_name,
+            duration = EXCLUDED.duration,
+            clock_out = EXCLUDED.clock_out,
+            submitted_at = EXCLUDED.submitted_at
+    """)
+    inserted = cur.rowcount
+
+    summary.refresh_days(cur, """
+        SELECT username, activity_date
+        FROM stage_activities
+        WHERE reject IS NULL
+    """)
+
+    return inserted, _rejects(cur, "stage_activities", ACTIVITY_COLUMNS)
+
+
+def write_rejects(rows, columns, fileobj):
+    writer = csv.writer(fileobj)
+    writer.writerow(["line", "reason"] + columns)
+    for row in rows:
+        writer.writerow(list(row.values()))
+
+
+def open_csv(path):
+    return io.open(path, "r", encoding="utf-8-sig", newline="")
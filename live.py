@@ -0,0 +1,223 @@
+import json
+import os
+import queue
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+
+
+# ------------------ LIVE PENDING COUNTS ------------------
+# Writes that change the number of pending reset or leave requests call
+# notify() inside their transaction; Postgres delivers the event on
+# commit. Each worker process keeps one LISTEN connection, re-counts once
+# per burst of events and fans the result out to every manager browser
+# connected to that worker over Server-Sent Events.
+
+CHANNEL = "daily_tracker_pending"
+
+# Seconds between SSE keep-alive comments, and how long one stream is held
+# before the browser is told to reconnect (EventSource does so itself).
+KEEPALIVE = float(os.environ.get("SSE_KEEPALIVE", "20"))
+STREAM_MAX_AGE = float(os.environ.get("SSE_MAX_AGE", "300"))
+RETRY_MS = 3000
+
+# Each open stream holds one of the worker's gthread threads. Past this
+# many per worker, new streams are refused with a 503 so the rest of the
+# threads stay free for ordinary requests; the default is half of
+# gunicorn.conf.py's 8 threads.
+MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", "4"))
+
+_COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM users WHERE reset_requested = 1) AS reset_requests,
+        (SELECT COUNT(*) FROM leave_requests WHERE status = 0) AS leave_requests
+"""
+
+
+def notify(cur, kind):
+    cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, kind))
+
+
+def pending_counts(cur):
+    cur.execute(_COUNTS_SQL)
+    row = cur.fetchone()
+    return {
+        "reset_requests": row["reset_requests"],
+        "leave_requests": row["leave_requests"]
+    }
+
+
+class PendingListener:
+
+    def __init__(self, dsn):
+        self.dsn = dsn
+        self.pid = os.getpid()
+
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._latest = None
+
+    # None when MAX_STREAMS browsers are already subscribed.
+    def subscribe(self):
+        q = queue.Queue(maxsize=1)
+
+        with self._lock:
+            if len(self._subscribers) >= MAX_STREAMS:
+                return None
+            self._subscribers.add(q)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="pending-listener",
+                    daemon=True
+                )
+                self._thread.start()
+
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    # Counts as of the last event, or None while not listening.
+    def latest(self):
+        with self._lock:
+            return self._latest
+
+    def _publish(self, counts):
+        with self._lock:
+            self._latest = counts
+            subscribers = list(self._subscribers)
+
+        # Each queue holds only the latest counts; a slow browser skips
+        # stale values instead of backing up.
+        for q in subscribers:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait(counts)
+            except queue.Full:
+                pass
+
+    def _listen(self):
+        conn = psycopg2.connect(
+            self.dsn,
+            cursor_factory=psycopg2.extras.RealDictCursor
+        )
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+
+        try:
+            cur = conn.cursor()
+            cur.execute(f"LISTEN {CHANNEL}")
+
+            # Anything committed while we were disconnected.
+            self._publish(pending_counts(cur))
+
+            while True:
+                if select.select([conn], [], [], KEEPALIVE) == ([], [], []):
+                    continue
+
+                conn.poll()
+                if not conn.notifies:
+                    continue
+
+                # One count for the whole burst, however many arrived.
+                conn.notifies.clear()
+                self._publish(pending_counts(cur))
+        finally:
+            # Events missed while reconnecting would leave these stale.
+            with self._lock:
+                self._latest = None
+            conn.close()
+
+    def _run(self):
+        delay = 1
+
+        while True:
+            started = time.monotonic()
+            try:
+                self._listen()
+            except psycopg2.Error:
+                pass
+
+            if time.monotonic() - started > 60:
+                delay = 1
+            time.sleep(delay)
+            delay = min(delay * 2, 30)
+
+
+# ------------------ PER-WORKER LISTENER ------------------
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def get_listener():
+    global _listener
+
+    # Like the pool, a listener inherited through fork() belongs to the
+    # parent; each worker starts its own on first use.
+    if _listener is None or _listener.pid != os.getpid():
+        with _listener_lock:
+            if _listener is None or _listener.pid != os.getpid():
+                _listener = PendingListener(os.environ.get("DATABASE_URL"))
+    return _listener
+
+
+# Browsers streaming from this worker, without starting a listener.
+def subscriber_count():
+    listener = _listener
+    if listener is None or listener.pid != os.getpid():
+        return 0
+    return listener.subscriber_count()
+
+
+# Pending counts without a query while this worker's listener is
+# connected, otherwise one query.
+def current_counts(cur):
+    listener = _listener
+    if listener is not None and listener.pid == os.getpid():
+        counts = listener.latest()
+        if counts is not None:
+            return counts
+    return pending_counts(cur)
+
+
+def _event(counts):
+    return f"event: counts\ndata: {json.dumps(counts)}\n\n"
+
+
+# SSE body for one browser, subscribed to the listener before `initial`
+# was counted so no change in between is lost: the current counts
+# straight away, then one event per change, keep-alives in between, and
+# a clean end after STREAM_MAX_AGE so a worker thread is never held
+# indefinitely.
+def stream(listener, q, initial):
+    try:
+        yield f"retry: {RETRY_MS}\n" + _event(initial)
+
+        last = initial
+        deadline = time.monotonic() + STREAM_MAX_AGE
+
+        while time.monotonic() < deadline:
+            try:
+                counts = q.get(timeout=KEEPALIVE)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+
+            if counts != last:
+                last = counts
+                yield _event(counts)
+    finally:
+        listener.unsubscribe(q)
@@ -0,0 +1,333 @@
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+
+# ------------------ METRICS ------------------
+# Prometheus-format metrics shared by every gunicorn worker on the host.
+# Each worker updates plain in-memory values (no I/O on the request path)
+# and a background thread writes them to its own snapshot file in
+# METRICS_DIR whenever they change, at most every FLUSH_INTERVAL seconds.
+# A scrape, served by whichever worker gets it, sums every snapshot.
+#
+# Counters and histograms from workers that have exited are folded into
+# an archive file so totals never go backwards; their gauges are dropped.
+
+METRICS_DIR = os.environ.get(
+    "METRICS_DIR",
+    os.path.join(tempfile.gettempdir(), "daily_tracker_metrics")
+)
+FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "1"))
+
+ARCHIVE = "archive.json"
+LOCK = ".lock"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PDF_SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PDF_BYTES_BUCKETS = (10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    "daily_tracker_http_requests_total": (
+        "counter", "HTTP requests by route, method and status.", None),
+    "daily_tracker_http_request_duration_seconds": (
+        "histogram", "Time to produce the response (streamed bodies excluded).", LATENCY_BUCKETS),
+    "daily_tracker_http_requests_in_flight": (
+        "gauge", "Requests being handled right now.", None),
+    "daily_tracker_db_seconds_total": (
+        "counter", "Time spent in SQL statements, by route.", None),
+    "daily_tracker_db_queries_total": (
+        "counter", "SQL statements run, by route.", None),
+    "daily_tracker_db_pool_connections": (
+        "gauge", "Pooled database connections by state.", None),
+    "daily_tracker_db_pool_max_connections": (
+        "gauge", "Pool size limit, summed over workers.", None),
+    "daily_tracker_db_pool_checkouts_total": (
+        "counter", "Connections handed out by the pools.", None),
+    "daily_tracker_db_pool_waits_total": (
+        "counter", "Checkouts that had to wait for a free connection.", None),
+    "daily_tracker_db_pool_timeouts_total": (
+        "counter", "Checkouts that gave up waiting.", None),
+    "daily_tracker_sse_connections": (
+        "gauge", "Manager browsers connected to the live counts stream.", None),
+    "daily_tracker_pdf_render_seconds": (
+        "histogram", "Employee month PDF render time (cache misses only).", PDF_SECONDS_BUCKETS),
+    "daily_tracker_pdf_bytes": (
+        "histogram", "Employee month PDF size.", PDF_BYTES_BUCKETS),
+    "daily_tracker_pdf_requests_total": (
+        "counter", "Employee month PDF requests by cache result.", None),
+    "daily_tracker_activity_rows_written_total": (
+        "counter", "Activity rows inserted or updated.", None),
+    "daily_tracker_leave_requests_handled_total": (
+        "counter", "Leave requests by action.", None),
+}
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+class Registry:
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.path = os.path.join(METRICS_DIR, f"{self.pid}-{uuid.uuid4().hex[:8]}.json")
+
+        self._values = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._written = None
+
+    def _start(self):
+        # Under self._lock.
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+            self._thread.start()
+
+    # Counters, and gauges moved up and down (amount may be negative).
+    def inc(self, name, amount=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self._start()
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name][2]
+        key = (name, _labels(labels))
+
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket counts (not cumulative), then sum and count.
+                entry = self._values[key] = [0] * len(buckets) + [0.0, 0]
+
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[i] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+            self._start()
+
+    # fn() returns [(name, labels dict, value), ...] read at flush time,
+    # for values something else already keeps (pool stats and the like).
+    def collector(self, fn):
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def snapshot(self):
+        with self._lock:
+            values = [
+                [name, list(labels), list(value) if isinstance(value, list) else value]
+                for (name, labels), value in self._values.items()
+            ]
+            collectors = list(self._collectors)
+
+        for fn in collectors:
+            try:
+                for name, labels, value in fn():
+                    values.append([name, list(_labels(labels)), value])
+            except Exception:
+                pass
+        return values
+
+    def flush(self):
+        data = json.dumps(self.snapshot(), sort_keys=True)
+        if data == self._written:
+            return
+
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=METRICS_DIR, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self._written = data
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+
+# ------------------ PER-WORKER REGISTRY ------------------
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+
+    # Values counted in the parent before fork() stay with the parent.
+    if _registry is None or _registry.pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry.pid != os.getpid():
+                collectors = _registry._collectors if _registry is not None else []
+                _registry = Registry()
+                _registry._collectors = list(collectors)
+    return _registry
+
+
+def inc(name, amount=1, **labels):
+    get_registry().inc(name, amount, **labels)
+
+
+def observe(name, value, **labels):
+    get_registry().observe(name, value, **labels)
+
+
+def collector(fn):
+    return get_registry().collector(fn)
+
+
+# ------------------ AGGREGATION ------------------
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(totals, entries, gauges=True):
+    for name, labels, value in entries:
+        if name not in METRICS:
+            continue
+        if METRICS[name][0] == "gauge" and not gauges:
+            continue
+
+        key = (name, tuple(tuple(pair) for pair in labels))
+        if isinstance(value, list):
+            current = totals.get(key)
+            if current is None or len(current) != len(value):
+                totals[key] = list(value)
+            else:
+                totals[key] = [a + b for a, b in zip(current, value)]
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+# Sum of every worker's snapshot, folding exited workers into the archive.
+def collect():
+    get_registry().flush()
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+    with open(os.path.join(METRICS_DIR, LOCK), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        archive = {}
+        _merge(archive, _read(os.path.join(METRICS_DIR, ARCHIVE)) or [], gauges=False)
+
+        live = {}
+        dead = []
+        for filename in os.listdir(METRICS_DIR):
+            if filename.startswith(".") or filename == ARCHIVE or not filename.endswith(".json"):
+                continue
+            path = os.path.join(METRICS_DIR, filename)
+            try:
+                pid = int(filename.split("-", 1)[0])
+            except ValueError:
+                continue
+
+            entries = _read(path)
+            if entries is None:
+                continue
+
+            if _alive(pid):
+                _merge(live, entries)
+            else:
+                _merge(archive, entries, gauges=False)
+                dead.append(path)
+
+        if dead:
+            fd, tmp = tempfile.mkstemp(dir=METRICS_DIR, prefix=".tmp-")
+            with os.fdopen(fd, "w") as f:
+                json.dump([[name, list(labels), value] for (name, labels), value in archive.items()], f)
+            os.replace(tmp, os.path.join(METRICS_DIR, ARCHIVE))
+            for path in dead:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    totals = archive
+    for key, value in live.items():
+        if key in totals and isinstance(value, list):
+            totals[key] = [a + b for a, b in zip(totals[key], value)]
+        elif key in totals:
+            totals[key] += value
+        else:
+            totals[key] = value
+    return totals
+
+
+# ------------------ TEXT FORMAT ------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render():
+    totals = collect()
+
+    by_name = {}
+    for (name, labels), value in totals.items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        series = sorted(by_name.get(name, []))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+        for labels, value in series:
+            if kind != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', _number(float(bound)))])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {value[-1]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_number(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,303 @@
+import db
+
+
+# ------------------ MIGRATIONS ------------------
+# Numbered, append-only. Each one runs exactly once, in its own
+# transaction, and is recorded in schema_migrations. Never edit a
+# migration that has shipped; add a new one instead.
+MIGRATIONS = [
+    (1, "initial schema", """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username TEXT UNIQUE,
+            password TEXT,
+            reset_requested INTEGER DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS leave_requests (
+            id SERIAL PRIMARY KEY,
+            username TEXT,
+            leave_type TEXT,
+            leave_dates TEXT,
+            reason TEXT,
+            status INTEGER DEFAULT 0,
+            requested_on TEXT
+        );
+
+        ALTER TABLE leave_requests
+        ADD COLUMN IF NOT EXISTS from_date DATE;
+
+        ALTER TABLE leave_requests
+        ADD COLUMN IF NOT EXISTS to_date DATE;
+
+        CREATE TABLE IF NOT EXISTS activities (
+            id SERIAL PRIMARY KEY,
+            username TEXT,
+            activity_date DATE,
+            clock_in TIME,
+            activity_name TEXT,
+            start_time TIME,
+            end_time TIME,
+            duration INTEGER,
+            clock_out TIME,
+            submitted_at TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_activity_unique
+        ON activities(username, activity_date, start_time, end_time);
+    """),
+
+    (2, "leave date ranges", r"""
+        -- A date that matches the pattern but does not exist, such as
+        -- 2025-02-30, becomes NULL instead of aborting the migration.
+        CREATE FUNCTION pg_temp.try_date(t TEXT) RETURNS DATE AS $$
+        BEGIN
+            RETURN t::date;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql IMMUTABLE;
+
+        -- Backfill from the free-text column. Rows that never parsed, name
+        -- a day that does not exist or end before they start keep NULL
+        -- dates and a NULL range, so they stay ignored as before.
+        UPDATE leave_requests l
+        SET from_date = p.first_day,
+            to_date = p.last_day
+        FROM (
+            SELECT id,
+                   pg_temp.try_date(m[1]) AS first_day,
+                   pg_temp.try_date(COALESCE(m[2], m[1])) AS last_day
+            FROM (
+                SELECT id,
+                       regexp_match(
+                           leave_dates,
+                           '^\s*(\d{4}-\d{2}-\d{2})(?:\s+to\s+(\d{4}-\d{2}-\d{2}))?\s*$'
+                       ) AS m
+                FROM leave_requests
+                WHERE from_date IS NULL
+            ) parsed
+            WHERE m IS NOT NULL
+        ) p
+        WHERE l.id = p.id
+          AND p.last_day >= p.first_day;
+
+        ALTER TABLE leave_requests
+        ADD COLUMN leave_range DATERANGE
+        GENERATED ALWAYS AS (
+            CASE WHEN from_date IS NOT NULL
+                 THEN daterange(from_date, COALESCE(to_date, from_date), '[]')
+            END
+        ) STORED;
+
+        CREATE INDEX idx_leave_user_status
+        ON leave_requests(username, status);
+
+        -- Only pending and approved leave can block a date.
+        CREATE INDEX idx_leave_range
+        ON leave_requests USING GIST (leave_range)
+        WHERE status IN (0, 2);
+    """),
+
+    (3, "activity month indexes", """
+        -- Manager dashboard: every user's rows for one month, summed
+        -- without visiting the heap. Per-user month lookups are already
+        -- served by idx_activity_unique (username, activity_date, ...).
+        CREATE INDEX IF NOT EXISTS idx_activity_date_user
+        ON activities(activity_date, username)
+        INCLUDE (duration);
+
+        ANALYZE activities;
+    """),
+
+    (4, "daily activity summary", """
+        CREATE TABLE daily_activity_summary (
+            username TEXT NOT NULL,
+            activity_date DATE NOT NULL,
+            total_minutes INTEGER NOT NULL DEFAULT 0,
+            activity_count INTEGER NOT NULL DEFAULT 0,
+            clock_in TIME,
+            clock_out TIME,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (username, activity_date)
+        );
+
+        CREATE INDEX idx_summary_date
+        ON daily_activity_summary(activity_date)
+        INCLUDE (username, total_minutes);
+
+        INSERT INTO daily_activity_summary (
+            username, activity_date, total_minutes, activity_count,
+            clock_in, clock_out
+        )
+        SELECT
+            username,
+            activity_date,
+            COALESCE(SUM(duration), 0),
+            COUNT(*),
+            (ARRAY_AGG(clock_in ORDER BY submitted_at, id)
+                FILTER (WHERE clock_in IS NOT NULL))[1],
+            (ARRAY_AGG(clock_out ORDER BY submitted_at DESC, id DESC)
+                FILTER (WHERE clock_out IS NOT NULL))[1]
+        FROM activities
+        WHERE username IS NOT NULL
+          AND activity_date IS NOT NULL
+        GROUP BY username, activity_date;
+    """),
+
+    (5, "unique activity slots", """
+        -- Keep the most recent submission of each duplicated slot. The
+        -- unique constraint treats NULLs as distinct, so rows with a NULL
+        -- in any slot column are never duplicates and are left alone.
+        CREATE TEMP TABLE dup_days ON COMMIT DROP AS
+        SELECT DISTINCT username, activity_date
+        FROM (
+            SELECT username, activity_date,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY username, activity_date, start_time, end_time
+                       ORDER BY submitted_at DESC NULLS LAST, id DESC
+                   ) AS rn
+            FROM activities
+            WHERE username IS NOT NULL
+              AND activity_date IS NOT NULL
+              AND start_time IS NOT NULL
+              AND end_time IS NOT NULL
+        ) ranked
+        WHERE rn > 1;
+
+        DELETE FROM activities a
+        USING (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY username, activity_date, start_time, end_time
+                       ORDER BY submitted_at DESC NULLS LAST, id DESC
+                   ) AS rn
+            FROM activities
+            WHERE username IS NOT NULL
+              AND activity_date IS NOT NULL
+              AND start_time IS NOT NULL
+              AND end_time IS NOT NULL
+        ) ranked
+        WHERE a.id = ranked.id
+          AND ranked.rn > 1;
+
+        -- The duplicates were counted in the rollup; recompute those days.
+        DELETE FROM daily_activity_summary s
+        USING dup_days d
+        WHERE s.username = d.username
+          AND s.activity_date = d.activity_date;
+
+        INSERT INTO daily_activity_summary (
+            username, activity_date, total_minutes, activity_count,
+            clock_in, clock_out
+        )
+        SELECT
+            a.username,
+            a.activity_date,
+            COALESCE(SUM(a.duration), 0),
+            COUNT(*),
+            (ARRAY_AGG(a.clock_in ORDER BY a.submitted_at, a.id)
+                FILTER (WHERE a.clock_in IS NOT NULL))[1],
+            (ARRAY_AGG(a.clock_out ORDER BY a.submitted_at DESC, a.id DESC)
+                FILTER (WHERE a.clock_out IS NOT NULL))[1]
+        FROM activities a
+        JOIN dup_days d
+          ON d.username = a.username
+         AND d.activity_date = a.activity_date
+        GROUP BY a.username, a.activity_date;
+
+        CREATE UNIQUE INDEX activities_slot_key
+        ON activities(username, activity_date, start_time, end_time);
+
+        ALTER TABLE activities
+        ADD CONSTRAINT activities_slot_key
+        UNIQUE USING INDEX activities_slot_key;
+
+        DROP INDEX IF EXISTS idx_activity_unique;
+    """),
+
+    (6, "leave pagination indexes", """
+        -- Employee leave history, newest first, one page at a time.
+        CREATE INDEX IF NOT EXISTS idx_leave_user_id
+        ON leave_requests(username, id DESC);
+
+        -- Manager approval queue: pending requests in the order they
+        -- were made, paged by (requested_on, id).
+        CREATE INDEX IF NOT EXISTS idx_leave_pending
+        ON leave_requests(requested_on, id)
+        WHERE status = 0;
+
+        ANALYZE leave_requests;
+    """),
+]
+
+# Arbitrary constant; keeps two deploys from migrating at the same time.
+MIGRATION_LOCK_ID = 72201
+
+
+def _ensure_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+
+
+def applied_versions(conn):
+    cur = conn.cursor()
+    _ensure_version_table(cur)
+    cur.execute("SELECT version FROM schema_migrations")
+    versions = {row["version"] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def pending(conn):
+    done = applied_versions(conn)
+    return [m for m in MIGRATIONS if m[0] not in done]
+
+
+def migrate(log=print):
+    applied = []
+
+    with db.connection() as conn:
+        cur = conn.cursor()
+
+        # Session-level lock, so it survives the per-migration commits.
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            for version, name, step in pending(conn):
+                log(f"Applying {version:04d} {name} ...")
+
+                if callable(step):
+                    step(cur)
+                else:
+                    cur.execute(step)
+
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                conn.commit()
+                applied.append(version)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+
+    if not applied:
+        log("Schema is up to date.")
+    return applied
+
+
+def status():
+    with db.connection() as conn:
+        done = applied_versions(conn)
+
+    return [
+        (version, name, version in done)
+        for version, name, _ in MIGRATIONS
+    ]
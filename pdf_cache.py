@@ -0,0 +1,97 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+
+# ------------------ RENDERED PDF CACHE ------------------
+# Employee PDFs are stored on local disk under a key made from
+# (username, month, year) and a fingerprint of the rows they were built
+# from. Any change to those rows changes the key, so entries never need
+# invalidating; old ones simply age out. File mtimes double as the LRU
+# clock, which lets every gunicorn worker on the host share the cache.
+
+CACHE_DIR = os.environ.get(
+    "PDF_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "daily_tracker_pdfs")
+)
+MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Bump when the PDF layout in pdf_reports changes.
+RENDER_VERSION = "1"
+
+_evict_lock = threading.Lock()
+
+
+def key(username, month, year, fingerprint):
+    raw = "\0".join([RENDER_VERSION, username, str(month), str(year), fingerprint])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _path(cache_key):
+    return os.path.join(CACHE_DIR, cache_key + ".pdf")
+
+
+def get(cache_key):
+    # Returns an open file, not a path: another worker may evict the
+    # entry at any moment, and an open descriptor keeps the bytes
+    # readable until the response has been sent. The caller closes it.
+    try:
+        f = open(_path(cache_key), "rb")
+    except OSError:
+        return None
+
+    try:
+        # Touch on hit so eviction drops the least recently used files.
+        os.utime(f.fileno())
+    except OSError:
+        pass
+    return f
+
+
+def put(cache_key, pdf):
+    # A PDF bigger than the whole cache would be evicted as soon as it
+    # was written, costing a disk write per request for nothing. Don't
+    # store it at all; the caller serves the bytes it already has.
+    if len(pdf) > MAX_BYTES:
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _path(cache_key)
+
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp, path)
+
+    _evict()
+
+
+def _evict():
+    with _evict_lock:
+        entries = []
+        total = 0
+
+        for entry in os.scandir(CACHE_DIR):
+            if not entry.name.endswith(".pdf"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+        if total <= MAX_BYTES:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= MAX_BYTES:
+                break
+
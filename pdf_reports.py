@@ -0,0 +1,174 @@
+from io import BytesIO
+
+from pypdf import PdfWriter
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+)
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.lib.pagesizes import A4
+
+
+# ------------------ EMPLOYEE ACTIVITY PDF ------------------
+# Pure functions of plain rows (dicts of activity_date, activity_name,
+# start_time, end_time, submitted_at), so they can run in a worker
+# process as well as in the request.
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ALIGN', (2, 1), (3, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+])
+
+
+def _document(buffer, doc_class=SimpleDocTemplate):
+    return doc_class(
+        buffer,
+        pagesize=A4,
+        rightMargin=30,
+        leftMargin=30,
+        topMargin=30,
+        bottomMargin=30
+    )
+
+
+def activity_table(rows, styles):
+    data = [[
+        "Date",
+        "Activity",
+        "Start",
+        "End",
+        "Submitted"
+    ]]
+
+    for r in rows:
+
+        activity_date = r["activity_date"].strftime("%d-%b-%Y") if r["activity_date"] else "-"
+        start = r["start_time"].strftime("%H:%M") if r["start_time"] else "-"
+        end = r["end_time"].strftime("%H:%M") if r["end_time"] else "-"
+
+        if r["submitted_at"]:
+            try:
+                submitted = r["submitted_at"].strftime("%d-%b-%Y %I:%M %p")
+            except:
+                submitted = str(r["submitted_at"])
+        else:
+            submitted = "-"
+
+        data.append([
+            activity_date,
+            Paragraph(r["activity_name"], styles["Normal"]),
+            start,
+            end,
+            submitted
+        ])
+
+    table = Table(
+        data,
+        repeatRows=1,
+        colWidths=[80, 200, 60, 60, 100]  # FIXED WIDTHS
+    )
+    table.setStyle(TABLE_STYLE)
+    return table
+
+
+def employee_section(username, month_name, year, rows, styles, heading="Heading1"):
+    return [
+        Paragraph("<b>Employee Activity Report</b>", styles[heading]),
+        Spacer(1, 0.3 * inch),
+        Paragraph(f"<b>Employee:</b> {username}", styles["Normal"]),
+        Paragraph(f"<b>Month:</b> {month_name} {year}", styles["Normal"]),
+        Spacer(1, 0.4 * inch),
+        activity_table(rows, styles)
+    ]
+
+
+# Returns (pdf bytes, page count).
+def render_employee_pdf(username, month_name, year, rows):
+    buffer = BytesIO()
+    doc = _document(buffer)
+
+    styles = getSampleStyleSheet()
+    doc.build(employee_section(username, month_name, year, rows, styles))
+
+    return buffer.getvalue(), doc.page
+
+
+# ------------------ TEAM PACK ------------------
+# Contents page for a ZIP pack; entries are (username, filename, rows, pages).
+def render_pack_index(month_name, year, entries):
+    buffer = BytesIO()
+    doc = _document(buffer)
+    styles = getSampleStyleSheet()
+
+    data = [["Employee", "File", "Activities", "Pages"]]
+    for username, filename, row_count, pages in entries:
+        data.append([username, filename, row_count, pages])
+
+    table = Table(data, repeatRows=1, colWidths=[140, 230, 80, 60])
+    table.setStyle(TABLE_STYLE)
+
+    doc.build([
+        Paragraph("<b>Team Activity Pack</b>", styles["Heading1"]),
+        Paragraph(f"<b>Month:</b> {month_name} {year}", styles["Normal"]),
+        Spacer(1, 0.3 * inch),
+        table
+    ])
+    return buffer.getvalue()
+
+
+# One employee's part of the merged team PDF: the employee report under
+# the employee's name, rendered on its own so the parts can be laid out
+# in parallel. Returns (pdf bytes, page count).
+def render_team_section(username, month_name, year, rows):
+    buffer = BytesIO()
+    doc = _document(buffer)
+    styles = getSampleStyleSheet()
+
+    story = [Paragraph(username, styles["Heading2"])]
+    story.extend(employee_section(username, month_name, year, rows, styles, "Heading3"))
+    doc.build(story)
+
+    return buffer.getvalue(), doc.page
+
+
+# Contents page(s) for the merged team PDF; entries are (username, rows,
+# first page). Returns (pdf bytes, page count).
+def render_team_contents(month_name, year, entries):
+    buffer = BytesIO()
+    doc = _document(buffer)
+    styles = getSampleStyleSheet()
+
+    data = [["Employee", "Activities", "Page"]]
+    for username, row_count, first_page in entries:
+        data.append([username, row_count, first_page])
+
+    table = Table(data, repeatRows=1, colWidths=[300, 100, 80])
+    table.setStyle(TABLE_STYLE)
+
+    doc.build([
+        Paragraph("<b>Team Activity Pack</b>", styles["Heading1"]),
+        Paragraph(f"<b>Month:</b> {month_name} {year}", styles["Normal"]),
+        Spacer(1, 0.3 * inch),
+        table
+    ])
+    return buffer.getvalue(), doc.page
+
+
+# Contents, then every section file in order, with a bookmark per
+# employee; `sections` is a list of (username, path). Written to `output`.
+def merge_team_pdf(contents, sections, output):
+    writer = PdfWriter()
+    writer.append(BytesIO(contents), outline_item="Contents")
+
+    for username, path in sections:
+        writer.append(path, outline_item=username)
+
+    with open(output, "wb") as f:
+        writer.write(f)
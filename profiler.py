@@ -0,0 +1,268 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+
+# ------------------ SAMPLING PROFILER ------------------
+# Opt-in statistical profiling of live requests. While a request is being
+# profiled, one sampler thread per worker reads that request thread's
+# Python stack every INTERVAL_MS and counts identical stacks; the request
+# itself runs untouched, so the cost is the sampler's own wake-ups and
+# nothing at all when no request is being profiled.
+#
+# Each profile is written as a speedscope file (https://www.speedscope.app
+# opens it directly; collapsed stacks are derived on download) into
+# PROFILE_DIR, which keeps only the newest MAX_FILES.
+
+PROFILE_DIR = os.environ.get(
+    "PROFILE_DIR",
+    os.path.join(tempfile.gettempdir(), "daily_tracker_profiles")
+)
+
+# Profile one request in SAMPLE_ONE_IN (0 turns random sampling off),
+# limited to ENDPOINTS when that is set (comma-separated endpoint names).
+SAMPLE_ONE_IN = int(os.environ.get("PROFILE_ONE_IN", "0"))
+ENDPOINTS = {e.strip() for e in os.environ.get("PROFILE_ENDPOINTS", "").split(",") if e.strip()}
+
+INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "200"))
+MAX_DEPTH = 128
+
+SUFFIX = ".speedscope.json"
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def sampled(endpoint):
+    if SAMPLE_ONE_IN <= 0:
+        return False
+    if ENDPOINTS and endpoint not in ENDPOINTS:
+        return False
+    return random.randrange(SAMPLE_ONE_IN) == 0
+
+
+def _frame_name(code):
+    filename = code.co_filename
+    if filename.startswith(_BASE_DIR + os.sep):
+        filename = filename[len(_BASE_DIR) + 1:]
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    return (code.co_name, filename, code.co_firstlineno)
+
+
+class Profile:
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.wall_started = datetime.now()
+        self.stacks = {}
+        self.samples = 0
+        self.duration = None
+
+    def add(self, frame):
+        stack = []
+        while frame is not None and len(stack) < MAX_DEPTH:
+            stack.append(_frame_name(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+
+        key = tuple(stack)
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+        self.samples += 1
+
+
+class Sampler:
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._active = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        profile = Profile(threading.get_ident())
+
+        with self._cond:
+            self._active[profile.thread_id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+        return profile
+
+    def stop(self, profile):
+        with self._cond:
+            self._active.pop(profile.thread_id, None)
+        profile.duration = time.perf_counter() - profile.started
+        return profile
+
+    def _run(self):
+        interval = INTERVAL_MS / 1000
+
+        while True:
+            with self._cond:
+                while not self._active:
+                    self._cond.wait()
+                active = list(self._active.values())
+
+            frames = sys._current_frames()
+            for profile in active:
+                frame = frames.get(profile.thread_id)
+                if frame is not None:
+                    profile.add(frame)
+            del frames
+
+            time.sleep(interval)
+
+
+# ------------------ PER-WORKER SAMPLER ------------------
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    global _sampler
+
+    # The sampler thread does not survive fork(); each worker starts its own.
+    if _sampler is None or _sampler.pid != os.getpid():
+        with _sampler_lock:
+            if _sampler is None or _sampler.pid != os.getpid():
+                _sampler = Sampler()
+    return _sampler
+
+
+def start():
+    return get_sampler().start()
+
+
+def stop(profile):
+    return get_sampler().stop(profile)
+
+
+# ------------------ FILES ------------------
+# A request shorter than one interval may have no samples; nothing is
+# written for it.
+def save(profile, method, path, endpoint, status, trigger):
+    if not profile.samples:
+        return None
+
+    frames = []
+    index = {}
+    samples = []
+    weights = []
+
+    for stack, count in sorted(profile.stacks.items(), key=lambda item: -item[1]):
+        ids = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                name, filename, line = frame
+                frames.append({"name": name, "file": filename, "line": line})
+            ids.append(index[frame])
+        samples.append(ids)
+        weights.append(round(count * INTERVAL_MS, 3))
+
+    duration_ms = round(profile.duration * 1000, 2)
+    title = f"{method} {path} ({endpoint}) {duration_ms} ms"
+
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "exporter": "daily_tracker",
+        "name": title,
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": title,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 3),
+            "samples": samples,
+            "weights": weights
+        }],
+        "meta": {
+            "time": profile.wall_started.isoformat(timespec="seconds"),
+            "method": method,
+            "path": path,
+            "endpoint": endpoint,
+            "status": status,
+            "trigger": trigger,
+            "duration_ms": duration_ms,
+            "samples": profile.samples,
+            "interval_ms": INTERVAL_MS,
+            "pid": os.getpid()
+        }
+    }
+
+    name = (
+        f"{profile.wall_started:%Y%m%d-%H%M%S-%f}-{endpoint or 'unmatched'}-"
+        f"{uuid.uuid4().hex[:8]}{SUFFIX}"
+    )
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=PROFILE_DIR, prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(document, f, separators=(",", ":"))
+    os.replace(tmp, os.path.join(PROFILE_DIR, name))
+
+    _rotate()
+    return name
+
+
+def _names():
+    try:
+        return [n for n in os.listdir(PROFILE_DIR) if n.endswith(SUFFIX)]
+    except OSError:
+        return []
+
+
+# Names start with the timestamp, so newest-first is a reverse sort.
+def _rotate():
+    for name in sorted(_names(), reverse=True)[MAX_FILES:]:
+        try:
+            os.unlink(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            pass
+
+
+# Newest first: (name, meta) for up to `limit` profiles.
+def recent(limit=100):
+    profiles = []
+    for name in sorted(_names(), reverse=True)[:limit]:
+        document = load(name)
+        if document is not None:
+            profiles.append((name, document.get("meta", {})))
+    return profiles
+
+
+# Only names that are actually in PROFILE_DIR, so a request can never
+# read outside it.
+def load(name):
+    if name not in _names():
+        return None
+    try:
+        with open(os.path.join(PROFILE_DIR, name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Brendan Gregg's collapsed format: "root;child;leaf count" per stack.
+def collapsed(document):
+    frames = document["shared"]["frames"]
+    profile = document["profiles"][0]
+    interval = document.get("meta", {}).get("interval_ms") or INTERVAL_MS
+
+    lines = []
+    for ids, weight in zip(profile["samples"], profile["weights"]):
+        stack = ";".join(f"{frames[i]['name']} ({frames[i]['file']}:{frames[i]['line']})" for i in ids)
+        lines.append(f"{stack} {round(weight / interval)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+import psycopg2.extras
+
+
+# ------------------ PER-REQUEST SQL STATS ------------------
+# get_db() hands out connections whose cursors time every statement. While
+# a request is active (begin() .. end() on its thread) each execute adds to
+# that request's count, DB time and per-statement totals; outside a
+# request the cursor behaves exactly like RealDictCursor.
+#
+# Only the statement text is kept, never its parameters, and it is
+# normalized before it is logged, so literals written into the SQL do not
+# leak either.
+
+# Requests whose DB time reaches this many milliseconds are written to the
+# slow-query log; 0 logs every request, a negative value none.
+SLOW_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+
+# JSON lines file for the slow-query log. Unset, entries go through the
+# logging module to stderr like other warnings.
+LOG_PATH = os.environ.get("SLOW_QUERY_LOG")
+
+TOP_STATEMENTS = 5
+MAX_SQL_LENGTH = 2000
+
+_local = threading.local()
+
+_log = logging.getLogger("daily_tracker.slow_sql")
+if LOG_PATH:
+    _handler = logging.FileHandler(LOG_PATH)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _log.addHandler(_handler)
+    _log.setLevel(logging.INFO)
+    _log.propagate = False
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = None
+        self.statements = {}
+
+    def record(self, query, elapsed):
+        self.queries += 1
+        self.db_time += elapsed
+
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_sql = query
+
+        entry = self.statements.get(query)
+        if entry is None:
+            self.statements[query] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+
+def begin():
+    _local.stats = RequestStats()
+    return _local.stats
+
+
+def current():
+    return getattr(_local, "stats", None)
+
+
+def end():
+    stats = current()
+    _local.stats = None
+    return stats
+
+
+class TimedCursor(psycopg2.extras.RealDictCursor):
+
+    def execute(self, query, vars=None):
+        stats = current()
+        if stats is None:
+            return super().execute(query, vars)
+
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            stats.record(query, time.perf_counter() - started)
+
+    def executemany(self, query, vars_list):
+        stats = current()
+        if stats is None:
+            return super().executemany(query, vars_list)
+
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            stats.record(query, time.perf_counter() - started)
+
+
+# ------------------ SQL NORMALIZATION ------------------
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\(\w+\)s|%s")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\b(IN|VALUES)\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.I)
+_SPACE = re.compile(r"\s+")
+
+
+# One line per statement shape: comments dropped, string and numeric
+# literals and placeholders replaced by ?, IN lists collapsed, whitespace
+# squeezed.
+def normalize(query):
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        query = str(query)
+
+    query = _COMMENT.sub(" ", query)
+    query = _STRING.sub("?", query)
+    query = _PARAM.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    query = _LIST.sub(r"\1 (?, ...)", query)
+    query = _SPACE.sub(" ", query).strip()
+
+    if len(query) > MAX_SQL_LENGTH:
+        query = query[:MAX_SQL_LENGTH] + " ..."
+    return query
+
+
+# ------------------ REPORTING ------------------
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def server_timing(stats):
+    total = time.perf_counter() - stats.started
+    return ", ".join([
+        f'db;dur={_ms(stats.db_time)};desc="{stats.queries} queries"',
+        f"db-slowest;dur={_ms(stats.slowest_time)}",
+        f"app;dur={_ms(total)}"
+    ])
+
+
+def log_if_slow(stats, endpoint, method, path, status):
+    if SLOW_MS < 0 or stats.db_time * 1000 < SLOW_MS:
+        return
+
+    # Same statement shape run many times (an N+1) is merged into one line.
+    merged = {}
+    for query, (count, elapsed) in stats.statements.items():
+        entry = merged.setdefault(normalize(query), [0, 0.0])
+        entry[0] += count
+        entry[1] += elapsed
+
+    top = sorted(merged.items(), key=lambda item: item[1][1], reverse=True)
+
+    _log.warning(json.dumps({
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "pid": os.getpid(),
+        "endpoint": endpoint,
+        "method": method,
+        "path": path,
+        "status": status,
+        "duration_ms": _ms(time.perf_counter() - stats.started),
+        "db_ms": _ms(stats.db_time),
+        "queries": stats.queries,
+        "slowest": {
+            "ms": _ms(stats.slowest_time),
+            "sql": normalize(stats.slowest_sql) if stats.slowest_sql is not None else None
+        },
+        "statements": [
+            {"sql": sql, "count": count, "ms": _ms(elapsed)}
+            for sql, (count, elapsed) in top[:TOP_STATEMENTS]
+        ]
+    }))
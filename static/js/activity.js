@@ -0,0 +1,62 @@
+function addActivityRow(name="",start="",end=""){
+
+const container=document.getElementById("activitiesContainer");
+
+const row=document.createElement("div");
+
+row.className="activityRow";
+
+row.innerHTML=`
+
+<div>
+
+<label>Activity Name</label>
+
+<input
+type="text"
+name="activity_name[]"
+value="${name}"
+required>
+
+</div>
+
+<div>
+
+<label>Start Time</label>
+
+<input
+type="time"
+name="start_time[]"
+value="${start}"
+required>
+
+</div>
+
+<div>
+
+<label>End Time</label>
+
+<input
+type="time"
+name="end_time[]"
+value="${end}"
+required>
+
+</div>
+
+<button
+type="button"
+class="remove-btn"
+onclick="removeRow(this)">✖</button>
+
+`;
+
+container.appendChild(row);
+
+}
+
+function removeRow(btn){
+
+btn.parentElement.remove();
+
+}
@@ -0,0 +1,17 @@
+function requestReset(){
+
+fetch("/request-reset",{
+
+method:"POST"
+
+})
+
+.then(()=>{
+
+alert("Reset request sent to manager.");
+
+location.reload();
+
+});
+
+}
@@ -0,0 +1,33 @@
+function toggleDates(type){
+
+    const singleTypes=[
+        "single",
+        "halfday",
+        "compoff",
+        "weeklyoff",
+        "holiday"
+    ];
+
+    document.getElementById("single").style.display=
+        singleTypes.includes(type) ? "block":"none";
+
+    document.getElementById("range").style.display=
+        type==="multiple" ? "block":"none";
+
+    const reasonDiv=document.getElementById("reasonDiv");
+
+    if(type==="weeklyoff" || type==="holiday"){
+
+        reasonDiv.style.display="none";
+        document.getElementById("reason").required=false;
+
+    }
+
+    else{
+
+        reasonDiv.style.display="block";
+        document.getElementById("reason").required=true;
+
+    }
+
+}
@@ -0,0 +1,33 @@
+// "Load more": append the next page of rows and move the cursor on.
+// Without JavaScript the link just opens that page.
+document.getElementById("history-more")?.addEventListener("click",async e=>{
+
+    e.preventDefault();
+
+    const link=e.currentTarget;
+
+    try{
+
+        const res=await fetch(`${link.dataset.rows}?cursor=${encodeURIComponent(link.dataset.cursor)}`);
+
+        if(!res.ok){
+            throw new Error(res.status);
+        }
+
+        document.getElementById("history-rows").insertAdjacentHTML("beforeend",await res.text());
+
+        const next=res.headers.get("X-Next-Cursor");
+
+        if(next){
+            link.dataset.cursor=next;
+        }else{
+            link.parentElement.remove();
+        }
+
+    }catch(err){
+
+        window.location=link.href;
+
+    }
+
+});
@@ -0,0 +1,345 @@
+// Values from the page, set on this script's tag.
+const pageData=document.currentScript.dataset;
+
+if(typeof ChartDataLabels!=="undefined"){
+    Chart.register(ChartDataLabels);
+}
+
+const prodPercent = Number(pageData.productivity) || 0;
+const idlePercent=(100-prodPercent).toFixed(1);
+
+const prodChart=new Chart(document.getElementById("prodChart"),{
+
+    type:"doughnut",
+
+    data:{
+
+        labels:["Productive","Idle"],
+
+        datasets:[{
+
+            data:[prodPercent,idlePercent],
+
+            backgroundColor:[
+                "#22c55e",
+                "#ef4444"
+            ],
+
+            borderWidth:0,
+
+            hoverOffset:12
+
+        }]
+
+    },
+
+    options:{
+
+        responsive:true,
+
+        maintainAspectRatio:false,
+
+        cutout:"70%",
+
+        layout:{
+            padding:{
+                top:30,
+                right:35,
+                bottom:30,
+                left:35
+            }
+        },
+
+        plugins:{
+
+            legend:{
+                position:"bottom",
+                labels:{
+                    font:{
+                        size:14,
+                        weight:"600"
+                    }
+                }
+            },
+
+            datalabels:{
+
+                color:"#000",
+
+                font:{
+                    size:14,
+                    weight:"bold"
+                },
+
+                formatter:function(value){
+                    return value+"%";
+                },
+
+                anchor:"Center",
+
+                align:"Center",
+
+                offset:18,
+
+                clamp:false,
+
+                clip:false
+
+            }
+
+        }
+
+    }
+
+});
+
+async function exportPDF(){
+
+    const { jsPDF } = window.jspdf;
+
+    const content=document.getElementById("manager-report");
+
+    const canvas=await html2canvas(content,{
+        scale:2
+    });
+
+    const imgData=canvas.toDataURL("image/png");
+
+    const pdf=new jsPDF("p","mm","a4");
+
+    const width=pdf.internal.pageSize.getWidth();
+
+    const height=(canvas.height*width)/canvas.width;
+
+    pdf.addImage(
+        imgData,
+        "PNG",
+        0,
+        0,
+        width,
+        height
+    );
+
+    const monthNames=[
+        "Jan",
+        "Feb",
+        "Mar",
+        "Apr",
+        "May",
+        "Jun",
+        "Jul",
+        "Aug",
+        "Sep",
+        "Oct",
+        "Nov",
+        "Dec"
+    ];
+
+    let monthName;
+
+    const filter=document.getElementById("dashboard-filter");
+
+    if(filter.month.value==="all"){
+
+        monthName="Full_Year";
+
+    }else{
+
+        monthName=monthNames[
+            parseInt(filter.month.value)-1
+        ];
+
+    }
+
+    pdf.save(
+        `Manager_Dashboard_${monthName}_${filter.year.value}.pdf`
+    );
+
+}
+
+async function startTeamPack(){
+
+    const button=document.getElementById("pack-button");
+    const progress=document.getElementById("pack-progress");
+
+    button.disabled=true;
+    progress.textContent="Starting…";
+
+    const filter=document.getElementById("dashboard-filter");
+
+    const form=new FormData();
+    form.append("month",filter.month.value);
+    form.append("year",filter.year.value);
+    form.append("format","zip");
+
+    try{
+
+        const res=await fetch("/manager/team-pack",{method:"POST",body:form});
+        const job=await res.json();
+
+        if(!res.ok){
+            throw new Error(job.error||"Could not start pack");
+        }
+
+        while(true){
+
+            await new Promise(r=>setTimeout(r,1500));
+
+            const state=await (await fetch(job.status_url)).json();
+
+            if(state.state==="done"){
+                progress.textContent="Ready";
+                window.location=job.download_url;
+                break;
+            }
+
+            if(state.state==="failed"){
+                throw new Error(state.error||"Pack failed");
+            }
+
+            progress.textContent=`Rendering ${state.done} / ${state.total}`;
+
+        }
+
+    }catch(e){
+
+        progress.textContent="⚠ "+e.message;
+
+    }finally{
+
+        button.disabled=false;
+
+    }
+
+}
+
+// ---------------- PARTIAL REFRESH (JSON API) ----------------
+// Changing the filter fetches only the month's rows from /api/v1 and
+// redraws the KPIs, table and chart; the server render is the fallback.
+
+function cell(text){
+    const td=document.createElement("td");
+    td.textContent=text;
+    return td;
+}
+
+function sum(rows,key){
+    return rows.reduce((total,row)=>total+Number(row[key]||0),0);
+}
+
+function renderDashboard(payload){
+
+    const rows=payload.data;
+    const count=rows.length||1;
+
+    document.getElementById("kpi-employees").textContent=rows.length;
+    document.getElementById("kpi-productive").textContent=(sum(rows,"productive")/count).toFixed(1);
+    document.getElementById("kpi-idle").textContent=(sum(rows,"ideal")/count).toFixed(1);
+    document.getElementById("kpi-leaves").textContent=sum(rows,"leave_days");
+    document.getElementById("kpi-half-days").textContent=sum(rows,"half_days");
+    document.getElementById("kpi-overall").textContent=`${payload.overall_productivity_with_leave}%`;
+
+    const body=document.getElementById("dashboard-rows");
+    body.replaceChildren();
+
+    for(const e of rows){
+
+        const tr=document.createElement("tr");
+
+        const link=document.createElement("a");
+        link.href=`/manager/employee/${encodeURIComponent(e.name)}?month=${payload.month}&year=${payload.year}`;
+        link.textContent=e.name;
+
+        const name=document.createElement("td");
+        name.appendChild(link);
+        tr.appendChild(name);
+
+        tr.appendChild(cell(e.productive));
+        tr.appendChild(cell(e.days));
+        tr.appendChild(cell(e.available));
+        tr.appendChild(cell(e.available_with_leave));
+        tr.appendChild(cell(e.ideal));
+        tr.appendChild(cell(`${e.productivity}%`));
+        tr.appendChild(cell(`${e.productivity_with_leave}%`));
+        tr.appendChild(cell(e.leave_days));
+        tr.appendChild(cell(e.compoff_days));
+        tr.appendChild(cell(e.half_days));
+
+        body.appendChild(tr);
+
+    }
+
+    const prod=Number(payload.overall_productivity_with_leave)||0;
+    prodChart.data.datasets[0].data=[prod,(100-prod).toFixed(1)];
+    prodChart.update();
+
+}
+
+async function loadDashboard(month,year){
+
+    const query=`month=${month}&year=${year}`;
+
+    const res=await fetch(`/api/v1/dashboard?${query}`,{
+        headers:{"Accept":"application/json"}
+    });
+
+    if(!res.ok){
+        throw new Error(res.status);
+    }
+
+    renderDashboard(await res.json());
+    history.pushState(null,"",`/manager/dashboard?${query}`);
+
+}
+
+document.getElementById("dashboard-filter").addEventListener("submit",e=>{
+
+    e.preventDefault();
+
+    const form=e.target;
+
+    loadDashboard(form.month.value,form.year.value).catch(()=>form.submit());
+
+});
+
+window.addEventListener("popstate",()=>window.location.reload());
+
+// ---------------- LIVE PENDING COUNTS (SSE) ----------------
+// The server pushes new reset/leave counts as requests come in or are
+// handled; EventSource reconnects by itself when a stream ends. A worker
+// that already has too many streams answers 503, which EventSource treats
+// as final, so the page tries again itself a little later.
+
+const EVENTS_RETRY_MS=3000;
+
+function showCount(linkId,countId,count){
+    document.getElementById(countId).textContent=count;
+    document.getElementById(linkId).hidden=count===0;
+}
+
+function openEvents(){
+
+    const events=new EventSource("/manager/events");
+
+    events.addEventListener("counts",e=>{
+
+        const counts=JSON.parse(e.data);
+
+        showCount("reset-link","reset-count",counts.reset_requests);
+        showCount("leave-link","leave-count",counts.leave_requests);
+
+    });
+
+    events.addEventListener("error",()=>{
+
+        if(events.readyState===EventSource.CLOSED){
+            setTimeout(openEvents,EVENTS_RETRY_MS);
+        }
+
+    });
+
+}
+
+if(window.EventSource){
+    openEvents();
+}
@@ -0,0 +1,42 @@
+// Select-all also covers rows added by "Load more" before it is ticked.
+document.getElementById("bulk-all")?.addEventListener("change",e=>{
+
+    document.querySelectorAll(".bulk-pick").forEach(box=>{
+        box.checked=e.target.checked;
+    });
+
+});
+
+// "Load more": append the next page of rows and move the cursor on.
+// Without JavaScript the link just opens that page.
+document.getElementById("requests-more")?.addEventListener("click",async e=>{
+
+    e.preventDefault();
+
+    const link=e.currentTarget;
+
+    try{
+
+        const res=await fetch(`${link.dataset.rows}?cursor=${encodeURIComponent(link.dataset.cursor)}`);
+
+        if(!res.ok){
+            throw new Error(res.status);
+        }
+
+        document.getElementById("request-rows").insertAdjacentHTML("beforeend",await res.text());
+
+        const next=res.headers.get("X-Next-Cursor");
+
+        if(next){
+            link.dataset.cursor=next;
+        }else{
+            link.parentElement.remove();
+        }
+
+    }catch(err){
+
+        window.location=link.href;
+
+    }
+
+});
@@ -0,0 +1,7 @@
+document.getElementById("bulk-all")?.addEventListener("change",e=>{
+
+    document.querySelectorAll(".bulk-pick").forEach(box=>{
+        box.checked=e.target.checked;
+    });
+
+});
@@ -0,0 +1,313 @@
+// Values from the page, set on this script's tag.
+const pageData=document.currentScript.dataset;
+
+Chart.register(ChartDataLabels);
+
+const productivityPercent =
+parseFloat(pageData.productivity);
+
+const productivityChart = new Chart(
+
+document.getElementById("productivityChart"),
+
+{
+
+type:"doughnut",
+
+data:{
+
+labels:["Productive","Idle"],
+
+datasets:[{
+
+data:[
+productivityPercent,
+100-productivityPercent
+],
+
+backgroundColor:[
+"#4caf50",
+"#ef5350"
+],
+
+hoverOffset:10,
+
+borderWidth:0
+
+}]
+
+},
+
+options:{
+
+responsive:true,
+
+maintainAspectRatio:false,
+
+cutout:"68%",
+
+plugins:{
+
+legend:{
+
+position:"bottom",
+
+labels:{
+
+font:{
+
+size:14,
+
+weight:"bold"
+
+}
+
+}
+
+},
+
+datalabels:{
+
+    color:"#000",
+
+    font:{
+        size:13,
+        weight:"bold"
+    },
+
+    anchor:"center",
+    lign:"center",
+    offset:0,
+
+    formatter:function(value){
+        return value.toFixed(2) + "%";
+    }
+
+}
+
+}
+
+}
+
+}
+
+);
+
+async function exportPDF(){
+
+const { jsPDF } = window.jspdf;
+
+const content=document.getElementById("report-content");
+
+const buttons=document.getElementById("action-buttons");
+
+buttons.style.display="none";
+
+const canvas=await html2canvas(content,{
+
+scale:2
+
+});
+
+const imgData=canvas.toDataURL("image/png");
+
+const pdf=new jsPDF("p","mm","a4");
+
+const pdfWidth=pdf.internal.pageSize.getWidth();
+
+const pdfHeight=(canvas.height*pdfWidth)/canvas.width;
+
+pdf.addImage(
+
+imgData,
+
+"PNG",
+
+0,
+
+0,
+
+pdfWidth,
+
+pdfHeight
+
+);
+
+const username=pageData.username
+.replaceAll(" ","_");
+
+const filter=document.getElementById("report-filter");
+
+const month=["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"][
+parseInt(filter.month.value)-1
+];
+
+const year=filter.year.value;
+
+pdf.save(
+
+`${username}_Report_${month}_${year}.pdf`
+
+);
+
+buttons.style.display="flex";
+
+}
+
+// -------- PARTIAL REFRESH (JSON API) --------
+// Changing the month or picking a day fetches only that slice from
+// /api/v1 and patches the page; the server render above is the fallback.
+
+const LEAVE_COLOURS={
+"Leave":"#e53935",
+"Weekly Off":"#3949ab",
+"Holiday":"#00897b",
+"Comp-Off":"#8e24aa",
+"Half Day":"#fb8c00"
+};
+
+function cell(text){
+const td=document.createElement("td");
+td.textContent=text;
+return td;
+}
+
+async function getJSON(url){
+const res=await fetch(url,{headers:{"Accept":"application/json"}});
+if(!res.ok){
+throw new Error(res.status);
+}
+return res.json();
+}
+
+function renderDays(days,month,year){
+
+const body=document.getElementById("report-days");
+body.replaceChildren();
+
+if(!days.length){
+const td=cell("No activity available for this month.");
+td.colSpan=5;
+const tr=document.createElement("tr");
+tr.appendChild(td);
+body.appendChild(tr);
+return;
+}
+
+for(const row of days){
+
+const tr=document.createElement("tr");
+
+const link=document.createElement("a");
+link.className="day-link";
+link.dataset.day=row.date;
+link.href=`/report?month=${month}&year=${year}&day=${row.date}`;
+link.textContent=row.date;
+
+const dateCell=document.createElement("td");
+dateCell.appendChild(link);
+tr.appendChild(dateCell);
+
+const time=cell(row.time);
+if(LEAVE_COLOURS[row.time]){
+time.style.color=LEAVE_COLOURS[row.time];
+time.style.fontWeight="700";
+}
+tr.appendChild(time);
+
+tr.appendChild(cell(row.productivity));
+tr.appendChild(cell(row.clock_in||"-"));
+tr.appendChild(cell(row.clock_out||"-"));
+
+body.appendChild(tr);
+}
+
+}
+
+function renderCards(cards){
+
+document.querySelectorAll("[data-card]").forEach(el=>{
+el.textContent=cards[el.dataset.card];
+});
+
+productivityChart.data.datasets[0].data=[
+cards.chart_productivity,
+100-cards.chart_productivity
+];
+productivityChart.update();
+
+}
+
+async function loadMonth(month,year){
+
+const query=`month=${month}&year=${year}`;
+
+const data=await getJSON(`/api/v1/report/month?${query}`);
+
+renderCards(data.cards);
+renderDays(data.days,data.month,data.year);
+
+document.getElementById("day-section").hidden=true;
+history.pushState(null,"",`/report?${query}`);
+
+}
+
+async function loadDay(day){
+
+const data=await getJSON(`/api/v1/report/days/${day}/activities`);
+
+const body=document.getElementById("day-activities");
+body.replaceChildren();
+
+for(const a of data.activities){
+const tr=document.createElement("tr");
+tr.appendChild(cell(a.activity_name));
+tr.appendChild(cell(a.start_time));
+tr.appendChild(cell(a.end_time));
+tr.appendChild(cell(`${a.duration} min`));
+body.appendChild(tr);
+}
+
+if(!data.activities.length){
+const td=cell("No activities found.");
+td.colSpan=4;
+const tr=document.createElement("tr");
+tr.appendChild(td);
+body.appendChild(tr);
+}
+
+document.getElementById("day-title").textContent=day;
+
+const section=document.getElementById("day-section");
+section.hidden=false;
+section.scrollIntoView({behavior:"smooth"});
+
+const filter=document.getElementById("report-filter");
+history.pushState(null,"",`/report?month=${filter.month.value}&year=${filter.year.value}&day=${day}`);
+
+}
+
+document.getElementById("report-filter").addEventListener("submit",e=>{
+
+e.preventDefault();
+
+const form=e.target;
+
+loadMonth(form.month.value,form.year.value).catch(()=>form.submit());
+
+});
+
+document.getElementById("report-days").addEventListener("click",e=>{
+
+const link=e.target.closest(".day-link");
+if(!link){
+return;
+}
+
+e.preventDefault();
+
+loadDay(link.dataset.day).catch(()=>{window.location=link.href;});
+
+});
+
+window.addEventListener("popstate",()=>window.location.reload());
@@ -0,0 +1,17 @@
+const today=new Date();
+
+const options={
+
+weekday:'long',
+
+day:'numeric',
+
+month:'long',
+
+year:'numeric'
+
+};
+
+document.getElementById("todayDate").innerHTML=
+
+today.toLocaleDateString("en-IN",options);
@@ -0,0 +1,102 @@
+# ------------------ DAILY ACTIVITY SUMMARY ------------------
+# One row per (username, activity_date) with the facts the dashboard and
+# report need. Writers call refresh_day() in the same transaction as the
+# change to `activities`; rebuild() recomputes any slice from scratch.
+
+_AGGREGATE = """
+    SELECT
+        username,
+        activity_date,
+        COALESCE(SUM(duration), 0) AS total_minutes,
+        COUNT(*) AS activity_count,
+        (ARRAY_AGG(clock_in ORDER BY submitted_at, id)
+            FILTER (WHERE clock_in IS NOT NULL))[1] AS clock_in,
+        (ARRAY_AGG(clock_out ORDER BY submitted_at DESC, id DESC)
+            FILTER (WHERE clock_out IS NOT NULL))[1] AS clock_out,
+        NOW() AS updated_at
+    FROM activities
+    WHERE {where}
+    GROUP BY username, activity_date
+"""
+
+_UPSERT = """
+    ON CONFLICT (username, activity_date) DO UPDATE
+    SET total_minutes = EXCLUDED.total_minutes,
+        activity_count = EXCLUDED.activity_count,
+        clock_in = EXCLUDED.clock_in,
+        clock_out = EXCLUDED.clock_out,
+        updated_at = EXCLUDED.updated_at
+"""
+
+_COLUMNS = """
+    INSERT INTO daily_activity_summary (
+        username, activity_date, total_minutes, activity_count,
+        clock_in, clock_out, updated_at
+    )
+"""
+
+
+def refresh_day(cur, username, activity_date):
+    cur.execute(
+        _COLUMNS
+        + _AGGREGATE.format(where="username = %s AND activity_date = %s")
+        + _UPSERT,
+        (username, activity_date)
+    )
+
+    if cur.rowcount == 0:
+        cur.execute("""
+            DELETE FROM daily_activity_summary
+            WHERE username = %s
+              AND activity_date = %s
+        """, (username, activity_date))
+
+
+# Set-wise refresh_day() for bulk writers: `days_sql` selects the
+# (username, activity_date) pairs that changed.
+def refresh_days(cur, days_sql, params=()):
+    cur.execute("DROP TABLE IF EXISTS pg_temp.summary_days")
+    cur.execute(f"""
+        CREATE TEMP TABLE summary_days ON COMMIT DROP AS
+        SELECT DISTINCT username, activity_date
+        FROM ({days_sql}) d
+    """, params)
+
+    cur.execute("""
+        DELETE FROM daily_activity_summary s
+        USING summary_days d
+        WHERE s.username = d.username
+          AND s.activity_date = d.activity_date
+    """)
+
+    cur.execute(
+        _COLUMNS
+        + _AGGREGATE.format(
+            where="(username, activity_date) IN "
+                  "(SELECT username, activity_date FROM summary_days)"
+        )
+    )
+    return cur.rowcount
+
+
+def rebuild(cur, username=None, date_from=None, date_to=None):
+    conditions = ["username IS NOT NULL", "activity_date IS NOT NULL"]
+    params = []
+
+    if username:
+        conditions.append("username = %s")
+        params.append(username)
+    if date_from:
+        conditions.append("activity_date >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("activity_date <= %s")
+        params.append(date_to)
+
+    where = " AND ".join(conditions)
+
+    cur.execute(f"DELETE FROM daily_activity_summary WHERE {where}", params)
+    deleted = cur.rowcount
+
+    cur.execute(_COLUMNS + _AGGREGATE.format(where=where), params)
+    return deleted, cur.rowcount
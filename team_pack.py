@@ -0,0 +1,292 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+# ------------------ TEAM MONTH PACK ------------------
+# Renders every employee's activity PDF for a month in a process pool and
+# collects them into a ZIP, or merges them into one PDF behind a contents
+# page. A job lives in its own directory under PACK_DIR with a
+# status.json, so whichever gunicorn worker serves the progress poll or
+# the download can answer it.
+#
+# The job runs in a thread of the worker that started it. While it runs
+# that thread's worker rewrites status.json every PACK_HEARTBEAT seconds;
+# a running job not updated for PACK_STALE_AFTER seconds lost its worker
+# (restarted, killed or timed out) and is reported as failed.
+
+PACK_DIR = os.environ.get(
+    "TEAM_PACK_DIR",
+    os.path.join(tempfile.gettempdir(), "daily_tracker_packs")
+)
+PACK_WORKERS = int(os.environ.get("TEAM_PACK_WORKERS", os.cpu_count() or 2))
+PACK_TTL = int(os.environ.get("TEAM_PACK_TTL", "86400"))
+PACK_HEARTBEAT = int(os.environ.get("TEAM_PACK_HEARTBEAT", "10"))
+PACK_STALE_AFTER = int(os.environ.get("TEAM_PACK_STALE_AFTER", "60"))
+
+FORMATS = {
+    "zip": "application/zip",
+    "pdf": "application/pdf"
+}
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+# The job thread and its heartbeat both rewrite status.json.
+_status_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _executor_pid
+
+    # Renderers fork from a fork server that has preloaded only
+    # pdf_reports: no Flask app, no __main__ re-import, no inherited
+    # database sockets or threads. The pool is reused by every pack this
+    # worker runs.
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(["pdf_reports"])
+
+            _executor = ProcessPoolExecutor(
+                max_workers=PACK_WORKERS,
+                mp_context=ctx
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _job_dir(job_id):
+    # Job ids are generated here; anything else is not a job.
+    if not job_id or not all(c in "0123456789abcdef" for c in job_id):
+        return None
+    return os.path.join(PACK_DIR, job_id)
+
+
+def _write_status(job_dir, **fields):
+    path = os.path.join(job_dir, "status.json")
+
+    with _status_lock:
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+
+        state.update(fields, updated_at=time.time())
+
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    return state
+
+
+def _heartbeat(job_dir, stop):
+    while not stop.wait(PACK_HEARTBEAT):
+        _write_status(job_dir)
+
+
+def _prune():
+    if not os.path.isdir(PACK_DIR):
+        return
+
+    cutoff = time.time() - PACK_TTL
+    for name in os.listdir(PACK_DIR):
+        path = os.path.join(PACK_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+# The renderers run in the pool, where the fork server has already
+# imported pdf_reports; the web worker itself never loads ReportLab.
+def _render_one(username, month_name, year, rows):
+    import pdf_reports
+    pdf, pages = pdf_reports.render_employee_pdf(username, month_name, year, rows)
+    return username, pdf, pages, len(rows)
+
+
+def _render_index(month_name, year, entries):
+    import pdf_reports
+    return pdf_reports.render_pack_index(month_name, year, entries)
+
+
+def _render_section(username, month_name, year, rows):
+    import pdf_reports
+    pdf, pages = pdf_reports.render_team_section(username, month_name, year, rows)
+    return username, pdf, pages, len(rows)
+
+
+# Page numbers on the contents depend on how long the contents itself is,
+# so it is rendered again until that length settles (in practice once or
+# twice).
+def _render_contents(month_name, year, sections):
+    import pdf_reports
+
+    contents_pages = 1
+    while True:
+        entries = []
+        page = contents_pages + 1
+        for username, row_count, pages in sections:
+            entries.append((username, row_count, page))
+            page += pages
+
+        pdf, rendered = pdf_reports.render_team_contents(month_name, year, entries)
+        if rendered == contents_pages:
+            return pdf
+        contents_pages = rendered
+
+
+def _merge(contents, parts, output):
+    import pdf_reports
+    pdf_reports.merge_team_pdf(contents, parts, output)
+
+
+def _run_zip(job_dir, month_name, year, grouped):
+    executor = _get_executor()
+    result = os.path.join(job_dir, "result.zip")
+    entries = []
+
+    futures = [
+        executor.submit(_render_one, username, month_name, year, rows)
+        for username, rows in grouped
+    ]
+
+    with zipfile.ZipFile(result + ".part", "w", zipfile.ZIP_DEFLATED) as zf:
+        for done, future in enumerate(as_completed(futures), 1):
+            username, pdf, pages, row_count = future.result()
+            filename = f"{username}_{month_name}_{year}_Activities.pdf"
+
+            zf.writestr(filename, pdf)
+            entries.append((username, filename, row_count, pages))
+            _write_status(job_dir, done=done)
+
+        entries.sort()
+        index = executor.submit(_render_index, month_name, year, entries).result()
+        zf.writestr("00_Contents.pdf", index)
+
+    os.replace(result + ".part", result)
+    return result
+
+
+# Every employee's section renders in the pool like the ZIP pack and is
+# written to parts/ as it finishes; the contents and the merge come last.
+def _run_pdf(job_dir, month_name, year, grouped):
+    executor = _get_executor()
+    result = os.path.join(job_dir, "result.pdf")
+    parts_dir = os.path.join(job_dir, "parts")
+    os.makedirs(parts_dir)
+
+    futures = {
+        executor.submit(_render_section, username, month_name, year, rows): i
+        for i, (username, rows) in enumerate(grouped)
+    }
+
+    sections = [None] * len(grouped)
+    for done, future in enumerate(as_completed(futures), 1):
+        username, pdf, pages, row_count = future.result()
+        i = futures[future]
+
+        path = os.path.join(parts_dir, f"{i:05d}.pdf")
+        with open(path, "wb") as f:
+            f.write(pdf)
+        sections[i] = (username, path, row_count, pages)
+        _write_status(job_dir, done=done)
+
+    contents = executor.submit(
+        _render_contents, month_name, year,
+        [(username, row_count, pages) for username, _, row_count, pages in sections]
+    ).result()
+
+    parts = [(username, path) for username, path, _, _ in sections]
+    executor.submit(_merge, contents, parts, result + ".part").result()
+
+    os.replace(result + ".part", result)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    return result
+
+
+def _run(job_dir, fmt, month_name, year, grouped):
+    stop = threading.Event()
+    threading.Thread(
+        target=_heartbeat,
+        args=(job_dir, stop),
+        name=f"{threading.current_thread().name}-heartbeat",
+        daemon=True
+    ).start()
+
+    try:
+        runner = _run_pdf if fmt == "pdf" else _run_zip
+        result = runner(job_dir, month_name, year, grouped)
+        _write_status(job_dir, state="done", file=os.path.basename(result))
+    except Exception as e:
+        _write_status(job_dir, state="failed", error=str(e))
+    finally:
+        stop.set()
+
+
+def start(fmt, month_name, year, grouped):
+    _prune()
+
+    job_id = uuid.uuid4().hex
+    job_dir = _job_dir(job_id)
+    os.makedirs(job_dir)
+
+    _write_status(
+        job_dir,
+        state="running",
+        format=fmt,
+        month=month_name,
+        year=year,
+        total=len(grouped),
+        done=0,
+        started_at=time.time()
+    )
+
+    threading.Thread(
+        target=_run,
+        args=(job_dir, fmt, month_name, year, grouped),
+        name=f"team-pack-{job_id[:8]}",
+        daemon=True
+    ).start()
+
+    return job_id
+
+
+def status(job_id):
+    job_dir = _job_dir(job_id)
+    if job_dir is None:
+        return None
+
+    try:
+        with open(os.path.join(job_dir, "status.json")) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if state.get("state") == "running" and time.time() - state.get("updated_at", 0) > PACK_STALE_AFTER:
+        state = _write_status(
+            job_dir,
+            state="failed",
+            error="The worker rendering this pack stopped before it finished."
+        )
+    return state
+
+
+def result_path(job_id):
+    state = status(job_id)
+    if not state or state.get("state") != "done":
+        return None
+    return os.path.join(_job_dir(job_id), state["file"])
@@ -0,0 +1,141 @@
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# ------------------ SCRATCH FILES ------------------
+# Caches, metrics snapshots, profiles and packs go to a directory of their
+# own, never the ones a dev server on this machine is using. Set before
+# any app module is imported, since they read these at import.
+SCRATCH_DIR = tempfile.mkdtemp(prefix="daily_tracker_tests_")
+
+os.environ.update({
+    "DASHBOARD_CACHE_PATH": os.path.join(SCRATCH_DIR, "dashboard.sqlite3"),
+    "PDF_CACHE_DIR": os.path.join(SCRATCH_DIR, "pdfs"),
+    "METRICS_DIR": os.path.join(SCRATCH_DIR, "metrics"),
+    "PROFILE_DIR": os.path.join(SCRATCH_DIR, "profiles"),
+    "TEAM_PACK_DIR": os.path.join(SCRATCH_DIR, "packs"),
+})
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+
+# ------------------ DATABASE ------------------
+# Tests that need Postgres run against TEST_DATABASE_URL. Each session
+# works in a schema of its own, migrated from scratch and dropped at the
+# end, so nothing else in that database is touched. Without
+# TEST_DATABASE_URL those tests are skipped.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+# A fresh, empty schema in the test database and a DSN that uses it.
+def create_schema():
+    name = f"test_{uuid.uuid4().hex[:12]}"
+
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    conn.autocommit = True
+    conn.cursor().execute(f"CREATE SCHEMA {name}")
+    conn.close()
+
+    return name, psycopg2.extensions.make_dsn(TEST_DATABASE_URL, options=f"-csearch_path={name}")
+
+
+def drop_schema(name):
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    conn.autocommit = True
+    conn.cursor().execute(f"DROP SCHEMA {name} CASCADE")
+    conn.close()
+
+
+# Points the app's pool (DATABASE_URL) at `dsn` for the duration.
+def use_database(monkeypatch, dsn):
+    import db
+
+    monkeypatch.setenv("DATABASE_URL", dsn)
+    db.reset_pool()
+
+
+def release_database():
+    import db
+
+    if db._pool is not None:
+        db._pool.closeall()
+    db.reset_pool()
+
+
+@pytest.fixture(scope="session")
+def database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    name, dsn = create_schema()
+    try:
+        with pytest.MonkeyPatch.context() as mp:
+            use_database(mp, dsn)
+
+            import migrations
+            migrations.migrate(log=lambda *args: None)
+
+            release_database()
+
+        yield dsn
+    finally:
+        drop_schema(name)
+
+
+# A connection whose writes are rolled back after the test.
+@pytest.fixture
+def cur(database):
+    conn = psycopg2.connect(database, cursor_factory=psycopg2.extras.RealDictCursor)
+    try:
+        yield conn.cursor()
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+# Autocommit, for rows the app itself has to see. These stay for the rest
+# of the session, so tests using it pick usernames of their own.
+@pytest.fixture
+def sql(database):
+    conn = psycopg2.connect(database, cursor_factory=psycopg2.extras.RealDictCursor)
+    conn.autocommit = True
+    try:
+        yield conn.cursor()
+    finally:
+        conn.close()
+
+
+# ------------------ APP ------------------
+@pytest.fixture
+def client(database, monkeypatch):
+    use_database(monkeypatch, database)
+
+    import app
+    app.app.testing = True
+
+    try:
+        yield app.app.test_client()
+    finally:
+        release_database()
+
+
+def login_employee(client, username):
+    with client.session_transaction() as session:
+        session["username"] = username
+
+
+def login_manager(client, name="manager_tests"):
+    with client.session_transaction() as session:
+        session["manager"] = name
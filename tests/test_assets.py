@@ -0,0 +1,160 @@
+import gzip
+import hashlib
+import os
+import re
+
+import pytest
+
+import assets
+
+
+@pytest.fixture
+def static(tmp_path, monkeypatch):
+    root = tmp_path / "static"
+    for name, data in {
+        "js/page.js": b"console.log('page');\n" * 20,
+        "img/logo.png": b"\x89PNG not really",
+        "css/page.css": b".logo{background:url('../img/logo.png')}\n"
+                        b".ext{background:url(https://example.com/x.png)}\n"
+                        b".data{background:url(data:image/png;base64,AAAA)}\n",
+    }.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    monkeypatch.setattr(assets, "STATIC_DIR", str(root))
+    monkeypatch.setattr(assets, "DIST_DIR", str(tmp_path / "dist"))
+    monkeypatch.setattr(assets, "_manifest", None)
+    monkeypatch.setattr(assets, "_by_hashed", None)
+    monkeypatch.setattr(assets, "vendored", lambda: ["vendor/lib.js"])
+    return root
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def test_url_carries_content_hash(static):
+    data = (static / "js/page.js").read_bytes()
+    assert assets.url("js/page.js") == f"/assets/js/page.{digest(data)}.js"
+
+
+def test_lookup_by_hashed_name(static):
+    hashed = assets.url("js/page.js")[len(assets.URL_PREFIX):]
+    asset = assets.lookup(hashed)
+
+    assert asset.name == "js/page.js"
+    assert asset.mimetype in ("text/javascript", "application/javascript")
+    assert assets.lookup("js/page.000000000000.js") is None
+
+
+def test_stylesheet_urls_point_at_hashed_files(static):
+    logo = digest((static / "img/logo.png").read_bytes())
+    css = assets.manifest()["css/page.css"].content().decode()
+
+    assert f"url('../img/logo.{logo}.png')" in css
+    assert "url(https://example.com/x.png)" in css
+    assert "url(data:image/png;base64,AAAA)" in css
+
+
+def test_stylesheet_hash_follows_what_it_points_at(static):
+    before = assets.url("css/page.css")
+
+    (static / "img/logo.png").write_bytes(b"\x89PNG another logo")
+    assets.reload()
+
+    assert assets.url("css/page.css") != before
+
+
+def test_unknown_and_unvendored_names(static):
+    with pytest.raises(LookupError, match="no static asset"):
+        assets.url("js/missing.js")
+    with pytest.raises(LookupError, match="vendor-assets"):
+        assets.url("vendor/lib.js")
+
+
+def test_build_writes_compressed_copies(static):
+    asset = assets.manifest()["js/page.js"]
+    path = assets.build(asset)
+
+    with open(path, "rb") as f:
+        assert f.read() == asset.content()
+    with open(path + ".gz", "rb") as f:
+        assert gzip.decompress(f.read()) == asset.content()
+
+    assert assets.variant(asset, {"br": 0, "gzip": 1}) == (path + ".gz", "gzip")
+    assert assets.variant(asset, {"br": 0, "gzip": 0}) == (path, None)
+
+
+def test_binary_files_are_not_compressed(static):
+    asset = assets.manifest()["img/logo.png"]
+    path = assets.build(asset)
+
+    assert assets.variant(asset, {"br": 1, "gzip": 1}) == (path, None)
+
+
+def write_vendored(static, data, recorded=None):
+    (static / "vendor").mkdir(exist_ok=True)
+    (static / "vendor/lib.js").write_bytes(data)
+    checksum = hashlib.sha256(recorded if recorded is not None else data).hexdigest()
+    (static / "vendor/SHA256SUMS").write_text(f"{checksum}  vendor/lib.js\n")
+
+
+def test_vendored_files_match_checksums(static):
+    write_vendored(static, b"lib")
+    assert assets.check_vendored() == []
+
+
+def test_nothing_vendored_yet(static):
+    assert assets.check_vendored() == []
+
+
+def test_missing_checksums_file(static):
+    (static / "vendor").mkdir()
+    (static / "vendor/lib.js").write_bytes(b"lib")
+
+    assert assets.check_vendored() == ["vendor/SHA256SUMS is missing"]
+
+
+def test_missing_and_altered_vendored_files(static):
+    write_vendored(static, b"lib", recorded=b"other")
+    assert assets.check_vendored() == ["vendor/lib.js does not match its checksum"]
+
+    (static / "vendor/lib.js").unlink()
+    assert assets.check_vendored() == ["vendor/lib.js is missing"]
+
+
+def test_build_all_refuses_unpinned_vendored_files(static):
+    write_vendored(static, b"lib", recorded=b"other")
+
+    with pytest.raises(RuntimeError, match="vendor-assets"):
+        assets.build_all(log=lambda *args: None)
+
+
+def test_build_all_before_anything_is_vendored(static, tmp_path):
+    assets.build_all(log=lambda *args: None)
+
+    assert (tmp_path / "dist" / assets.url("js/page.js")[len(assets.URL_PREFIX):]).exists()
+
+
+# Every asset() a template asks for has to exist, or the page is a 500.
+def test_templates_only_ask_for_existing_assets():
+    assets.reload()
+    templates = os.path.join(assets.BASE_DIR, "templates")
+
+    for filename in sorted(os.listdir(templates)):
+        with open(os.path.join(templates, filename)) as f:
+            for name in re.findall(r"""asset\(\s*['"]([^'"]+)['"]\s*\)""", f.read()):
+                assert name in assets.manifest(), f"{filename} asks for {name}"
+
+
+def test_build_all_removes_stale_files(static, tmp_path):
+    write_vendored(static, b"lib")
+    stale = tmp_path / "dist/js/page.000000000000.js"
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b"old")
+
+    assets.build_all(log=lambda *args: None)
+
+    assert not stale.exists()
+    assert (tmp_path / "dist" / assets.url("js/page.js")[len(assets.URL_PREFIX):]).exists()
@@ -0,0 +1,150 @@
+import pytest
+
+from conftest import login_manager
+
+
+@pytest.fixture
+def manager(client):
+    login_manager(client)
+    return client
+
+
+def add_leave(sql, username, status, first="2031-06-02", leave_type="single"):
+    sql.execute("""
+        INSERT INTO leave_requests (username, leave_type, leave_dates, from_date, to_date, status, requested_on)
+        VALUES (%s, %s, %s, %s, %s, %s, '2031-05-01 09:00')
+        RETURNING id
+    """, (username, leave_type, first, first, first, status))
+    return sql.fetchone()["id"]
+
+
+def statuses(sql, ids):
+    sql.execute("SELECT id, status FROM leave_requests WHERE id = ANY(%s)", (ids,))
+    return {r["id"]: r["status"] for r in sql.fetchall()}
+
+
+# ------------------ LEAVE ------------------
+def test_every_requested_id_gets_an_outcome(manager, sql):
+    pending = add_leave(sql, "bulk_a", 0)
+    pending_too = add_leave(sql, "bulk_b", 0)
+    approved = add_leave(sql, "bulk_a", 2, first="2031-06-03")
+    missing = approved + 100000
+
+    response = manager.post("/manager/leave-requests/bulk", json={
+        "action": "approve",
+        "ids": [missing, pending, approved, pending_too, pending],
+    })
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "action": "approve",
+        "updated": 2,
+        "results": [
+            {"id": pending, "outcome": "approved"},
+            {"id": pending_too, "outcome": "approved"},
+            {"id": approved, "outcome": "not_pending"},
+            {"id": missing, "outcome": "not_found"},
+        ],
+    }
+    assert statuses(sql, [pending, pending_too, approved]) == {pending: 2, pending_too: 2, approved: 2}
+
+
+def test_reject_leaves_handled_requests_alone(manager, sql):
+    pending = add_leave(sql, "bulk_c", 0)
+    approved = add_leave(sql, "bulk_c", 2, first="2031-06-04")
+
+    results = manager.post("/manager/leave-requests/bulk", json={"action": "reject", "ids": [pending, approved]}).get_json()
+
+    assert [r["outcome"] for r in results["results"]] == ["rejected", "not_pending"]
+    assert statuses(sql, [pending, approved]) == {pending: 3, approved: 2}
+
+
+def test_filter_picks_only_matching_pending_requests(manager, sql):
+    match = add_leave(sql, "bulk_f", 0, first="2031-07-10", leave_type="weeklyoff")
+    other_type = add_leave(sql, "bulk_f", 0, first="2031-07-11")
+    outside = add_leave(sql, "bulk_f", 0, first="2031-08-01", leave_type="weeklyoff")
+
+    results = manager.post("/manager/leave-requests/bulk", json={
+        "action": "approve",
+        "username": "bulk_f",
+        "leave_type": "weeklyoff",
+        "from": "2031-07-01",
+        "to": "2031-07-31",
+    }).get_json()
+
+    assert results["results"] == [{"id": match, "outcome": "approved"}]
+    assert statuses(sql, [match, other_type, outside]) == {match: 2, other_type: 0, outside: 0}
+
+
+def test_form_post_redirects_back(manager, sql):
+    pending = add_leave(sql, "bulk_d", 0)
+
+    response = manager.post("/manager/leave-requests/bulk", data={"action": "approve", "id": [str(pending)]})
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/manager/leave-requests")
+    assert statuses(sql, [pending]) == {pending: 2}
+
+
+@pytest.mark.parametrize("body", [
+    {"action": "approve"},
+    {"action": "approve", "ids": ["one"]},
+    {"action": "archive", "ids": [1]},
+])
+def test_bad_leave_requests_are_refused(manager, body):
+    response = manager.post("/manager/leave-requests/bulk", json=body)
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("body", [
+    {"action": "approve", "ids": "123"},
+    {"action": "approve", "ids": 123},
+    {"action": "approve", "ids": [2 ** 31]},
+    {"action": "approve", "ids": [-2 ** 31 - 1]},
+])
+def test_ids_must_be_a_list_of_int32(manager, body):
+    assert manager.post("/manager/leave-requests/bulk", json=body).status_code == 400
+
+
+def test_managers_only(client):
+    assert client.post("/manager/leave-requests/bulk", json={"action": "approve", "ids": [1]}).status_code == 401
+
+
+# ------------------ RESETS ------------------
+def add_user(sql, username, reset_requested):
+    sql.execute(
+        "INSERT INTO users (username, password, reset_requested) VALUES (%s, 'pw', %s)",
+        (username, reset_requested)
+    )
+
+
+def test_every_requested_username_gets_an_outcome(manager, sql):
+    add_user(sql, "bulk_reset_a", 1)
+    add_user(sql, "bulk_reset_b", 0)
+
+    response = manager.post("/manager/approve-reset/bulk", json={
+        "usernames": ["bulk_reset_a", "bulk_reset_b", "bulk_reset_missing"],
+    })
+
+    assert response.get_json() == {
+        "updated": 1,
+        "results": [
+            {"username": "bulk_reset_a", "outcome": "approved"},
+            {"username": "bulk_reset_b", "outcome": "not_pending"},
+            {"username": "bulk_reset_missing", "outcome": "not_found"},
+        ],
+    }
+
+    sql.execute("SELECT username, password, reset_requested FROM users WHERE username LIKE 'bulk_reset_%' ORDER BY username")
+    assert [tuple(r.values()) for r in sql.fetchall()] == [("bulk_reset_a", None, 2), ("bulk_reset_b", "pw", 0)]
+
+
+def test_reset_needs_a_selection(manager):
+    assert manager.post("/manager/approve-reset/bulk", json={}).status_code == 400
+
+
+@pytest.mark.parametrize("usernames", ["bulk_reset_a", ["bulk_reset_a", 7]])
+def test_usernames_must_be_a_list_of_names(manager, usernames):
+    assert manager.post("/manager/approve-reset/bulk", json={"usernames": usernames}).status_code == 400
@@ -0,0 +1,89 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import app
+from conftest import login_manager
+
+MONTH_START, NEXT_MONTH = date(2033, 2, 1), date(2033, 3, 1)
+
+LEAVE_TYPES = [
+    "single", "multiple", "halfday", "compoff",
+    "weeklyoff", "Weekly Off", "holiday", " Holiday ", None,
+]
+
+
+# What the dashboard computed before the aggregate query: each approved
+# leave clipped to the month and walked in Python.
+def old_leave_maps(leaves):
+    leave_map, compoff_map, weeklyoff_map = {}, {}, {}
+
+    for user, leave_type, first, last, status in leaves:
+        if status != 2 or last < MONTH_START or first >= NEXT_MONTH:
+            continue
+
+        leave_type = (leave_type or "").strip().lower()
+
+        days = (min(last, NEXT_MONTH - timedelta(days=1)) - max(first, MONTH_START)).days + 1
+        value = days * (0.5 if leave_type == "halfday" else 1)
+
+        if leave_type == "compoff":
+            compoff_map[user] = compoff_map.get(user, 0) + value
+        elif leave_type in ["weekly off", "weeklyoff", "holiday"]:
+            weeklyoff_map[user] = weeklyoff_map.get(user, 0) + value
+        else:
+            leave_map[user] = leave_map.get(user, 0) + value
+
+    return leave_map, compoff_map, weeklyoff_map
+
+
+@pytest.fixture
+def rendered(client, monkeypatch):
+    seen = {}
+
+    def render_template(name, **context):
+        seen.update(context)
+        return ""
+
+    monkeypatch.setattr(app, "render_template", render_template)
+    login_manager(client)
+    return client, seen
+
+
+def test_leave_totals_match_the_old_loop(rendered, sql):
+    client, seen = rendered
+    rng = random.Random(7)
+    users = [f"parity_{i}" for i in range(15)]
+
+    for user in users:
+        sql.execute("""
+            INSERT INTO daily_activity_summary (username, activity_date, total_minutes, activity_count)
+            VALUES (%s, %s, %s, 1)
+        """, (user, MONTH_START + timedelta(days=rng.randrange(28)), rng.randrange(60, 480)))
+
+    leaves = []
+    for _ in range(200):
+        first = date(2033, 1, 1) + timedelta(days=rng.randrange(90))
+        last = first + timedelta(days=rng.choice([0, 0, 1, 3, 10, 40]))
+        leaves.append((rng.choice(users), rng.choice(LEAVE_TYPES), first, last, rng.choice([0, 2, 2, 2, 3])))
+
+    sql.executemany("""
+        INSERT INTO leave_requests (username, leave_type, leave_dates, from_date, to_date, status)
+        VALUES (%s, %s, 'x', %s, %s, %s)
+    """, leaves)
+
+    assert client.get("/manager/dashboard?month=02&year=2033").status_code == 200
+
+    leave_map, compoff_map, weeklyoff_map = old_leave_maps(leaves)
+    rows = {r["name"]: r for r in seen["data"] if r["name"] in users}
+
+    assert sorted(rows) == sorted(users)
+    for user, row in rows.items():
+        leave_days = leave_map.get(user, 0)
+
+        # Same value and type: the page shows "2" for whole totals, "2.5" otherwise.
+        assert (row["leave_days"], type(row["leave_days"])) == (leave_days, type(leave_days)), user
+        assert row["compoff_days"] == compoff_map.get(user, 0), user
+        assert row["weeklyoff_days"] == weeklyoff_map.get(user, 0), user
+        assert row["available_with_leave"] == (row["days"] + leave_days) * 7, user
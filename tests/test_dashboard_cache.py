@@ -0,0 +1,102 @@
+from datetime import date
+
+import pytest
+
+import dashboard_cache
+
+JAN = date(2026, 1, 1)
+FEB = date(2026, 2, 1)
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "dashboard.sqlite3"
+    monkeypatch.setattr(dashboard_cache, "CACHE_PATH", str(path))
+    monkeypatch.setattr(dashboard_cache, "_ready_pid", None)
+    return path
+
+
+def test_empty_cache_is_a_miss_at_generation_zero():
+    assert dashboard_cache.get(JAN) == (None, 0)
+
+
+def test_put_then_get():
+    payload, generation = dashboard_cache.get(JAN)
+    dashboard_cache.put(JAN, generation, {"data": [1, 2]})
+
+    assert dashboard_cache.get(JAN) == ({"data": [1, 2]}, generation)
+
+
+def test_invalidate_bumps_generation_and_drops_payload():
+    dashboard_cache.put(JAN, 0, {"data": "old"})
+    dashboard_cache.invalidate(date(2026, 1, 15))
+
+    assert dashboard_cache.get(JAN) == (None, 1)
+
+
+def test_result_computed_before_a_write_is_not_stored():
+    _, generation = dashboard_cache.get(JAN)
+
+    # A submit commits and invalidates while the render is still running.
+    dashboard_cache.invalidate(JAN)
+    dashboard_cache.put(JAN, generation, {"data": "stale"})
+
+    assert dashboard_cache.get(JAN) == (None, generation + 1)
+
+
+def test_invalidate_only_touches_its_months():
+    dashboard_cache.put(JAN, 0, "jan")
+    dashboard_cache.put(FEB, 0, "feb")
+
+    dashboard_cache.invalidate(FEB)
+
+    assert dashboard_cache.get(JAN) == ("jan", 0)
+    assert dashboard_cache.get(FEB) == (None, 1)
+
+
+def test_ranges_cover_every_month_across_a_year_end():
+    months = [date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)]
+    for month in months:
+        dashboard_cache.put(month, 0, month.isoformat())
+
+    dashboard_cache.invalidate_ranges([(date(2025, 12, 31), date(2026, 1, 2)), (date(2026, 3, 5), None)])
+
+    assert [dashboard_cache.get(m)[0] for m in months] == ["2025-11-01", None, None, "2026-02-01", None]
+
+
+def test_clear_drops_everything():
+    dashboard_cache.put(JAN, 0, "jan")
+    dashboard_cache.put_years("alice", 0, [2025, 2026])
+
+    dashboard_cache.clear()
+
+    assert dashboard_cache.get(JAN) == (None, 1)
+    assert dashboard_cache.get_years("alice") == (None, 1)
+
+
+def test_expired_entries_are_a_miss(monkeypatch):
+    dashboard_cache.put(JAN, 0, "jan")
+    monkeypatch.setattr(dashboard_cache, "TTL", -1)
+
+    assert dashboard_cache.get(JAN) == (None, 0)
+
+
+def test_years_are_kept_per_employee():
+    dashboard_cache.put_years("alice", 0, [2026])
+    dashboard_cache.put_years("bob", 0, [2024, 2025])
+
+    dashboard_cache.invalidate_years("alice")
+
+    assert dashboard_cache.get_years("alice") == (None, 1)
+    assert dashboard_cache.get_years("bob") == ([2024, 2025], 0)
+    assert dashboard_cache.get(JAN) == (None, 0)
+
+
+def test_unreadable_cache_is_a_miss_that_is_never_stored(tmp_path, monkeypatch):
+    # A directory cannot be opened as a database.
+    monkeypatch.setattr(dashboard_cache, "CACHE_PATH", str(tmp_path))
+
+    assert dashboard_cache.get(JAN) == (None, None)
+    dashboard_cache.put(JAN, None, "jan")
+    dashboard_cache.invalidate(JAN)
+    dashboard_cache.clear()
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+import db
+
+
+@pytest.fixture
+def make_pool(database):
+    pools = []
+
+    def make(**kwargs):
+        kwargs.setdefault("minconn", 0)
+        pool = db.ConnectionPool(database, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+
+    for pool in pools:
+        pool.closeall()
+
+
+def test_min_connections_are_opened_up_front(make_pool):
+    stats = make_pool(minconn=2, maxconn=3).stats()
+
+    assert (stats["size"], stats["idle"], stats["in_use"]) == (2, 2, 0)
+
+
+def test_returned_connections_are_reused(make_pool):
+    pool = make_pool(maxconn=2)
+
+    first = pool.getconn()
+    pool.putconn(first)
+    second = pool.getconn()
+
+    assert second is first
+    assert pool.stats()["size"] == 1
+    assert pool.stats()["checkouts"] == 2
+
+
+def test_open_transaction_is_rolled_back_on_return(make_pool):
+    pool = make_pool()
+
+    conn = pool.getconn()
+    conn.cursor().execute("CREATE TEMP TABLE left_open (x INT)")
+    pool.putconn(conn)
+
+    assert conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+    conn = pool.getconn()
+    with pytest.raises(psycopg2.errors.UndefinedTable):
+        conn.cursor().execute("SELECT * FROM left_open")
+    conn.rollback()
+    pool.putconn(conn)
+
+
+def test_exhausted_pool_times_out(make_pool):
+    pool = make_pool(maxconn=1, timeout=0.05)
+    held = pool.getconn()
+
+    with pytest.raises(db.PoolTimeout):
+        pool.getconn()
+
+    stats = pool.stats()
+    assert (stats["waits"], stats["timeouts"]) == (1, 1)
+    pool.putconn(held)
+
+
+def test_waiter_gets_the_next_returned_connection(make_pool):
+    pool = make_pool(maxconn=1, timeout=5)
+    held = pool.getconn()
+
+    timer = threading.Timer(0.1, pool.putconn, args=(held,))
+    timer.start()
+    started = time.monotonic()
+
+    assert pool.getconn() is held
+    assert time.monotonic() - started >= 0.05
+    assert pool.stats()["waits"] == 1
+    timer.join()
+
+
+def test_closed_connections_are_dropped(make_pool):
+    pool = make_pool(maxconn=1)
+
+    conn = pool.getconn()
+    conn.close()
+    pool.putconn(conn)
+
+    assert pool.stats()["size"] == 0
+    assert pool.stats()["discarded"] == 1
+    assert not pool.getconn().closed
+
+
+def test_dead_idle_connection_is_replaced(make_pool, sql):
+    pool = make_pool(maxconn=1, check_interval=0)
+
+    conn = pool.getconn()
+    pid = conn.get_backend_pid()
+    pool.putconn(conn)
+
+    sql.execute("SELECT pg_terminate_backend(%s)", (pid,))
+    for _ in range(50):
+        sql.execute("SELECT 1 FROM pg_stat_activity WHERE pid = %s", (pid,))
+        if sql.fetchone() is None:
+            break
+        time.sleep(0.02)
+
+    fresh = pool.getconn()
+    assert fresh is not conn
+    assert fresh.get_backend_pid() != pid
+    assert pool.stats()["discarded"] == 1
+
+
+def test_each_process_gets_its_own_pool(database, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", database)
+    monkeypatch.setattr(db, "_pool", None)
+
+    pool = db.get_pool()
+    assert db.get_pool() is pool
+
+    # As seen from a forked worker.
+    monkeypatch.setattr(pool, "pid", -1)
+    assert db.get_pool() is not pool
+
+    db.get_pool().closeall()
+    pool.closeall()
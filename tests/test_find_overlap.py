@@ -0,0 +1,42 @@
+from datetime import time
+
+from app import find_overlap
+
+
+def t(hour, minute=0):
+    return time(hour, minute)
+
+
+def test_no_slots():
+    assert not find_overlap([], [])
+
+
+def test_touching_slots_do_not_overlap():
+    assert not find_overlap([(t(9), t(10))], [(t(10), t(11)), (t(8), t(9))])
+
+
+def test_new_slot_inside_existing():
+    assert find_overlap([(t(9), t(17))], [(t(10), t(11))])
+
+
+def test_new_slot_covering_a_later_existing_one():
+    assert find_overlap([(t(10), t(11))], [(t(8), t(12))])
+
+
+def test_new_slots_overlapping_each_other():
+    assert find_overlap([], [(t(9), t(10, 30)), (t(10), t(11))])
+
+
+def test_identical_new_slots():
+    assert find_overlap([], [(t(9), t(10)), (t(9), t(10))])
+
+
+def test_clashes_between_stored_rows_are_not_rejudged():
+    existing = [(t(9), t(11)), (t(10), t(12))]
+    assert not find_overlap(existing, [(t(13), t(14))])
+
+
+def test_new_slot_after_a_long_existing_one():
+    existing = [(t(9), t(17)), (t(9), t(10))]
+    assert find_overlap(existing, [(t(16), t(18))])
+    assert not find_overlap(existing, [(t(17), t(18))])
@@ -0,0 +1,133 @@
+import io
+
+import pytest
+
+import importer
+
+
+def csv_file(*lines):
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+def rejects(rows):
+    return {row["line"]: row["reject"] for row in rows}
+
+
+# ------------------ LEAVE ------------------
+LEAVE_HEADER = "username,leave_type,from_date,to_date,reason,status"
+
+
+def test_leave_reject_rules(cur):
+    cur.execute("""
+        INSERT INTO leave_requests (username, leave_type, leave_dates, from_date, to_date, status)
+        VALUES ('imp', 'single', '2026-03-10', '2026-03-10', '2026-03-10', 2)
+    """)
+
+    inserted, rows = importer.import_leave(cur, csv_file(
+        LEAVE_HEADER,
+        "imp,single,2026-03-01,,,",               # 2: ok
+        ",single,2026-03-02,,,",                  # 3: no username
+        "imp,single,2026-02-30,,,",               # 4: no such day
+        "imp,multiple,2026-03-05,2026-03-04,,",   # 5: ends before it starts
+        "imp,sabbatical,2026-03-06,,,",           # 6: not a leave type
+        "imp,single,2026-03-07,,,9",              # 7: not a status
+        "imp,single,2026-03-10,,,0",              # 8: clashes with stored leave
+        "imp,multiple,2026-03-20,2026-03-22,,",   # 9: clashes with line 10
+        "imp,single,2026-03-21,,,",               # 10: clashes with line 9
+        "imp,single,2026-03-10,,,3",              # 11: rejected leave may overlap
+    ))
+
+    assert inserted == 2
+    assert rejects(rows) == {
+        3: "missing username, leave_type or from_date",
+        4: "invalid date",
+        5: "to_date before from_date",
+        6: "unknown leave_type",
+        7: "invalid status",
+        8: "leave already exists for these dates",
+        9: "overlaps another leave row in the file",
+        10: "overlaps another leave row in the file",
+    }
+
+    cur.execute("SELECT leave_dates, status FROM leave_requests WHERE username = 'imp' ORDER BY id")
+    assert [tuple(r.values()) for r in cur.fetchall()] == [
+        ("2026-03-10", 2), ("2026-03-01", 2), ("2026-03-10", 3)
+    ]
+
+
+def test_leave_rejects_keep_the_raw_values(cur):
+    _, rows = importer.import_leave(cur, csv_file(LEAVE_HEADER, "imp,single,not a date,,why,"))
+
+    assert rows[0]["raw_from_date"] == "not a date"
+    assert rows[0]["raw_reason"] == "why"
+
+
+def test_unknown_columns_are_refused(cur):
+    with pytest.raises(ValueError, match="password"):
+        importer.import_leave(cur, csv_file("username,password", "imp,x"))
+
+
+# ------------------ ACTIVITIES ------------------
+ACTIVITY_HEADER = "username,activity_date,activity_name,start_time,end_time"
+
+
+def test_activity_reject_rules(cur):
+    cur.execute("""
+        INSERT INTO leave_requests (username, leave_type, leave_dates, from_date, to_date, status)
+        VALUES ('imp', 'single', '2026-03-09', '2026-03-09', '2026-03-09', 2)
+    """)
+    cur.execute("""
+        INSERT INTO activities (username, activity_date, activity_name, start_time, end_time, duration)
+        VALUES ('imp', '2026-03-10', 'stored', '09:00', '10:00', 60)
+    """)
+
+    inserted, rows = importer.import_activities(cur, csv_file(
+        ACTIVITY_HEADER,
+        "imp,2026-03-11,ok,09:00,10:00",          # 2: ok
+        "imp,2026-03-11,,10:00,11:00",            # 3: no name
+        "imp,2026-03-11,x,25:00,26:00",           # 4: not a time
+        "imp,2026-03-11,x,12:00,12:00",           # 5: ends when it starts
+        "imp,2026-03-11,again,09:00,10:00",       # 6: same slot as line 2
+        "imp,2026-03-09,x,09:00,10:00",           # 7: approved leave that day
+        "imp,2026-03-10,x,09:30,10:30",           # 8: overlaps stored slot
+        "imp,2026-03-12,x,09:00,11:00",           # 9: overlaps line 10
+        "imp,2026-03-12,y,10:00,12:00",           # 10: overlaps line 9
+        "imp,2026-03-10,replaced,09:00,10:00",    # 11: same slot as stored
+    ))
+
+    assert inserted == 2
+    assert rejects(rows) == {
+        3: "missing required field",
+        4: "invalid date or time",
+        5: "end time must be after start time",
+        6: "duplicate slot in the file",
+        7: "on approved leave",
+        8: "overlaps an existing activity",
+        9: "overlaps another row in the file",
+        10: "overlaps another row in the file",
+    }
+
+    cur.execute("""
+        SELECT activity_date::text, activity_name, duration
+        FROM activities
+        WHERE username = 'imp'
+        ORDER BY activity_date
+    """)
+    assert [tuple(r.values()) for r in cur.fetchall()] == [
+        ("2026-03-10", "replaced", 60), ("2026-03-11", "ok", 60)
+    ]
+
+
+def test_imported_days_are_summarised(cur):
+    importer.import_activities(cur, csv_file(
+        ACTIVITY_HEADER,
+        "imp,2026-03-11,a,09:00,10:00",
+        "imp,2026-03-11,b,10:00,10:30",
+    ))
+
+    cur.execute("""
+        SELECT total_minutes, activity_count
+        FROM daily_activity_summary
+        WHERE username = 'imp' AND activity_date = '2026-03-11'
+    """)
+    assert dict(cur.fetchone()) == {"total_minutes": 90, "activity_count": 2}
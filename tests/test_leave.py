@@ -0,0 +1,93 @@
+import threading
+from datetime import date
+
+import app
+from conftest import login_employee
+
+
+def add_leave(cur, username, first, last=None, status=2, leave_type="single"):
+    cur.execute("""
+        INSERT INTO leave_requests (username, leave_type, leave_dates, from_date, to_date, status)
+        VALUES (%s, %s, 'x', %s, %s, %s)
+        RETURNING leave_range::text AS leave_range
+    """, (username, leave_type, first, last, status))
+    return cur.fetchone()["leave_range"]
+
+
+# ------------------ DATE RANGES ------------------
+def test_leave_range_covers_both_ends(cur):
+    assert add_leave(cur, "ranges", date(2026, 3, 2), date(2026, 3, 4)) == "[2026-03-02,2026-03-05)"
+
+
+def test_single_day_leave_without_to_date(cur):
+    assert add_leave(cur, "ranges", date(2026, 3, 9)) == "[2026-03-09,2026-03-10)"
+
+
+def test_leave_without_dates_has_no_range(cur):
+    assert add_leave(cur, "ranges", None) is None
+
+
+# ------------------ LAST WORKING DAY ------------------
+def test_day_not_on_leave_is_its_own_last_working_day(cur):
+    add_leave(cur, "walker", date(2026, 3, 10), date(2026, 3, 12))
+    assert app.last_working_day(cur, "walker", date(2026, 3, 9)) == date(2026, 3, 9)
+
+
+def test_walks_back_across_adjacent_ranges(cur):
+    add_leave(cur, "walker", date(2026, 3, 13), date(2026, 3, 15))
+    add_leave(cur, "walker", date(2026, 3, 10), date(2026, 3, 12))
+    add_leave(cur, "walker", date(2026, 3, 8))
+
+    assert app.last_working_day(cur, "walker", date(2026, 3, 14)) == date(2026, 3, 9)
+
+
+def test_only_approved_leave_counts(cur):
+    add_leave(cur, "walker", date(2026, 3, 10), date(2026, 3, 12), status=0)
+    add_leave(cur, "walker", date(2026, 3, 10), date(2026, 3, 12), status=3)
+    add_leave(cur, "someone else", date(2026, 3, 10), date(2026, 3, 12))
+
+    assert app.last_working_day(cur, "walker", date(2026, 3, 11)) == date(2026, 3, 11)
+
+
+# ------------------ OVERLAP CHECK ------------------
+def leave_dates(sql, username):
+    sql.execute("SELECT leave_dates, status FROM leave_requests WHERE username = %s ORDER BY id", (username,))
+    return [tuple(r.values()) for r in sql.fetchall()]
+
+
+def test_overlapping_leave_is_refused(client, sql):
+    login_employee(client, "overlap")
+
+    client.post("/leave", data={"leave_type": "multiple", "from_date": "2030-01-06", "to_date": "2030-01-08", "reason": "trip"})
+    client.post("/leave", data={"leave_type": "single", "single_date": "2030-01-08", "reason": "again"})
+    client.post("/leave", data={"leave_type": "single", "single_date": "2030-01-09", "reason": "next day"})
+
+    assert leave_dates(sql, "overlap") == [("2030-01-06 to 2030-01-08", 0), ("2030-01-09", 0)]
+
+
+def test_rejected_leave_does_not_block(client, sql):
+    add_leave(sql, "rebook", date(2030, 2, 3), status=3)
+    login_employee(client, "rebook")
+
+    client.post("/leave", data={"leave_type": "holiday", "single_date": "2030-02-03"})
+
+    assert leave_dates(sql, "rebook") == [("x", 3), ("2030-02-03", 2)]
+
+
+def test_concurrent_submits_book_one_leave(client, sql):
+    submitters = 8
+    barrier = threading.Barrier(submitters)
+
+    def submit():
+        with app.app.test_client() as own:
+            login_employee(own, "racer")
+            barrier.wait()
+            own.post("/leave", data={"leave_type": "single", "single_date": "2030-03-04", "reason": "race"})
+
+    threads = [threading.Thread(target=submit) for _ in range(submitters)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert leave_dates(sql, "racer") == [("2030-03-04", 0)]
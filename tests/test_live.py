@@ -0,0 +1,179 @@
+import queue
+
+import psycopg2
+import psycopg2.extras
+import pytest
+
+import live
+from conftest import login_manager
+
+
+def counts(resets, leaves):
+    return {"reset_requests": resets, "leave_requests": leaves}
+
+
+# A listener that is never started; tests feed its queues directly.
+@pytest.fixture
+def idle_listener():
+    listener = live.PendingListener("unused")
+    q = queue.Queue(maxsize=1)
+    listener._subscribers.add(q)
+    return listener, q
+
+
+# ------------------ STREAM ------------------
+def test_stream_opens_with_retry_and_the_current_counts(idle_listener, monkeypatch):
+    monkeypatch.setattr(live, "STREAM_MAX_AGE", 0)
+    listener, q = idle_listener
+
+    assert list(live.stream(listener, q, counts(1, 2))) == [
+        f"retry: {live.RETRY_MS}\n"
+        'event: counts\ndata: {"reset_requests": 1, "leave_requests": 2}\n\n'
+    ]
+    assert not listener._subscribers
+
+
+def test_stream_sends_changes_only(idle_listener, monkeypatch):
+    monkeypatch.setattr(live, "KEEPALIVE", 0.01)
+    listener, q = idle_listener
+    body = live.stream(listener, q, counts(0, 1))
+    next(body)
+
+    q.put(counts(0, 1))
+    assert next(body) == ": keep-alive\n\n"
+
+    q.put(counts(0, 2))
+    assert next(body) == 'event: counts\ndata: {"reset_requests": 0, "leave_requests": 2}\n\n'
+
+
+def test_closing_the_stream_unsubscribes(idle_listener):
+    listener, q = idle_listener
+    body = live.stream(listener, q, counts(0, 0))
+    next(body)
+
+    body.close()
+
+    assert not listener._subscribers
+
+
+def test_slow_browser_gets_only_the_latest_counts(idle_listener):
+    listener, q = idle_listener
+
+    listener._publish(counts(0, 1))
+    listener._publish(counts(0, 2))
+
+    assert q.get_nowait() == counts(0, 2)
+    assert q.empty()
+
+
+# ------------------ LISTENER ------------------
+@pytest.fixture
+def listening(database):
+    listener = live.PendingListener(database)
+    q = listener.subscribe()
+    try:
+        # The first publish happens once LISTEN is in place.
+        yield listener, q, q.get(timeout=5)
+    finally:
+        listener.unsubscribe(q)
+
+
+def add_pending_leave(cur, username):
+    cur.execute("""
+        INSERT INTO leave_requests (username, leave_type, leave_dates, from_date, to_date, status)
+        VALUES (%s, 'single', '2032-01-05', '2032-01-05', '2032-01-05', 0)
+    """, (username,))
+
+
+def test_committed_notify_reaches_subscribers(listening, sql):
+    listener, q, before = listening
+
+    add_pending_leave(sql, "live_commit")
+    live.notify(sql, "leave")
+
+    assert q.get(timeout=5) == live.pending_counts(sql)
+    assert live.pending_counts(sql)["leave_requests"] == before["leave_requests"] + 1
+
+
+def test_rolled_back_notify_is_never_delivered(listening, database):
+    listener, q, before = listening
+
+    conn = psycopg2.connect(database, cursor_factory=psycopg2.extras.RealDictCursor)
+    try:
+        cur = conn.cursor()
+        add_pending_leave(cur, "live_rollback")
+        live.notify(cur, "leave")
+        conn.rollback()
+    finally:
+        conn.close()
+
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0.5)
+
+
+# ------------------ ENDPOINT ------------------
+@pytest.fixture
+def manager(client, monkeypatch):
+    monkeypatch.setattr(live, "_listener", None)
+    monkeypatch.setattr(live, "STREAM_MAX_AGE", 0)
+    login_manager(client)
+    return client
+
+
+def test_events_stream_the_pending_counts(manager, sql):
+    response = manager.get("/manager/events")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert response.get_data(as_text=True) == (
+        f"retry: {live.RETRY_MS}\n" + live._event(live.pending_counts(sql))
+    )
+
+
+def test_events_are_for_managers_only(client):
+    assert client.get("/manager/events").status_code == 302
+
+
+def test_streams_past_the_cap_are_refused(manager, monkeypatch):
+    monkeypatch.setattr(live, "MAX_STREAMS", 0)
+
+    response = manager.get("/manager/events")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(live.RETRY_MS // 1000)
+    assert response.get_data(as_text=True) == f"retry: {live.RETRY_MS}\n\n"
+
+
+def test_subscribe_stops_at_the_cap(monkeypatch):
+    monkeypatch.setattr(live, "MAX_STREAMS", 1)
+    listener = live.PendingListener("unused")
+    listener._thread = "running"
+
+    first = listener.subscribe()
+
+    assert first is not None
+    assert listener.subscribe() is None
+
+    listener.unsubscribe(first)
+    assert listener.subscribe() is not None
+
+
+# ------------------ CURRENT COUNTS ------------------
+class NoQueries:
+    def execute(self, *args):
+        raise AssertionError("queried the database")
+
+
+def test_current_counts_uses_the_listener_when_connected(monkeypatch):
+    listener = live.PendingListener("unused")
+    listener._publish(counts(3, 4))
+    monkeypatch.setattr(live, "_listener", listener)
+
+    assert live.current_counts(NoQueries()) == counts(3, 4)
+
+
+def test_current_counts_queries_without_a_listener(monkeypatch, cur):
+    monkeypatch.setattr(live, "_listener", live.PendingListener("unused"))
+
+    assert live.current_counts(cur) == live.pending_counts(cur)
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "_registry", None)
+    return tmp_path
+
+
+def series(text, name):
+    return [line for line in text.splitlines() if line.startswith(name) and not line.startswith("#")]
+
+
+def exited_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_every_metric_has_help_and_type():
+    text = metrics.render()
+
+    for name, (kind, help_text, _) in metrics.METRICS.items():
+        assert f"# HELP {name} {help_text}" in text
+        assert f"# TYPE {name} {kind}" in text
+    assert text.endswith("\n")
+
+
+def test_counter_with_labels():
+    metrics.inc("daily_tracker_http_requests_total", route="report", method="GET", status=200)
+    metrics.inc("daily_tracker_http_requests_total", 2, route="report", method="GET", status=200)
+
+    assert series(metrics.render(), "daily_tracker_http_requests_total") == [
+        'daily_tracker_http_requests_total{method="GET",route="report",status="200"} 3'
+    ]
+
+
+def test_label_values_are_escaped():
+    metrics.inc("daily_tracker_leave_requests_handled_total", action='a"b\\c\nd')
+
+    assert series(metrics.render(), "daily_tracker_leave_requests_handled_total") == [
+        'daily_tracker_leave_requests_handled_total{action="a\\"b\\\\c\\nd"} 1'
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    for value in (0.07, 0.2, 0.2, 50):
+        metrics.observe("daily_tracker_pdf_render_seconds", value)
+
+    lines = series(metrics.render(), "daily_tracker_pdf_render_seconds")
+
+    assert 'daily_tracker_pdf_render_seconds_bucket{le="0.05"} 0' in lines
+    assert 'daily_tracker_pdf_render_seconds_bucket{le="0.1"} 1' in lines
+    assert 'daily_tracker_pdf_render_seconds_bucket{le="0.25"} 3' in lines
+    assert 'daily_tracker_pdf_render_seconds_bucket{le="30"} 3' in lines
+    assert 'daily_tracker_pdf_render_seconds_bucket{le="+Inf"} 4' in lines
+    assert "daily_tracker_pdf_render_seconds_sum 50.47" in lines
+    assert "daily_tracker_pdf_render_seconds_count 4" in lines
+
+
+def test_workers_are_summed(metrics_dir):
+    metrics.inc("daily_tracker_db_queries_total", 5, route="report")
+    metrics.inc("daily_tracker_http_requests_in_flight", 1)
+
+    # Another live worker on the host: this process's parent.
+    other = [
+        ["daily_tracker_db_queries_total", [["route", "report"]], 2],
+        ["daily_tracker_http_requests_in_flight", [], 3],
+    ]
+    (metrics_dir / f"{os.getppid()}-other.json").write_text(json.dumps(other))
+
+    text = metrics.render()
+    assert series(text, "daily_tracker_db_queries_total") == ['daily_tracker_db_queries_total{route="report"} 7']
+    assert series(text, "daily_tracker_http_requests_in_flight") == ["daily_tracker_http_requests_in_flight 4"]
+
+
+def test_exited_workers_keep_counters_and_drop_gauges(metrics_dir):
+    dead = [
+        ["daily_tracker_db_queries_total", [["route", "report"]], 4],
+        ["daily_tracker_http_requests_in_flight", [], 2],
+    ]
+    snapshot = metrics_dir / f"{exited_pid()}-dead.json"
+    snapshot.write_text(json.dumps(dead))
+
+    for _ in range(2):
+        text = metrics.render()
+        assert series(text, "daily_tracker_db_queries_total") == ['daily_tracker_db_queries_total{route="report"} 4']
+        assert series(text, "daily_tracker_http_requests_in_flight") == []
+
+    assert not snapshot.exists()
+    assert (metrics_dir / metrics.ARCHIVE).exists()
+
+
+def test_unknown_metrics_in_snapshots_are_ignored(metrics_dir):
+    (metrics_dir / f"{os.getppid()}-other.json").write_text(json.dumps([["no_such_metric", [], 1]]))
+
+    assert "no_such_metric" not in metrics.render()
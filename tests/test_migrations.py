@@ -0,0 +1,125 @@
+import psycopg2
+import psycopg2.extras
+import pytest
+
+import migrations
+from conftest import create_schema, drop_schema, release_database, use_database
+
+
+# Migrations run from nothing, in a schema of their own.
+@pytest.fixture
+def empty_schema(database, monkeypatch):
+    name, dsn = create_schema()
+    use_database(monkeypatch, dsn)
+
+    conn = psycopg2.connect(dsn, cursor_factory=psycopg2.extras.RealDictCursor)
+    conn.autocommit = True
+    try:
+        yield conn.cursor()
+    finally:
+        conn.close()
+        release_database()
+        drop_schema(name)
+
+
+def quiet(*args):
+    pass
+
+
+def test_versions_are_unique_and_increasing():
+    versions = [version for version, _, _ in migrations.MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+
+def test_migrate_applies_everything_once(empty_schema):
+    assert [applied for _, _, applied in migrations.status()] == [False] * len(migrations.MIGRATIONS)
+
+    assert migrations.migrate(log=quiet) == [version for version, _, _ in migrations.MIGRATIONS]
+
+    messages = []
+    assert migrations.migrate(log=messages.append) == []
+    assert messages == ["Schema is up to date."]
+    assert all(applied for _, _, applied in migrations.status())
+
+    empty_schema.execute("SELECT version, name FROM schema_migrations ORDER BY version")
+    assert [tuple(r.values()) for r in empty_schema.fetchall()] == [
+        (version, name) for version, name, _ in migrations.MIGRATIONS
+    ]
+
+
+def test_new_migrations_are_picked_up(empty_schema, monkeypatch):
+    with monkeypatch.context() as mp:
+        mp.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:1])
+        assert migrations.migrate(log=quiet) == [migrations.MIGRATIONS[0][0]]
+
+    assert migrations.migrate(log=quiet) == [version for version, _, _ in migrations.MIGRATIONS[1:]]
+
+
+def test_failed_migration_is_rolled_back(empty_schema, monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        (1, "works", "CREATE TABLE kept (x INT)"),
+        (2, "fails halfway", "CREATE TABLE not_kept (x INT); SELECT 1 / 0"),
+        (3, "never reached", "CREATE TABLE never (x INT)"),
+    ])
+
+    with pytest.raises(psycopg2.errors.DivisionByZero):
+        migrations.migrate(log=quiet)
+
+    empty_schema.execute("SELECT version FROM schema_migrations")
+    assert [r["version"] for r in empty_schema.fetchall()] == [1]
+
+    empty_schema.execute("SELECT to_regclass('kept') AS kept, to_regclass('not_kept') AS not_kept")
+    assert dict(empty_schema.fetchone()) == {"kept": "kept", "not_kept": None}
+
+
+def test_callable_steps_get_the_cursor(empty_schema, monkeypatch):
+    seen = []
+    monkeypatch.setattr(migrations, "MIGRATIONS", [(1, "python step", seen.append)])
+
+    migrations.migrate(log=quiet)
+
+    assert len(seen) == 1 and hasattr(seen[0], "execute")
+
+
+# ------------------ LEAVE DATE BACKFILL ------------------
+def migrate_with_leave(cursor, monkeypatch, leave_dates):
+    with monkeypatch.context() as mp:
+        mp.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:1])
+        migrations.migrate(log=quiet)
+
+    for text in leave_dates:
+        cursor.execute("INSERT INTO leave_requests (username, leave_dates) VALUES ('old', %s)", (text,))
+    migrations.migrate(log=quiet)
+
+    cursor.execute("""
+        SELECT leave_dates, from_date::text, to_date::text, leave_range::text
+        FROM leave_requests
+        ORDER BY id
+    """)
+    return [tuple(r.values()) for r in cursor.fetchall()]
+
+
+def test_leave_dates_are_backfilled(empty_schema, monkeypatch):
+    assert migrate_with_leave(empty_schema, monkeypatch, [
+        "2025-03-01",
+        " 2025-03-01 to 2025-03-03 ",
+        "next tuesday",
+    ]) == [
+        ("2025-03-01", "2025-03-01", "2025-03-01", "[2025-03-01,2025-03-02)"),
+        (" 2025-03-01 to 2025-03-03 ", "2025-03-01", "2025-03-03", "[2025-03-01,2025-03-04)"),
+        ("next tuesday", None, None, None),
+    ]
+
+
+def test_impossible_and_reversed_dates_are_left_empty(empty_schema, monkeypatch):
+    assert migrate_with_leave(empty_schema, monkeypatch, [
+        "2025-02-30",
+        "2025-02-27 to 2025-02-30",
+        "2025-03-05 to 2025-03-01",
+        "2025-02-28",
+    ]) == [
+        ("2025-02-30", None, None, None),
+        ("2025-02-27 to 2025-02-30", None, None, None),
+        ("2025-03-05 to 2025-03-01", None, None, None),
+        ("2025-02-28", "2025-02-28", "2025-02-28", "[2025-02-28,2025-03-01)"),
+    ]
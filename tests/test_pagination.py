@@ -0,0 +1,95 @@
+import base64
+
+import pytest
+
+import app
+
+
+# ------------------ CURSOR ENCODING ------------------
+@pytest.mark.parametrize("values", [(41,), ("2026-01-05 09:30", 7), (None, 12)])
+def test_cursor_round_trip(values):
+    token = app.encode_cursor(*values)
+
+    assert "=" not in token
+    assert app.decode_cursor(token, len(values)) == list(values)
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"{broken").decode(),
+    base64.urlsafe_b64encode(b'{"id": 4}').decode(),
+])
+def test_garbage_cursors_are_rejected(token):
+    with pytest.raises(ValueError):
+        app.decode_cursor(token, 1)
+
+
+def test_cursor_of_the_wrong_size_is_rejected():
+    with pytest.raises(ValueError):
+        app.decode_cursor(app.encode_cursor(1, 2), 1)
+
+
+def test_history_cursor_must_hold_an_id(cur):
+    with pytest.raises(ValueError):
+        app.leave_history_page(cur, "alice", app.encode_cursor("5"))
+
+
+def test_queue_cursor_must_hold_an_id(cur):
+    with pytest.raises(ValueError):
+        app.pending_leave_page(cur, app.encode_cursor("2026-01-01", "5"))
+
+
+# ------------------ PAGING ------------------
+def add_leave(cur, username, requested_on, status=0):
+    cur.execute("""
+        INSERT INTO leave_requests (username, leave_type, leave_dates, status, requested_on)
+        VALUES (%s, 'single', 'x', %s, %s)
+        RETURNING id
+    """, (username, status, requested_on))
+    return cur.fetchone()["id"]
+
+
+def all_pages(page):
+    rows, cursor = page(None)
+    pages = [rows]
+    while cursor:
+        rows, cursor = page(cursor)
+        pages.append(rows)
+    return pages
+
+
+def test_history_pages_walk_newest_first(cur, monkeypatch):
+    monkeypatch.setattr(app, "HISTORY_PAGE_SIZE", 2)
+    ids = [add_leave(cur, "pager", f"2026-01-0{i}") for i in range(1, 6)]
+    add_leave(cur, "someone else", "2026-01-01")
+
+    pages = all_pages(lambda cursor: app.leave_history_page(cur, "pager", cursor))
+
+    assert [len(rows) for rows in pages] == [2, 2, 1]
+    assert [row["id"] for rows in pages for row in rows] == sorted(ids, reverse=True)
+
+
+def test_history_exact_multiple_has_no_empty_last_page(cur, monkeypatch):
+    monkeypatch.setattr(app, "HISTORY_PAGE_SIZE", 2)
+    for i in range(4):
+        add_leave(cur, "pager", "2026-01-01")
+
+    assert [len(rows) for rows in all_pages(lambda c: app.leave_history_page(cur, "pager", c))] == [2, 2]
+
+
+def test_queue_pages_run_oldest_first_with_undated_requests_last(cur, monkeypatch):
+    monkeypatch.setattr(app, "QUEUE_PAGE_SIZE", 3)
+
+    # Out of order on purpose, with ties on requested_on and a NULL tail.
+    for requested_on in ("2026-01-03", None, "2026-01-01", "2026-01-03", None, "2026-01-02", None):
+        add_leave(cur, "pager", requested_on)
+    add_leave(cur, "pager", "2026-01-01", status=2)
+
+    pages = all_pages(lambda cursor: app.pending_leave_page(cur, cursor))
+
+    cur.execute("SELECT id FROM leave_requests WHERE status = 0 ORDER BY requested_on ASC NULLS LAST, id ASC")
+    expected = [row["id"] for row in cur.fetchall()]
+
+    assert [row["id"] for rows in pages for row in rows] == expected
+    assert all(len(rows) <= 3 for rows in pages)
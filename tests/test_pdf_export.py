@@ -0,0 +1,138 @@
+import os
+
+import pytest
+
+import pdf_cache
+from conftest import login_manager
+
+URL = "/manager/export_pdf/pdfuser?month=03&year=2031"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def manager(client, sql):
+    sql.execute("DELETE FROM activities WHERE username = 'pdfuser'")
+    add_activity(sql, "2031-03-03", "09:00", "10:00")
+    login_manager(client)
+    return client
+
+
+def add_activity(sql, day, start, end):
+    sql.execute("""
+        INSERT INTO activities (username, activity_date, activity_name, start_time, end_time, duration, submitted_at)
+        VALUES ('pdfuser', %s, 'writing', %s, %s, 60, '2031-03-03 18:00')
+    """, (day, start, end))
+
+
+def test_pdf_carries_an_etag(manager):
+    response = manager.get(URL)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/pdf"
+    assert response.data.startswith(b"%PDF")
+    assert response.headers["ETag"]
+    assert "pdfuser_March_2031_Activities.pdf" in response.headers["Content-Disposition"]
+    assert response.cache_control.private and response.cache_control.no_cache
+
+
+def test_unchanged_month_revalidates_with_304(manager):
+    etag = manager.get(URL).headers["ETag"]
+
+    response = manager.get(URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_second_request_is_served_from_the_cache(manager, cache_dir):
+    first = manager.get(URL)
+    assert len(list(cache_dir.glob("*.pdf"))) == 1
+
+    assert manager.get(URL).data == first.data
+
+
+def test_changed_rows_change_the_etag(manager, sql):
+    etag = manager.get(URL).headers["ETag"]
+
+    add_activity(sql, "2031-03-04", "09:00", "09:30")
+    response = manager.get(URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_rows_outside_the_month_do_not_change_the_etag(manager, sql):
+    etag = manager.get(URL).headers["ETag"]
+
+    add_activity(sql, "2031-04-01", "09:00", "09:30")
+
+    assert manager.get(URL, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_invalid_month(manager):
+    assert manager.get("/manager/export_pdf/pdfuser?month=13&year=2031").status_code == 400
+
+
+def test_managers_only(client):
+    assert client.get(URL).status_code == 302
+
+
+def test_304_keeps_the_cache_control(manager):
+    etag = manager.get(URL).headers["ETag"]
+
+    response = manager.get(URL, headers={"If-None-Match": etag})
+
+    assert response.cache_control.private and response.cache_control.no_cache
+
+
+def test_oversized_pdf_is_served_but_not_cached(manager, cache_dir, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "MAX_BYTES", 10)
+
+    response = manager.get(URL)
+
+    assert response.data.startswith(b"%PDF")
+    assert list(cache_dir.glob("*.pdf")) == []
+
+
+# ------------------ CACHE FILES ------------------
+def test_hit_survives_eviction_by_another_worker(cache_dir):
+    pdf_cache.put("k", b"%PDF one")
+
+    with pdf_cache.get("k") as f:
+        (cache_dir / "k.pdf").unlink()
+        assert f.read() == b"%PDF one"
+
+    assert pdf_cache.get("k") is None
+
+
+def test_least_recently_used_entries_are_evicted(cache_dir, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "MAX_BYTES", 35)
+
+    for name, mtime in (("old", 1), ("unused", 2), ("new", 3)):
+        pdf_cache.put(name, b"x" * 10)
+        os.utime(cache_dir / f"{name}.pdf", (mtime, mtime))
+
+    # A hit makes "old" the most recently used.
+    pdf_cache.get("old").close()
+    pdf_cache.put("newest", b"x" * 10)
+
+    assert sorted(p.stem for p in cache_dir.glob("*.pdf")) == ["new", "newest", "old"]
+
+
+def test_key_depends_on_every_part():
+    base = pdf_cache.key("alice", "03", "2031", "1:abc")
+
+    assert pdf_cache.key("alice", "03", "2031", "1:abc") == base
+    assert len({
+        base,
+        pdf_cache.key("bob", "03", "2031", "1:abc"),
+        pdf_cache.key("alice", "04", "2031", "1:abc"),
+        pdf_cache.key("alice", "03", "2032", "1:abc"),
+        pdf_cache.key("alice", "03", "2031", "2:abc"),
+    }) == 5
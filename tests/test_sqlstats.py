@@ -0,0 +1,51 @@
+import sqlstats
+
+
+def test_placeholders_and_literals_are_redacted():
+    query = "SELECT * FROM users WHERE username = %s AND password = 'hunter2' AND id > 42"
+    assert sqlstats.normalize(query) == "SELECT * FROM users WHERE username = ? AND password = ? AND id > ?"
+
+
+def test_named_placeholders():
+    assert sqlstats.normalize("SELECT %(user)s, %(day)s") == "SELECT ?, ?"
+
+
+def test_quoted_quote_stays_inside_the_string():
+    assert sqlstats.normalize("SELECT 'it''s secret', 'x'") == "SELECT ?, ?"
+
+
+def test_negative_and_decimal_numbers():
+    assert sqlstats.normalize("SELECT -3, 1.5, 10") == "SELECT ?, ?, ?"
+
+
+def test_digits_inside_identifiers_are_kept():
+    assert sqlstats.normalize("SELECT x1, t2.col3 FROM t2") == "SELECT x1, t2.col3 FROM t2"
+
+
+def test_comments_are_dropped():
+    query = """
+        -- password: hunter2
+        SELECT 1 /* token abc123 */ FROM t
+    """
+    assert sqlstats.normalize(query) == "SELECT ? FROM t"
+
+
+def test_in_and_values_lists_collapse():
+    assert sqlstats.normalize("SELECT * FROM t WHERE id IN (1, 2, 3)") == "SELECT * FROM t WHERE id IN (?, ...)"
+    assert sqlstats.normalize("INSERT INTO t VALUES (%s, %s, 'a')") == "INSERT INTO t VALUES (?, ...)"
+
+
+def test_queries_differing_only_in_values_match():
+    a = sqlstats.normalize("SELECT * FROM leave_requests WHERE id IN (1, 2)   AND status = 0")
+    b = sqlstats.normalize("SELECT *\nFROM leave_requests\nWHERE id IN (7, 8, 9) AND status = 2")
+    assert a == b
+
+
+def test_bytes_are_decoded():
+    assert sqlstats.normalize(b"SELECT 'x'") == "SELECT ?"
+
+
+def test_long_statements_are_truncated():
+    normalized = sqlstats.normalize("SELECT " + "col, " * 1000 + "col FROM t")
+    assert len(normalized) == sqlstats.MAX_SQL_LENGTH + len(" ...")
+    assert normalized.endswith(" ...")
@@ -0,0 +1,103 @@
+from datetime import date, datetime, time
+
+import summary
+
+DAY = date(2026, 4, 7)
+
+
+def add_activity(cur, username, day, start, end, clock_in=None, clock_out=None, submitted=None):
+    cur.execute("""
+        INSERT INTO activities (
+            username, activity_date, activity_name, start_time, end_time,
+            duration, clock_in, clock_out, submitted_at
+        )
+        VALUES (%s, %s, 'work', %s, %s, %s, %s, %s, %s)
+        RETURNING id
+    """, (
+        username, day, time(*start), time(*end),
+        (end[0] * 60 + end[1]) - (start[0] * 60 + start[1]),
+        clock_in and time(*clock_in), clock_out and time(*clock_out),
+        submitted or datetime(day.year, day.month, day.day, 20)
+    ))
+    return cur.fetchone()["id"]
+
+
+def summary_row(cur, username, day=DAY):
+    cur.execute("""
+        SELECT total_minutes, activity_count, clock_in, clock_out
+        FROM daily_activity_summary
+        WHERE username = %s AND activity_date = %s
+    """, (username, day))
+    row = cur.fetchone()
+    return row and dict(row)
+
+
+def test_refresh_day_totals(cur):
+    add_activity(cur, "sum", DAY, (9, 0), (10, 30), clock_in=(8, 55), submitted=datetime(2026, 4, 7, 11))
+    add_activity(cur, "sum", DAY, (11, 0), (12, 0), clock_in=(9, 30), clock_out=(17, 0), submitted=datetime(2026, 4, 7, 18))
+    add_activity(cur, "sum", DAY, (13, 0), (13, 15), clock_out=(18, 0), submitted=datetime(2026, 4, 7, 19))
+
+    summary.refresh_day(cur, "sum", DAY)
+
+    # First clock-in submitted, last clock-out submitted.
+    assert summary_row(cur, "sum") == {
+        "total_minutes": 165,
+        "activity_count": 3,
+        "clock_in": time(8, 55),
+        "clock_out": time(18, 0),
+    }
+
+
+def test_refresh_day_replaces_the_old_row(cur):
+    first = add_activity(cur, "sum", DAY, (9, 0), (10, 0))
+    summary.refresh_day(cur, "sum", DAY)
+
+    cur.execute("UPDATE activities SET duration = 30, end_time = '09:30' WHERE id = %s", (first,))
+    add_activity(cur, "sum", DAY, (10, 0), (10, 45))
+    summary.refresh_day(cur, "sum", DAY)
+
+    assert summary_row(cur, "sum")["total_minutes"] == 75
+
+
+def test_refresh_day_drops_a_day_with_no_activities(cur):
+    first = add_activity(cur, "sum", DAY, (9, 0), (10, 0))
+    summary.refresh_day(cur, "sum", DAY)
+
+    cur.execute("DELETE FROM activities WHERE id = %s", (first,))
+    summary.refresh_day(cur, "sum", DAY)
+
+    assert summary_row(cur, "sum") is None
+
+
+def test_refresh_day_leaves_other_days_alone(cur):
+    add_activity(cur, "sum", DAY, (9, 0), (10, 0))
+    add_activity(cur, "sum", date(2026, 4, 8), (9, 0), (9, 20))
+
+    summary.refresh_day(cur, "sum", DAY)
+
+    assert summary_row(cur, "sum", date(2026, 4, 8)) is None
+
+
+def test_rebuild_restores_a_drifted_rollup(cur):
+    for day in (DAY, date(2026, 4, 8), date(2026, 5, 1)):
+        add_activity(cur, "drift", day, (9, 0), (10, 0))
+        summary.refresh_day(cur, "drift", day)
+    add_activity(cur, "other", DAY, (9, 0), (9, 10))
+    summary.refresh_day(cur, "other", DAY)
+
+    cur.execute("UPDATE daily_activity_summary SET total_minutes = 0 WHERE username IN ('drift', 'other')")
+    cur.execute("""
+        INSERT INTO daily_activity_summary (username, activity_date, total_minutes, activity_count)
+        VALUES ('drift', '2026-04-20', 99, 1)
+    """)
+
+    deleted, inserted = summary.rebuild(cur, username="drift", date_from=DAY, date_to=date(2026, 4, 30))
+
+    assert (deleted, inserted) == (3, 2)
+    assert summary_row(cur, "drift")["total_minutes"] == 60
+    assert summary_row(cur, "drift", date(2026, 4, 8))["total_minutes"] == 60
+    assert summary_row(cur, "drift", date(2026, 4, 20)) is None
+
+    # Outside the slice: untouched.
+    assert summary_row(cur, "drift", date(2026, 5, 1))["total_minutes"] == 0
+    assert summary_row(cur, "other")["total_minutes"] == 0
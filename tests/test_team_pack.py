@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+
+import pytest
+
+import team_pack
+
+
+@pytest.fixture(autouse=True)
+def pack_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(team_pack, "PACK_DIR", str(tmp_path))
+    return tmp_path
+
+
+def new_job(**fields):
+    job_id = "ab" * 16
+    job_dir = team_pack._job_dir(job_id)
+    os.makedirs(job_dir)
+    team_pack._write_status(job_dir, **fields)
+    return job_id, job_dir
+
+
+def test_running_job_without_a_heartbeat_is_failed(monkeypatch):
+    job_id, _ = new_job(state="running", total=3, done=1)
+    monkeypatch.setattr(team_pack, "PACK_STALE_AFTER", -1)
+
+    state = team_pack.status(job_id)
+
+    assert state["state"] == "failed"
+    assert "stopped" in state["error"]
+    assert state["done"] == 1
+
+    # Recorded, not just reported.
+    monkeypatch.setattr(team_pack, "PACK_STALE_AFTER", 60)
+    assert team_pack.status(job_id)["state"] == "failed"
+
+
+def test_recent_running_job_is_left_running():
+    job_id, _ = new_job(state="running", total=3, done=1)
+
+    assert team_pack.status(job_id)["state"] == "running"
+
+
+def test_finished_jobs_never_go_stale(monkeypatch):
+    job_id, _ = new_job(state="done", file="result.zip")
+    monkeypatch.setattr(team_pack, "PACK_STALE_AFTER", -1)
+
+    assert team_pack.status(job_id)["state"] == "done"
+
+
+def test_heartbeat_runs_until_the_job_ends(monkeypatch):
+    job_id, job_dir = new_job(state="running", total=1, done=0)
+    monkeypatch.setattr(team_pack, "PACK_HEARTBEAT", 0.01)
+
+    release = threading.Event()
+
+    def slow_render(job_dir, month_name, year, grouped):
+        release.wait(5)
+        return os.path.join(job_dir, "result.zip")
+
+    monkeypatch.setattr(team_pack, "_run_zip", slow_render)
+    worker = threading.Thread(target=team_pack._run, args=(job_dir, "zip", "March", "2031", []))
+    worker.start()
+
+    first = team_pack.status(job_id)["updated_at"]
+    time.sleep(0.1)
+    assert team_pack.status(job_id)["updated_at"] > first
+
+    release.set()
+    worker.join()
+
+    state = team_pack.status(job_id)
+    assert (state["state"], state["file"]) == ("done", "result.zip")
+
+    time.sleep(0.05)
+    assert team_pack.status(job_id)["updated_at"] == state["updated_at"]